@@ -1,6 +1,6 @@
 """Local development database configuration."""
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -21,8 +21,27 @@ def get_db():
     finally:
         db.close()
 
+# Columns added to existing tables; create_all only creates tables that are missing
+ADDED_COLUMNS = {
+    "resumes": {"content_hash": "VARCHAR(64)"},
+    "jobs": {"worker_id": "VARCHAR(100)", "lease_expires_at": "DATETIME"},
+}
+
+def _add_missing_columns():
+    """Add ADDED_COLUMNS (with an index) to tables created before they existed."""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table, columns in ADDED_COLUMNS.items():
+            existing = {column["name"] for column in inspector.get_columns(table)}
+            for name, ddl in columns.items():
+                if name not in existing:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+                    conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_{name} ON {table} ({name})"))
+                    print(f"✓ Added column {table}.{name}")
+
 def init_db():
     """Initialize database tables."""
     from . import models
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
     print("✓ Database tables created")
@@ -116,11 +116,52 @@ class Resume(Base):
     file_size = Column(Integer, nullable=False)
     content = Column(Text, nullable=True)
     analysis = Column(JSON, nullable=True)
+    content_hash = Column(String(64), ForeignKey("resume_contents.content_hash"), nullable=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     user = relationship("User", back_populates="resumes")
+    stored_content = relationship("ResumeContent")
     
     def __repr__(self) -> str:
         return f"<Resume(id='{self.id}', filename='{self.original_filename}')>"
+
+
+class ResumeContent(Base):
+    """A resume file's bytes and extraction results, shared by every upload of the same file."""
+    __tablename__ = "resume_contents"
+
+    content_hash = Column(String(64), primary_key=True)  # SHA-256 of the file bytes
+    file_path = Column(String(512), nullable=False)
+    file_type = Column(String(100), nullable=True)
+    file_size = Column(Integer, nullable=False)
+    text = Column(Text, nullable=True)
+    analysis = Column(JSON, nullable=True)  # AI analysis; local fallbacks are not stored
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<ResumeContent(content_hash='{self.content_hash[:12]}', size={self.file_size})>"
+
+
+class Job(Base):
+    """A long-running generation request run in the background by app.services.job_queue."""
+    __tablename__ = "jobs"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=True, index=True)
+    kind = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False, default="queued", index=True)  # queued, running, succeeded, failed
+    payload = Column(JSON, nullable=False)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    error_status_code = Column(Integer, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    worker_id = Column(String(100), nullable=True)  # Process running the job
+    lease_expires_at = Column(DateTime, nullable=True, index=True)  # Renewed while the job runs
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<Job(id='{self.id}', kind='{self.kind}', status='{self.status}')>"
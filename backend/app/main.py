@@ -7,7 +7,7 @@ from typing import Generator
 from sqlalchemy.orm import Session
 
 # Database
-from .database.local_config import get_db, init_db, Base
+from .database.local_config import get_db, init_db, Base, SessionLocal
 from .database.models import User, Portfolio, CV, CoverLetter, APICall
 import uuid
 
@@ -24,10 +24,12 @@ import time
 from pathlib import Path
 from typing import List, Optional, Dict, Any, Literal
 from .services.portfolio_builder import PortfolioBuilder
+from .services.circuit_breaker import CircuitOpenError
+from .utils.logging_config import setup_logging, dropped_records
 
 from fastapi import FastAPI, File, UploadFile, HTTPException, Depends, BackgroundTasks, Request, Form, APIRouter, status
 from pydantic import ValidationError, BaseModel, Field
-from fastapi.responses import FileResponse, JSONResponse, HTMLResponse, RedirectResponse
+from fastapi.responses import FileResponse, JSONResponse, HTMLResponse, RedirectResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
@@ -39,7 +41,18 @@ from typing import Optional, List, Dict, Any, Literal
 from sqlalchemy.orm import Session
 
 # Import database models and session
-from .database.models import CV, User, Portfolio, APICall, CoverLetter, ResumeOptimization
+from .database.models import CV, User, Portfolio, APICall, CoverLetter, ResumeOptimization, Resume, Job
+from .services.batch_scorer import batch_scorer, ResumeInput
+from .services.semantic_search import semantic_search
+from .services.scoring_session import scoring_sessions, SessionConflictError
+from .services.extraction_service import extraction_service, ExtractionError
+from .services.resume_store import resume_store
+from .services.job_queue import job_queue, job_to_dict, JobQueueFullError, FINISHED
+from .services.render_pool import render_pool
+from .services.artifact_cache import MEDIA_TYPES
+from .utils.file_utils import UploadTooLargeError, UnsupportedFileTypeError, save_upload_file
+from .utils.upload_limit import UploadSizeLimitMiddleware
+from .utils.scoring_rules import calculate_ats_score
 
 # All routes are defined directly in this file
 
@@ -156,17 +169,10 @@ for var in required_vars:
     if not os.getenv(var):
         raise ValueError(f"Missing required environment variable: {var}")
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('app.log')
-    ]
-)
+# Configure logging: records are queued and written by a background thread,
+# so request handlers never block on log I/O (level from LOG_LEVEL)
+setup_logging()
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -180,6 +186,48 @@ app = FastAPI(
 
 # All routes are defined directly in this file
 
+# Shutdown handlers run in registration order: stop the job workers before the
+# clients and pools their jobs use are closed, so running jobs are interrupted
+# (and run again on the next start) rather than failing on a closed resource
+@app.on_event("shutdown")
+async def stop_job_workers():
+    """Stop the background job workers; their jobs run again on the next start."""
+    await job_queue.shutdown()
+
+@app.on_event("shutdown")
+async def close_groq_http_pool():
+    """Close the shared Groq HTTP connection pool on shutdown."""
+    from .services.groq_client import close_shared_http_client
+    await close_shared_http_client()
+
+@app.on_event("shutdown")
+def stop_batch_scoring_pool():
+    """Stop the batch ATS scoring worker processes on shutdown."""
+    batch_scorer.shutdown()
+
+@app.on_event("shutdown")
+def stop_extraction_pool():
+    """Stop the document extraction worker processes on shutdown."""
+    extraction_service.shutdown()
+
+@app.on_event("startup")
+async def start_render_pool():
+    """Start the CV rendering worker processes so the first CVs do not wait for them."""
+    await render_pool.start()
+
+@app.on_event("shutdown")
+def stop_render_pool():
+    """Stop the CV rendering worker processes on shutdown."""
+    render_pool.shutdown()
+
+@app.on_event("startup")
+async def start_job_workers():
+    """Start the background job workers, resuming jobs left from the previous run."""
+    await job_queue.start()
+
+# Reject oversized uploads before their body is read (added first so CORS headers wrap its 413)
+app.add_middleware(UploadSizeLimitMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -289,6 +337,58 @@ class OptimizationRequest(BaseModel):
             raise ValueError("resume_text must be at least 50 characters long")
         return self
 
+class BatchResumeText(BaseModel):
+    id: Optional[str] = None  # Caller's reference; defaults to the resume's position
+    text: str = Field(..., min_length=1)
+
+class BatchScoreRequest(BaseModel):
+    job_description: str = Field(..., min_length=1)
+    resumes: List[BatchResumeText] = Field(default_factory=list)
+    resume_ids: List[str] = Field(default_factory=list)  # Stored Resume ids owned by the user
+    top_k: Optional[int] = Field(None, ge=1)
+    
+    @model_validator(mode='after')
+    def validate_has_resumes(self) -> 'BatchScoreRequest':
+        if not self.resumes and not self.resume_ids:
+            raise ValueError("Provide resumes or resume_ids")
+        return self
+
+class SemanticScoreRequest(BaseModel):
+    resume_text: str = Field(..., min_length=1)
+    job_description: str = Field(..., min_length=1)
+
+class JobSubmitRequest(BaseModel):
+    kind: Literal["cv", "portfolio_from_resume", "optimize_resume"]
+    payload: Dict[str, Any]  # Body of the matching endpoint's request
+
+class ResumeSearchRequest(BaseModel):
+    query: str = Field(..., min_length=1)  # Typically a job description
+    top_k: int = Field(10, ge=1, le=100)
+
+class ScoringSessionCreateRequest(BaseModel):
+    resume_text: str
+    job_description: str
+
+class ParagraphEdit(BaseModel):
+    start: int = Field(..., ge=0)  # First paragraph replaced
+    end: Optional[int] = Field(None, ge=0)  # Paragraph after the last one replaced; defaults to start (insert)
+    paragraphs: List[str] = Field(default_factory=list)  # Replacement paragraphs; empty to delete
+    
+    @model_validator(mode='after')
+    def validate_range(self) -> 'ParagraphEdit':
+        if self.end is None:
+            self.end = self.start
+        if self.end < self.start:
+            raise ValueError("end must not be before start")
+        return self
+
+class ScoringSessionUpdateRequest(BaseModel):
+    resume_text: Optional[str] = None  # Full new text; only changed paragraphs are re-tokenized
+    job_description: Optional[str] = None
+    resume_edits: List[ParagraphEdit] = Field(default_factory=list)
+    job_edits: List[ParagraphEdit] = Field(default_factory=list)
+    base_revision: Optional[int] = None  # Reject the update if the session has moved past this revision
+
 # Authentication
 def get_current_user(request: Request, db: Session = Depends(get_db)) -> dict:
     """Dependency to get the current authenticated user."""
@@ -361,6 +461,18 @@ async def cleanup_file(file_path: str, delay: int = 0) -> None:
     except Exception as e:
         logger.error(f"Error during file cleanup for {file_path}: {e}", exc_info=True)
 
+def sse_event(event: str, data: Any) -> str:
+    """Format a server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def sse_response(events) -> StreamingResponse:
+    """Wrap an async iterator of SSE strings in a non-buffered streaming response."""
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Routes
 @app.get("/", response_class=HTMLResponse)
 async def root():
@@ -425,6 +537,15 @@ async def health_check():
     """Health check endpoint."""
     return {"status": "ok", "message": "PortfolioAI Backend is running"}
 
+@app.get("/api/llm/stats")
+async def llm_stats():
+    """Runtime statistics for the LLM request path (cache hit/miss counters, etc.)."""
+    return {
+        "status": "success",
+        "stats": groq_client.get_stats(),
+        "dropped_log_records": dropped_records()
+    }
+
 @app.get("/p/{subdomain}", response_class=HTMLResponse)
 async def view_portfolio_by_subdomain(
     subdomain: str,
@@ -684,35 +805,32 @@ async def upload_portfolio_resume(
         # Get user_id from the current_user dictionary
         user_id = current_user.get('id', 'unknown')
         
-        # Validate file type
+        # Accepted file types
         allowed_types = ["application/pdf", 
                         "application/vnd.openxmlformats-officedocument.wordprocessingml.document", 
                         "text/plain"]
         
-        if file.content_type not in allowed_types:
-            error_msg = f"File type {file.content_type} not supported. Please upload a PDF, DOCX, or TXT file."
-            logger.error(f"[PORTFOLIO_UPLOAD_RESUME_VALIDATION_ERROR] {error_msg}")
-            raise HTTPException(
-                status_code=400,
-                detail=error_msg
-            )
-        
-        # Read file content
-        file_content = await file.read()
-        
-        # Generate a unique ID for the resume
-        resume_id = str(uuid.uuid4())
+        # Streamed to disk in one pass; the type is checked against the file's content
+        # and a known file skips text extraction
+        resume, created = await resume_store.store(db, file, user_id, allowed_types=allowed_types)
         
-        # In a real implementation, you would process the resume here
-        # For now, we'll just return the resume_id
+        logger.info(f"[PORTFOLIO_UPLOAD_RESUME_SUCCESS] Successfully processed resume. Resume ID: {resume.id}, new: {created}")
         
-        logger.info(f"[PORTFOLIO_UPLOAD_RESUME_SUCCESS] Successfully processed resume. Resume ID: {resume_id}")
-        
-        return {"resume_id": resume_id}
+        return {"resume_id": resume.id}
         
     except HTTPException as he:
         logger.error(f"[PORTFOLIO_UPLOAD_RESUME_HTTP_ERROR] Detail: {he.detail}, Status Code: {he.status_code}", exc_info=True)
         raise
+    except UnsupportedFileTypeError as ue:
+        error_msg = f"{str(ue)}. Please upload a PDF, DOCX, or TXT file."
+        logger.error(f"[PORTFOLIO_UPLOAD_RESUME_VALIDATION_ERROR] {error_msg}")
+        raise HTTPException(status_code=400, detail=error_msg)
+    except UploadTooLargeError as te:
+        logger.error(f"[PORTFOLIO_UPLOAD_RESUME_VALIDATION_ERROR] {str(te)}")
+        raise HTTPException(status_code=413, detail=str(te))
+    except ExtractionError as ee:
+        logger.error(f"[PORTFOLIO_UPLOAD_RESUME_EXTRACTION_ERROR] {str(ee)}")
+        raise HTTPException(status_code=422, detail=str(ee))
     except Exception as e:
         logger.error(f"[PORTFOLIO_UPLOAD_RESUME_ERROR] Error: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -998,9 +1116,7 @@ async def generate_portfolio(
         # Save uploaded file temporarily
         file_ext = os.path.splitext(file.filename)[1].lower()
         temp_file = get_temp_file(file_ext)
-        
-        with open(temp_file, "wb") as f:
-            f.write(await file.read())
+        await save_upload_file(file, temp_file)
         
         # Generate portfolio
         html_path = await portfolio_builder.build_from_resume(temp_file, template=template)
@@ -1042,21 +1158,26 @@ async def generate_portfolio(
                         f"Failed to clean up temp file {temp_file}: "
                         f"{str(cleanup_error)}"
                     )
-        raise HTTPException(status_code=500, detail=str(e))
+        # Unreadable or oversized documents are the upload's fault, not the server's
+        if isinstance(e, UploadTooLargeError):
+            raise HTTPException(status_code=413, detail=str(e))
+        raise HTTPException(status_code=422 if isinstance(e, ExtractionError) else 500, detail=str(e))
 
 @app.post("/api/cv/generate", response_model=Dict[str, Any])
 async def generate_cv(
     request: CVGenerationRequest,
-    background_tasks: BackgroundTasks,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """
-    Generate a CV based on the provided data with timeout and proper cleanup.
+    Generate a CV based on the provided data with timeout.
     
     This endpoint accepts CV data and generates a CV in the specified format.
-    The generated CV is returned as a base64-encoded string in the response.
+    The generated CV is returned as a base64-encoded string in the response,
+    and saved so /api/cv/download/{cv_id} can serve it again in any format.
+    Rendered files are cached by their markdown, so formats already rendered
+    for the same CV content are not rendered again.
     """
-    output_file = None
     logger.info("Starting CV generation request")
     
     try:
@@ -1067,59 +1188,20 @@ async def generate_cv(
         # Log the request details (without sensitive data)
         logger.info(f"Generating CV in {request.format} format for user {current_user['id']}")
         
+        async def generate():
+            markdown_content = await cv_generator.generate_markdown(cv_data)
+            artifact = await cv_generator.render(markdown_content, request.format, request.template)
+            return markdown_content, artifact
+        
         # Set a timeout for the entire CV generation process
         try:
-            # Generate the CV file with a timeout
-            logger.info("Starting CV generation with timeout")
-            
-            # Use asyncio.shield to prevent cancellation during cleanup
-            output_file = await asyncio.wait_for(
-                asyncio.shield(cv_generator.generate_cv(
-                    cv_data=cv_data,
-                    output_format=request.format
-                )),
+            # Use asyncio.shield so the cached render completes even if this request gives up
+            markdown_content, artifact = await asyncio.wait_for(
+                asyncio.shield(generate()),
                 timeout=180  # 3 minutes total timeout
             )
-            logger.info(f"CV generation completed successfully. Output file: {output_file}")
+            logger.info(f"CV generation completed successfully. Output file: {artifact.path}")
             
-            # Read the generated file
-            try:
-                with open(output_file, 'rb') as f:
-                    file_content = f.read()
-                
-                # Determine content type based on format
-                content_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                if request.format == 'pdf':
-                    content_type = "application/pdf"
-                elif request.format == 'md':
-                    content_type = "text/markdown"
-                
-                # Generate a unique CV ID
-                cv_id = str(uuid.uuid4())
-                
-                # Schedule cleanup of the temporary file
-                background_tasks.add_task(cleanup_file, output_file, delay=3600)  # Clean up after 1 hour
-                
-                # Return the response with the CV ID and file info
-                return {
-                    "status": "success",
-                    "cv_id": cv_id,
-                    "content": base64.b64encode(file_content).decode('utf-8'),
-                    "content_type": content_type,
-                    "filename": f"cv_{cv_id}.{request.format}",
-                    "format": request.format
-                }
-                
-            except Exception as e:
-                logger.error(f"Error reading generated CV file: {str(e)}", exc_info=True)
-                # Ensure we clean up the file if it exists
-                if output_file and os.path.exists(output_file):
-                    try:
-                        os.remove(output_file)
-                    except Exception as cleanup_error:
-                        logger.warning(f"Failed to clean up file {output_file}: {str(cleanup_error)}")
-                raise RuntimeError("Failed to read generated CV file")
-                
         except asyncio.TimeoutError:
             logger.error("CV generation timed out after 3 minutes")
             raise HTTPException(
@@ -1127,11 +1209,48 @@ async def generate_cv(
                 detail="CV generation timed out. Please try again with a smaller CV or different format."
             )
         except asyncio.CancelledError:
+            # Propagate, so a cancelled caller (a disconnected client or a stopping job worker) stops
             logger.warning("CV generation was cancelled")
-            raise HTTPException(
-                status_code=500,
-                detail="CV generation was cancelled"
-            )
+            raise
+        
+        # Read the generated file; it stays in the artifact cache for later downloads
+        try:
+            with open(artifact.path, 'rb') as f:
+                file_content = f.read()
+        except Exception as e:
+            logger.error(f"Error reading generated CV file: {str(e)}", exc_info=True)
+            raise RuntimeError("Failed to read generated CV file")
+        
+        # Save the CV so it can be downloaded again, in this or another format
+        cv_id = str(uuid.uuid4())
+        try:
+            name = request.personal_info.name
+            db.add(CV(
+                id=cv_id,
+                user_id=current_user["id"],
+                title=f"{name} CV" if name else "CV",
+                file_path=str(artifact.path),
+                file_type=artifact.output_format,
+                content={
+                    "cv_data": cv_data,
+                    "markdown": markdown_content,
+                    "template": request.template
+                }
+            ))
+            db.commit()
+        except Exception as e:
+            logger.error(f"Failed to save CV {cv_id}: {str(e)}")
+            db.rollback()
+        
+        # Return the response with the CV ID and file info
+        return {
+            "status": "success",
+            "cv_id": cv_id,
+            "content": base64.b64encode(file_content).decode('utf-8'),
+            "content_type": artifact.media_type,
+            "filename": f"cv_{cv_id}.{artifact.output_format}",
+            "format": artifact.output_format
+        }
             
     except HTTPException:
         raise
@@ -1142,20 +1261,41 @@ async def generate_cv(
             status_code=500,
             detail=f"Failed to generate CV: {str(e)}"
         )
-        
-    finally:
-        # Ensure cleanup of the temporary file in case of any errors
-        if output_file and os.path.exists(output_file) and not os.path.getsize(output_file):
-            try:
-                os.remove(output_file)
-            except Exception as cleanup_error:
-                logger.warning(f"Failed to clean up file {output_file}: {str(cleanup_error)}")
-        # Schedule the final cleanup via background task if the file still exists and has content
-        # (or if output_file was defined but generation failed before content was written)
-        if output_file: # Ensure output_file is defined
-            cleanup_delay = 600 # 10 minutes, same as original logic
-            background_tasks.add_task(cleanup_file, output_file, delay=cleanup_delay)
-            logger.info(f"Scheduled final cleanup for {output_file} in {cleanup_delay} seconds.")
+
+@app.post("/api/cv/generate/stream")
+async def generate_cv_stream(
+    request: CVGenerationRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Stream the enhanced CV markdown as server-sent events.
+    
+    Emits `delta` events with `{"text": ...}` as content is generated and a final
+    `done` event with the complete markdown. Falls back to the local CV template
+    if the AI service is unavailable before any content was produced.
+    """
+    cv_data = request.model_dump()
+    cv_data['user_id'] = current_user['id']
+    logger.info(f"Streaming CV generation for user {current_user['id']}")
+    
+    async def events():
+        parts = []
+        try:
+            async for delta in cv_generator.groq_client.stream_cv(cv_data):
+                parts.append(delta)
+                yield sse_event("delta", {"text": delta})
+        except Exception as e:
+            if parts:
+                logger.error(f"CV stream interrupted: {str(e)}")
+                yield sse_event("error", {"detail": f"CV generation interrupted: {str(e)}"})
+                return
+            logger.warning(f"Error streaming CV from Groq: {str(e)}, falling back to local generation")
+            fallback = cv_generator._generate_fallback_cv(cv_data)
+            parts = [fallback]
+            yield sse_event("delta", {"text": fallback})
+        yield sse_event("done", {"status": "success", "markdown": "".join(parts)})
+    
+    return sse_response(events())
 
 @app.post("/api/cover-letter/upload-resume", response_model=Dict[str, str])
 async def upload_resume(
@@ -1180,65 +1320,30 @@ async def upload_resume(
             
         logger.info(f"[UPLOAD_RESUME_PROCESSING] Processing resume upload for user_id: {user_id}")
         
-        # Validate file type
+        # Accepted file types
         allowed_types = ["application/pdf", "application/vnd.openxmlformats-officedocument.wordprocessingml.document", "text/plain"]
-        if file.content_type not in allowed_types:
-            error_msg = f"File type {file.content_type} not supported. Please upload a PDF, DOCX, or TXT file."
-            logger.error(f"[UPLOAD_RESUME_VALIDATION_ERROR] {error_msg}")
-            raise HTTPException(
-                status_code=400,
-                detail=error_msg
-            )
         
-        logger.info(f"[UPLOAD_RESUME_CALL_SERVICE] Calling cover_letter_generator.upload_resume for file: {file.filename}")
+        # Streamed to disk in one pass; the type is checked against the file's content
+        # and a known file skips text extraction
+        resume, created = await resume_store.store(db, file, user_id, allowed_types=allowed_types)
         
-        # Ensure file pointer is at the start
-        await file.seek(0)
+        logger.info(f"[UPLOAD_RESUME_SUCCESS] Successfully processed resume. Resume ID: {resume.id}, User ID: {user_id}, new: {created}")
         
-        # Create a new UploadFile object to ensure it's in a clean state
-        from fastapi import UploadFile
-        from tempfile import SpooledTemporaryFile
-        
-        # Read the file content
-        file_content = await file.read()
-        
-        # Create a new SpooledTemporaryFile
-        temp_file = SpooledTemporaryFile()
-        temp_file.write(file_content)
-        temp_file.seek(0)
-        
-        # Create a new UploadFile with the same content
-        new_file = UploadFile(
-            filename=file.filename,
-            file=temp_file,
-            content_type=file.content_type
-        )
-        
-        try:
-            # Call the service with the new file object
-            result = await cover_letter_generator.upload_resume(new_file)
-            logger.info(f"[UPLOAD_RESUME_SERVICE_RESULT] Result from service: {result}")
-
-            if not result or 'resume_id' not in result:
-                error_msg = "Failed to process resume: No resume_id in response from service"
-                logger.error(f"[UPLOAD_RESUME_SERVICE_ERROR] {error_msg}. Result: {result}")
-                raise HTTPException(
-                    status_code=500,
-                    detail=error_msg
-                )
-        finally:
-            # Ensure the temporary file is closed
-            await new_file.close()
-            temp_file.close()
-        
-        resume_id_from_result = result['resume_id']
-        logger.info(f"[UPLOAD_RESUME_SUCCESS] Successfully processed resume. Resume ID: {resume_id_from_result}, User ID: {user_id}")
-        
-        return {"resume_id": resume_id_from_result}
+        return {"resume_id": resume.id}
         
     except HTTPException as he:
         logger.error(f"[UPLOAD_RESUME_HTTP_ERROR] Detail: {he.detail}, Status Code: {he.status_code}", exc_info=True)
         raise
+    except UnsupportedFileTypeError as ue:
+        error_msg = f"{str(ue)}. Please upload a PDF, DOCX, or TXT file."
+        logger.error(f"[UPLOAD_RESUME_VALIDATION_ERROR] {error_msg}")
+        raise HTTPException(status_code=400, detail=error_msg)
+    except UploadTooLargeError as te:
+        logger.error(f"[UPLOAD_RESUME_VALIDATION_ERROR] {str(te)}")
+        raise HTTPException(status_code=413, detail=str(te))
+    except ExtractionError as ee:
+        logger.error(f"[UPLOAD_RESUME_EXTRACTION_ERROR] {str(ee)}")
+        raise HTTPException(status_code=422, detail=str(ee))
     except AttributeError as ae:
         logger.error(f"[UPLOAD_RESUME_ATTRIBUTE_ERROR] Error: {str(ae)}. Current user state: {current_user}", exc_info=True)
         raise HTTPException(
@@ -1527,10 +1632,74 @@ async def legacy_generate_cover_letter(
         logger.error(f"Error generating cover letter: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/cover-letter/generate/stream")
+async def generate_cover_letter_stream(
+    request: CoverLetterRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Stream a cover letter as server-sent events.
+    
+    - **job_description**: The job description to target
+    - **resume_text**: The applicant's resume content
+    - **tone**: The desired tone (professional, enthusiastic, formal, etc.)
+    
+    Emits `delta` events with `{"text": ...}` and a final `done` event with the full letter.
+    The letter is saved to the database once generation completes.
+    """
+    user_id = current_user.get('id')
+    if not user_id:
+        raise HTTPException(status_code=400, detail="User ID not found in authentication token")
+    
+    async def events():
+        parts = []
+        try:
+            async for delta in groq_client.stream_cover_letter(
+                resume_text=request.resume_text,
+                job_description=request.job_description,
+                tone=request.tone
+            ):
+                parts.append(delta)
+                yield sse_event("delta", {"text": delta})
+        except Exception as e:
+            logger.error(f"Error streaming cover letter: {str(e)}", exc_info=True)
+            yield sse_event("error", {"detail": f"Failed to generate cover letter: {str(e)}"})
+            return
+        
+        cover_letter_text = "".join(parts).strip()
+        db = SessionLocal()
+        try:
+            db.add(CoverLetter(
+                user_id=user_id,
+                title=f"Cover Letter for {request.job_description[:50]}..." if request.job_description else "Generated Cover Letter",
+                content={
+                    "text": cover_letter_text,
+                    "job_description": request.job_description,
+                    "tone": request.tone,
+                    "status": "completed"
+                }
+            ))
+            db.add(APICall(
+                user_id=user_id,
+                endpoint="/api/cover-letter/generate/stream",
+                method="POST",
+                status_code=200
+            ))
+            db.commit()
+        except Exception as e:
+            logger.error(f"Failed to save streamed cover letter: {str(e)}")
+            db.rollback()
+        finally:
+            db.close()
+        
+        yield sse_event("done", {"status": "success", "cover_letter": cover_letter_text})
+    
+    return sse_response(events())
+
 @app.get("/api/cv/download/{cv_id}")
 async def download_cv(
     cv_id: str,
-    background_tasks: BackgroundTasks = BackgroundTasks(),
+    format: Optional[Literal["docx", "pdf", "md"]] = None,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -1538,6 +1707,10 @@ async def download_cv(
     Download a generated CV file.
     
     - **cv_id**: The ID of the CV to download
+    - **format**: `docx`, `pdf` or `md`; defaults to the format it was generated in
+    
+    Files are served from the artifact cache and rendered again from the
+    saved markdown only if they are not cached.
     """
     try:
         # Get CV from database
@@ -1549,16 +1722,22 @@ async def download_cv(
         if not cv:
             raise HTTPException(status_code=404, detail="CV not found or access denied")
         
-        if not cv.file_path or not os.path.exists(cv.file_path):
-            raise HTTPException(status_code=404, detail="CV file not found on server")
-        
-        # Determine content type based on file extension
-        if cv.file_type == 'docx':
-            media_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-        elif cv.file_type == 'pdf':
-            media_type = "application/pdf"
-        else:  # Default to markdown
-            media_type = "text/markdown"
+        content = cv.content if isinstance(cv.content, dict) else {}
+        if content.get("markdown"):
+            artifact = await cv_generator.render(
+                content["markdown"],
+                format or cv.file_type,
+                content.get("template", "modern")
+            )
+            file_path, file_type, media_type = str(artifact.path), artifact.output_format, artifact.media_type
+        else:
+            # Saved without its markdown, so only the stored file can be served
+            if format and format != cv.file_type:
+                raise HTTPException(status_code=400, detail=f"This CV is only available as {cv.file_type}")
+            if not cv.file_path or not os.path.exists(cv.file_path):
+                raise HTTPException(status_code=404, detail="CV file not found on server")
+            file_path, file_type = cv.file_path, cv.file_type
+            media_type = MEDIA_TYPES.get(cv.file_type, MEDIA_TYPES["md"])
         
         # Log the download
         try:
@@ -1574,18 +1753,10 @@ async def download_cv(
             logger.error(f"Failed to log API call: {str(e)}")
             db.rollback()
         
-        # Schedule cleanup of the file after 60 seconds
-        background_tasks.add_task(
-            cleanup_file,
-            file_path=cv.file_path,
-            delay=60,
-            background_tasks=background_tasks
-        )
-        
         # Return the file as a response
         return FileResponse(
-            path=cv.file_path,
-            filename=f"cv_{cv.id}.{cv.file_type}",
+            path=file_path,
+            filename=f"cv_{cv.id}.{file_type}",
             media_type=media_type
         )
         
@@ -2086,6 +2257,11 @@ async def optimize_resume(
         )
         
         logger.info(f"Optimization completed. Score: {optimization_result.get('score', 'N/A')}")
+        
+        semantic_score = None
+        if request.job_description and semantic_search is not None:
+            semantic = await asyncio.to_thread(semantic_search.score, request.resume_text, request.job_description)
+            semantic_score = semantic["score"]
         logger.debug(f"Optimization result keys: {list(optimization_result.keys())}")
         
         # Create a database record for the optimization
@@ -2129,7 +2305,8 @@ async def optimize_resume(
             "score": optimization_result.get("score", 0.0),
             "suggestions": optimization_result.get("suggestions", []),
             "keywords_matched": optimization_result.get("keywords_matched", []),
-            "missing_keywords": optimization_result.get("missing_keywords", [])
+            "missing_keywords": optimization_result.get("missing_keywords", []),
+            "semantic_score": semantic_score
         }
         
     except ValidationError as ve:
@@ -2153,6 +2330,412 @@ async def optimize_resume(
             "error_type": type(e).__name__
         }
 
+@app.post("/api/optimize/resume/stream")
+async def optimize_resume_stream(
+    request: OptimizationRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Stream a resume optimization as server-sent events.
+    
+    - **resume_text**: The current resume text to optimize
+    - **job_description**: The job description to optimize for
+    
+    Emits `delta` events with the raw model output as it is generated and a final
+    `done` event carrying the same fields as `/api/optimize/resume`.
+    """
+    user_id = current_user["id"]
+    
+    async def events():
+        parts = []
+        result = None
+        try:
+            async for delta in groq_client.stream_resume_optimization(
+                resume_text=request.resume_text,
+                job_description=request.job_description
+            ):
+                parts.append(delta)
+                yield sse_event("delta", {"text": delta})
+        except CircuitOpenError as e:
+            # Raised before any delta is sent; score locally instead of failing
+            logger.warning(f"Groq circuit is open, using local resume scoring: {str(e)}")
+            result = resume_optimizer._local_optimization(request.resume_text, request.job_description)
+        except Exception as e:
+            logger.error(f"Error streaming resume optimization: {str(e)}", exc_info=True)
+            yield sse_event("error", {"detail": f"Error optimizing resume: {str(e)}"})
+            return
+        
+        try:
+            if result is None:
+                result = groq_client._parse_optimization_response("".join(parts))
+        except Exception as e:
+            logger.error(f"Failed to parse streamed optimization response: {str(e)}")
+            yield sse_event("done", {
+                "status": "error",
+                "message": "Failed to parse optimization response",
+                "detail": str(e),
+                "optimized_text": request.resume_text,
+                "score": 0.0,
+                "suggestions": [],
+                "keywords_matched": [],
+                "missing_keywords": []
+            })
+            return
+        
+        optimization_id = str(uuid.uuid4())
+        db = SessionLocal()
+        try:
+            db.add(ResumeOptimization(
+                id=optimization_id,
+                user_id=user_id,
+                original_text=request.resume_text,
+                optimized_text=result.get("optimized_text", request.resume_text),
+                job_description=request.job_description,
+                score=result.get("score", 0.0),
+                suggestions=result.get("suggestions", [])[:5],
+                keywords_matched=result.get("keywords_matched", []),
+                missing_keywords=result.get("missing_keywords", [])
+            ))
+            db.add(APICall(
+                user_id=user_id,
+                endpoint="/api/optimize/resume/stream",
+                method="POST",
+                status_code=200
+            ))
+            db.commit()
+        except Exception as e:
+            logger.error(f"Failed to save streamed optimization: {str(e)}")
+            db.rollback()
+        finally:
+            db.close()
+        
+        yield sse_event("done", {
+            "status": "success",
+            "message": "Resume optimized successfully",
+            "optimization_id": optimization_id,
+            "optimized_text": result.get("optimized_text", request.resume_text),
+            "score": result.get("score", 0.0),
+            "suggestions": result.get("suggestions", [])[:5],
+            "keywords_matched": result.get("keywords_matched", []),
+            "missing_keywords": result.get("missing_keywords", [])
+        })
+    
+    return sse_response(events())
+
+@app.post("/api/ats/score/batch")
+async def score_resumes_batch(
+    request: BatchScoreRequest,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Rank many resumes against one job description with rule-based ATS scoring.
+    
+    - **job_description**: The job posting to score against
+    - **resumes**: Resume texts, each with an optional caller id
+    - **resume_ids**: Ids of stored resumes to include
+    - **top_k**: Return only the best top_k results
+    
+    No AI calls are made. Results are sorted by score and include matched and
+    missing keywords; `not_found` lists resume_ids that could not be scored.
+    """
+    resumes = [
+        ResumeInput(id=item.id or str(index), text=item.text)
+        for index, item in enumerate(request.resumes)
+    ]
+    not_found: List[str] = []
+    if request.resume_ids:
+        rows = db.query(Resume.id, Resume.content).filter(
+            Resume.id.in_(request.resume_ids),
+            Resume.user_id == current_user["id"]
+        ).all()
+        contents = {row.id: row.content for row in rows if row.content}
+        resumes.extend(ResumeInput(id=resume_id, text=contents[resume_id]) for resume_id in request.resume_ids if resume_id in contents)
+        not_found = [resume_id for resume_id in request.resume_ids if resume_id not in contents]
+    
+    if not resumes:
+        raise HTTPException(status_code=404, detail="None of the requested resumes were found")
+    
+    try:
+        result = await batch_scorer.score(request.job_description, resumes, top_k=request.top_k)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {"status": "success", "not_found": not_found, **result}
+
+def _get_scoring_session(session_id: str, current_user: dict):
+    try:
+        return scoring_sessions.get(session_id, current_user["id"])
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Scoring session not found or expired")
+
+@app.post("/api/ats/sessions", status_code=status.HTTP_201_CREATED)
+async def create_scoring_session(
+    request: ScoringSessionCreateRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Start an incremental ATS scoring session for a resume and job description.
+    
+    - **resume_text**: The resume text
+    - **job_description**: The job description to score against
+    
+    The texts are kept tokenized per paragraph (paragraphs are separated by
+    blank lines), so later edits via PATCH re-score in time proportional to
+    the edit. No AI calls are made.
+    """
+    try:
+        session = scoring_sessions.create(request.resume_text, request.job_description, owner=current_user["id"])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "success", **session.result()}
+
+@app.patch("/api/ats/sessions/{session_id}")
+async def update_scoring_session(
+    session_id: str,
+    request: ScoringSessionUpdateRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Apply edits to a scoring session and return the updated score.
+    
+    - **resume_text** / **job_description**: Full new texts, diffed against the stored paragraphs
+    - **resume_edits** / **job_edits**: Paragraph splices applied in order, each replacing
+      paragraphs[start:end] with `paragraphs`
+    - **base_revision**: If set, the update is rejected with 409 unless the session is at this revision
+    """
+    _get_scoring_session(session_id, current_user)
+    try:
+        session = scoring_sessions.update(
+            session_id,
+            owner=current_user["id"],
+            resume_text=request.resume_text,
+            job_description=request.job_description,
+            resume_edits=[edit.model_dump() for edit in request.resume_edits],
+            job_edits=[edit.model_dump() for edit in request.job_edits],
+            base_revision=request.base_revision
+        )
+    except SessionConflictError as e:
+        raise HTTPException(status_code=409, detail=f"Session has changed since revision {request.base_revision}; current revision is {e.revision}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "success", **session.result()}
+
+@app.get("/api/ats/sessions/{session_id}")
+async def get_scoring_session(
+    session_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get the current score of a scoring session."""
+    session = _get_scoring_session(session_id, current_user)
+    return {"status": "success", **session.result()}
+
+@app.delete("/api/ats/sessions/{session_id}")
+async def delete_scoring_session(
+    session_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """End a scoring session."""
+    _get_scoring_session(session_id, current_user)
+    scoring_sessions.delete(session_id, current_user["id"])
+    return {"status": "success", "message": "Scoring session deleted"}
+
+def _require_semantic_search():
+    if semantic_search is None:
+        raise HTTPException(status_code=503, detail="Semantic search is unavailable (NumPy is not installed)")
+    return semantic_search
+
+@app.post("/api/ats/score/semantic")
+async def score_resume_semantic(
+    request: SemanticScoreRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Score how semantically close a resume is to a job description, computed locally.
+    
+    - **resume_text**: The resume text
+    - **job_description**: The job description to compare against
+    
+    Returns the embedding similarity (0-100) overall and per resume section,
+    next to the rule-based keyword score. No AI calls are made.
+    """
+    search = _require_semantic_search()
+    semantic, (keyword_score, _) = await asyncio.gather(
+        asyncio.to_thread(search.score, request.resume_text, request.job_description),
+        asyncio.to_thread(calculate_ats_score, request.resume_text, request.job_description)
+    )
+    return {
+        "status": "success",
+        **semantic,
+        "keyword_score": keyword_score
+    }
+
+@app.post("/api/resumes/search")
+async def search_resumes(
+    request: ResumeSearchRequest,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Find the user's stored resumes most similar to a query such as a job description.
+    
+    - **query**: Text to search with
+    - **top_k**: Maximum number of results
+    """
+    search = _require_semantic_search()
+    hits = await search.search(db, request.query, user_id=current_user["id"], top_k=request.top_k)
+    
+    rows = {
+        row.id: row
+        for row in db.query(Resume.id, Resume.original_filename, Resume.created_at).filter(
+            Resume.id.in_([hit["resume_id"] for hit in hits])
+        ).all()
+    }
+    results = []
+    for hit in hits:
+        row = rows.get(hit["resume_id"])
+        if row is None:
+            # Deleted while the search ran
+            continue
+        results.append({
+            **hit,
+            "filename": row.original_filename,
+            "created_at": row.created_at.isoformat() if row.created_at else None
+        })
+    
+    return {"status": "success", "results": results}
+
+@app.get("/api/resumes/{resume_id}")
+async def get_resume(
+    resume_id: str,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get a stored resume's text and AI analysis.
+    
+    The analysis is shared by every upload of the same file, so it is only
+    computed for the first one.
+    """
+    resume = db.query(Resume).filter(
+        Resume.id == resume_id,
+        Resume.user_id == current_user["id"]
+    ).first()
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    
+    analysis = await resume_store.analyze(db, resume)
+    return {
+        "status": "success",
+        "resume_id": resume.id,
+        "filename": resume.original_filename,
+        "file_type": resume.file_type,
+        "content": resume.content,
+        "analysis": analysis,
+        "created_at": resume.created_at.isoformat() if resume.created_at else None
+    }
+
+# Background jobs: each kind runs the endpoint of the same request in a job worker
+JOB_REQUEST_MODELS = {
+    "cv": CVGenerationRequest,
+    "portfolio_from_resume": ResumePortfolioRequest,
+    "optimize_resume": OptimizationRequest
+}
+
+async def _run_cv_job(payload: Dict[str, Any], current_user: dict, db: Session) -> Dict[str, Any]:
+    return await generate_cv(CVGenerationRequest(**payload), current_user, db)
+
+async def _run_portfolio_job(payload: Dict[str, Any], current_user: dict, db: Session) -> Dict[str, Any]:
+    response = await generate_portfolio_from_resume(ResumePortfolioRequest(**payload), current_user, db)
+    return json.loads(response.body)
+
+async def _run_optimize_job(payload: Dict[str, Any], current_user: dict, db: Session) -> Dict[str, Any]:
+    result = await optimize_resume(OptimizationRequest(**payload), current_user, db)
+    if result.get("status") == "error":
+        # The endpoint reports failures in its body; a job reports them in its status
+        raise HTTPException(
+            status_code=422 if result.get("error_type") == "ValidationError" else 500,
+            detail=result.get("detail") or result.get("message")
+        )
+    return result
+
+job_queue.register("cv", _run_cv_job)
+job_queue.register("portfolio_from_resume", _run_portfolio_job)
+job_queue.register("optimize_resume", _run_optimize_job)
+
+def _get_owned_job(db: Session, job_id: str, current_user: dict) -> Job:
+    job = db.query(Job).filter(Job.id == job_id, Job.user_id == current_user["id"]).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.post("/api/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(
+    request: JobSubmitRequest,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Run a long generation request in the background and return its job id at once.
+    
+    - **kind**: `cv` (/api/cv/generate), `portfolio_from_resume`
+      (/api/portfolio/generate/from-resume) or `optimize_resume` (/api/optimize/resume)
+    - **payload**: The request body that endpoint takes
+    
+    Poll `status_url` or follow `events_url` until the status is `succeeded`
+    (the endpoint's response is in `result`) or `failed` (see `error`).
+    """
+    try:
+        payload = JOB_REQUEST_MODELS[request.kind].model_validate(request.payload)
+    except ValidationError as ve:
+        raise HTTPException(status_code=422, detail=json.loads(ve.json()))
+    
+    try:
+        job = job_queue.submit(db, request.kind, payload.model_dump(mode="json"), current_user["id"])
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    return {
+        **job_to_dict(job),
+        "status_url": f"/api/jobs/{job.id}",
+        "events_url": f"/api/jobs/{job.id}/events"
+    }
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(
+    job_id: str,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get a background job's status, and its result once it has finished."""
+    return job_to_dict(_get_owned_job(db, job_id, current_user))
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(
+    job_id: str,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Follow a background job as server-sent events.
+    
+    Emits a `status` event with `{"job_id", "status"}` whenever the status
+    changes and a final `done` event with the finished job, as returned by
+    `/api/jobs/{job_id}`.
+    """
+    _get_owned_job(db, job_id, current_user)
+    
+    async def events():
+        async for job in job_queue.watch(job_id):
+            if job is None:
+                yield ": keep-alive\n\n"
+            elif job["status"] in FINISHED:
+                yield sse_event("done", job)
+            else:
+                yield sse_event("status", {"job_id": job_id, "status": job["status"]})
+    
+    return sse_response(events())
+
 if __name__ == "__main__":
     import uvicorn
     
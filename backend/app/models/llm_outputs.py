@@ -0,0 +1,84 @@
+"""
+Pydantic schemas for structured LLM output.
+
+GroqClient.generate_json builds its format instructions from these models and
+validates completions against them. Every field has a default, so a response
+that leaves something out still validates, and values models commonly get
+slightly wrong (null, numbers for text, a comma-separated string instead of a
+list) are coerced instead of rejected.
+"""
+import re
+from typing import Any, Dict, List
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+
+def _split_list(value: Any) -> Any:
+    """Turn a newline-, bullet- or comma-separated string into a list of strings."""
+    if isinstance(value, str):
+        separator = r'\n|•' if '\n' in value or '•' in value else r','
+        return [item.strip(" -*\t") for item in re.split(separator, value) if item.strip(" -*\t")]
+    return value
+
+
+class LLMOutput(BaseModel):
+    """Base class for LLM output schemas; lenient about nulls and scalar types."""
+    model_config = ConfigDict(extra="allow")
+
+    @model_validator(mode="before")
+    @classmethod
+    def _coerce_scalars(cls, data: Any) -> Any:
+        if not isinstance(data, dict):
+            return data
+        coerced: Dict[str, Any] = {}
+        for key, value in data.items():
+            if value is None:
+                # Leave the field unset so its default applies
+                continue
+            field = cls.model_fields.get(key)
+            if field is not None and field.annotation is str and isinstance(value, (int, float)):
+                value = str(value)
+            coerced[key] = value
+        return coerced
+
+
+class ExperienceEntry(LLMOutput):
+    """One position in a candidate's work history."""
+    title: str = Field("", description="Job title")
+    company: str = Field("", description="Company name")
+    start_date: str = Field("", description="Start date (YYYY-MM)")
+    end_date: str = Field("", description="End date (YYYY-MM), empty if current")
+    description: List[str] = Field(default_factory=list, description="Responsibilities and achievements, one per item")
+
+    @field_validator("description", mode="before")
+    @classmethod
+    def _split_description(cls, value: Any) -> Any:
+        return _split_list(value)
+
+
+class EducationEntry(LLMOutput):
+    """One degree or course of study."""
+    degree: str = Field("", description="Degree name")
+    institution: str = Field("", description="Institution name")
+    field_of_study: str = Field("", description="Field of study")
+    start_date: str = Field("", description="Start year (YYYY)")
+    end_date: str = Field("", description="End year (YYYY), empty if current")
+    gpa: str = Field("", description="GPA, if stated")
+
+
+class PortfolioData(LLMOutput):
+    """Structured portfolio content, in the shape the portfolio templates render."""
+    name: str = Field("", description="Full name")
+    title: str = Field("", description="Professional title or headline")
+    summary: str = Field("", description="Professional summary")
+    email: str = Field("", description="Email address")
+    phone: str = Field("", description="Phone number")
+    location: str = Field("", description="Location (City, Country)")
+    experience: List[ExperienceEntry] = Field(default_factory=list, description="Work experience, most recent first")
+    education: List[EducationEntry] = Field(default_factory=list, description="Education history")
+    skills: List[str] = Field(default_factory=list, description="Skills, one per item")
+
+    @field_validator("skills", mode="before")
+    @classmethod
+    def _split_skills(cls, value: Any) -> Any:
+        return _split_list(value)
@@ -0,0 +1,227 @@
+"""
+On-disk cache of rendered CV files.
+
+A CV's markdown is the input to every export of it: a DOCX, a PDF and the
+markdown file itself are pure functions of (markdown, format, template). The
+cache stores each rendered file under the SHA-256 of its markdown, its format
+and its template, so a second download of the same CV, a switch to another
+format and back, or a user generating the same CV again is served from disk
+without rendering anything.
+
+Concurrent requests for the same missing file share one render. Files are
+rendered to a temporary name in the cache directory and renamed into place,
+so a file is never seen half-written. The least recently used files are
+deleted once the cache holds more than max_bytes or max_entries; recency is
+kept in the files' modification times, so it survives a restart. Processes
+sharing the directory find each other's files, and each evicts by its own
+view of the directory.
+
+Configured with ARTIFACT_CACHE_DIR (default uploads/artifacts),
+ARTIFACT_CACHE_MAX_MB (default 256) and ARTIFACT_CACHE_MAX_ENTRIES (default
+2000).
+"""
+import os
+import re
+import uuid
+import hashlib
+import logging
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .render_pool import RenderError, render_pool
+from .single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPES = {
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "pdf": "application/pdf",
+    "md": "text/markdown",
+}
+
+TEMP_SUFFIX = ".tmp"
+
+
+@dataclass
+class Artifact:
+    """A rendered CV file in the cache."""
+
+    path: Path
+    output_format: str
+    size: int
+
+    @property
+    def media_type(self) -> str:
+        return MEDIA_TYPES[self.output_format]
+
+
+def markdown_hash(markdown_content: str) -> str:
+    """SHA-256 of CV markdown, the content part of an artifact's key."""
+    return hashlib.sha256(markdown_content.encode("utf-8")).hexdigest()
+
+
+class ArtifactCache:
+    """LRU cache of rendered CV files keyed by markdown hash, format and template."""
+
+    def __init__(
+        self,
+        cache_dir: str = "uploads/artifacts",
+        max_bytes: int = 256 * 1024 * 1024,
+        max_entries: int = 2000
+    ):
+        """
+        Initialize the cache. The directory is scanned on first use.
+
+        Args:
+            cache_dir: Directory the rendered files are stored in
+            max_bytes: Total size of the files kept
+            max_entries: Number of files kept
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+        self._loaded = False
+        self._flights = SingleFlight()
+        self._counters = Counter()
+
+    @staticmethod
+    def _name(digest: str, output_format: str, template: str) -> str:
+        # Templates come from request bodies; keep them out of the path syntax
+        template = re.sub(r"[^a-z0-9_-]", "_", (template or "default").lower())[:32]
+        return f"{digest}.{template}.{output_format}"
+
+    def _load(self) -> None:
+        """Index the files already in the cache directory, least recently used first."""
+        self._loaded = True
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        files = []
+        for path in self.cache_dir.iterdir():
+            if path.name.endswith(TEMP_SUFFIX):
+                # Left by a render interrupted by a crash or restart
+                path.unlink(missing_ok=True)
+            elif path.is_file():
+                stat = path.stat()
+                files.append((stat.st_mtime, path.name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._bytes += size
+        if files:
+            logger.info(f"Artifact cache loaded {len(files)} files ({self._bytes} bytes) from {self.cache_dir}")
+        self._evict()
+
+    def _add(self, name: str, size: int) -> None:
+        self._bytes += size - self._entries.pop(name, 0)
+        self._entries[name] = size
+        self._evict()
+
+    def _evict(self) -> None:
+        # The newest entry is the one being served, so it is always kept
+        while len(self._entries) > 1 and (self._bytes > self.max_bytes or len(self._entries) > self.max_entries):
+            name, size = self._entries.popitem(last=False)
+            self._bytes -= size
+            (self.cache_dir / name).unlink(missing_ok=True)
+            self._counters["evictions"] += 1
+
+    def _lookup(self, name: str) -> Optional[int]:
+        """Size of a cached file, marking it recently used, or None if it is not cached."""
+        path = self.cache_dir / name
+        try:
+            size = path.stat().st_size
+            # Recency survives restarts in the modification time
+            os.utime(path)
+        except FileNotFoundError:
+            # Evicted by another process sharing the directory
+            if name in self._entries:
+                self._bytes -= self._entries.pop(name)
+            return None
+        if name in self._entries:
+            self._entries.move_to_end(name)
+        else:
+            # Rendered by another process sharing the directory
+            self._add(name, size)
+        return size
+
+    async def _render(self, name: str, markdown_content: str, output_format: str) -> int:
+        self._counters["renders"] += 1
+        temp_path = self.cache_dir / f"{uuid.uuid4()}{TEMP_SUFFIX}"
+        try:
+            if output_format == "md":
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    f.write(markdown_content)
+            else:
+                await render_pool.render(output_format, markdown_content, str(temp_path))
+            size = temp_path.stat().st_size
+            if not size:
+                raise RenderError(f"Rendered {output_format} file is empty")
+            os.replace(temp_path, self.cache_dir / name)
+        finally:
+            temp_path.unlink(missing_ok=True)
+        self._add(name, size)
+        return size
+
+    async def fetch(self, markdown_content: str, output_format: str, template: str = "modern") -> Artifact:
+        """
+        Get the rendered file for CV markdown, rendering it only if it is not cached.
+
+        Args:
+            markdown_content: CV markdown
+            output_format: 'docx', 'pdf' or 'md'
+            template: CV template name
+
+        Returns:
+            Artifact: The cached file. It is owned by the cache and must not be deleted.
+
+        Raises:
+            ValueError: If the format is not supported
+            RenderError: If the file cannot be rendered
+        """
+        if output_format not in MEDIA_TYPES:
+            raise ValueError(f"Unsupported output format: {output_format}")
+        if not self._loaded:
+            self._load()
+
+        name = self._name(markdown_hash(markdown_content), output_format, template)
+        size = self._lookup(name)
+        if size is not None:
+            self._counters["hits"] += 1
+            logger.info(f"Serving cached {output_format} CV {name[:12]}")
+        else:
+            self._counters["misses"] += 1
+            size = await self._flights.do(
+                f"render:{name}",
+                lambda: self._render(name, markdown_content, output_format),
+                endpoint="artifact_cache"
+            )
+        return Artifact(path=self.cache_dir / name, output_format=output_format, size=size)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache size and hit counters."""
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "max_entries": self.max_entries,
+            "hits": self._counters["hits"],
+            "misses": self._counters["misses"],
+            "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+            "renders": self._counters["renders"],
+            "evictions": self._counters["evictions"],
+        }
+
+
+def create_artifact_cache_from_env() -> ArtifactCache:
+    """Create an ArtifactCache configured from ARTIFACT_CACHE_* environment variables."""
+    return ArtifactCache(
+        cache_dir=os.getenv("ARTIFACT_CACHE_DIR", "uploads/artifacts"),
+        max_bytes=int(float(os.getenv("ARTIFACT_CACHE_MAX_MB", "256")) * 1024 * 1024),
+        max_entries=int(os.getenv("ARTIFACT_CACHE_MAX_ENTRIES", "2000"))
+    )
+
+
+# Process-wide cache shared by all requests
+artifact_cache = create_artifact_cache_from_env()
@@ -0,0 +1,209 @@
+"""
+Batch ATS scoring for ranking many resumes against one job description.
+
+Built on scoring_rules: the job description's keywords are extracted once and
+shipped with each chunk of resumes to a process pool started from the shared
+fork server (app.utils.process_context). Each chunk is scored in one batched
+pass of the ATS scoring engine (app.utils.scoring_engine); the matched and
+missing keywords and suggestions, which need a dictionary per resume, are only
+built for the chunk's best top_k resumes, since no other resume can be among
+the results. Small batches are scored in a thread instead, since process
+start-up and pickling would outweigh the work. No LLM calls are made.
+
+Configured with ATS_BATCH_WORKERS (default: CPU count), ATS_BATCH_CHUNK_SIZE
+(resumes per task, default 250) and ATS_BATCH_MAX_RESUMES (default 5000).
+"""
+import os
+import time
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from ..utils.process_context import preload_in_workers, worker_context
+from ..utils.scoring_engine import ats_scoring_engine
+from ..utils.scoring_rules import extract_keywords, score_resume_for_keywords
+
+logger = logging.getLogger(__name__)
+
+# Import the scoring rules (and the skill taxonomy) once in the fork server rather than in every worker
+preload_in_workers(__name__)
+
+
+@dataclass
+class ResumeInput:
+    """A resume to score: caller-supplied id (or list position) and its text."""
+    id: str
+    text: str
+
+
+def _score_chunk(
+    job_keywords: Dict[str, int],
+    resumes: List[ResumeInput],
+    top_k: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Score a chunk of resumes; runs in a worker process.
+
+    Every resume gets its score. Only the chunk's best top_k (all, if top_k is
+    None) also get keyword details and suggestions; the caller ranks with the
+    same rounded scores and stable order, so the final top_k are among them.
+    """
+    scores = [
+        round(score, 1)
+        for score in ats_scoring_engine.score_keywords_against_resumes(job_keywords, [resume.text for resume in resumes])
+    ]
+    detailed = range(len(resumes))
+    if top_k is not None:
+        detailed = sorted(detailed, key=lambda index: scores[index], reverse=True)[:top_k]
+
+    results: List[Dict[str, Any]] = [{"id": resume.id, "score": score} for resume, score in zip(resumes, scores)]
+    for index in detailed:
+        scored = score_resume_for_keywords(resumes[index].text, job_keywords)
+        results[index].update({
+            "matched_keywords": list(scored["details"].get("matches", {})),
+            "missing_keywords": scored["details"].get("missing_keywords", []),
+            "suggestions": scored["suggestions"],
+        })
+    return results
+
+
+class BatchScorer:
+    """Scores and ranks resumes against a job description across a process pool."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        chunk_size: int = 250,
+        max_resumes: int = 5000
+    ):
+        """
+        Initialize the scorer. The process pool is started on first use.
+
+        Args:
+            max_workers: Worker processes. Defaults to the CPU count.
+            chunk_size: Resumes per pool task; batches no larger than this are scored in a thread
+            max_resumes: Maximum resumes accepted in one batch
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        self.max_resumes = max_resumes
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._batches = 0
+        self._resumes_scored = 0
+        self._pool_batches = 0
+        self._total_seconds = 0.0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Workers come from the shared fork server rather than forking the threaded server process
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=worker_context())
+        return self._pool
+
+    async def score(
+        self,
+        job_description: str,
+        resumes: Sequence[ResumeInput],
+        top_k: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Score resumes against a job description and rank them.
+
+        Args:
+            job_description: Job description text
+            resumes: Resumes to score
+            top_k: Return only the best top_k results
+
+        Returns:
+            Dict with the ranked results, counts and elapsed time
+
+        Raises:
+            ValueError: If there are no resumes or more than max_resumes
+        """
+        if not resumes:
+            raise ValueError("At least one resume is required")
+        if len(resumes) > self.max_resumes:
+            raise ValueError(f"At most {self.max_resumes} resumes can be scored per batch")
+
+        started = time.monotonic()
+        job_keywords = extract_keywords(job_description)
+        resumes = list(resumes)
+
+        if len(resumes) <= self.chunk_size or self.max_workers == 1:
+            results = await asyncio.to_thread(_score_chunk, job_keywords, resumes, top_k)
+        else:
+            results = await self._score_in_pool(job_keywords, resumes, top_k)
+
+        # Stable sort keeps input order among equal scores
+        results.sort(key=lambda result: result["score"], reverse=True)
+        results = results[:top_k] if top_k else results
+        for rank, result in enumerate(results, start=1):
+            result["rank"] = rank
+
+        elapsed = time.monotonic() - started
+        self._batches += 1
+        self._resumes_scored += len(resumes)
+        self._total_seconds += elapsed
+        logger.info(f"Scored {len(resumes)} resumes against {len(job_keywords)} job keywords in {elapsed:.2f}s")
+
+        return {
+            "total_resumes": len(resumes),
+            "job_keywords": len(job_keywords),
+            "elapsed_ms": round(elapsed * 1000),
+            "results": results,
+        }
+
+    async def _score_in_pool(
+        self,
+        job_keywords: Dict[str, int],
+        resumes: List[ResumeInput],
+        top_k: Optional[int]
+    ) -> List[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        chunks = [resumes[i:i + self.chunk_size] for i in range(0, len(resumes), self.chunk_size)]
+        try:
+            pool = self._get_pool()
+            chunk_results = await asyncio.gather(*(
+                loop.run_in_executor(pool, _score_chunk, job_keywords, chunk, top_k) for chunk in chunks
+            ))
+        except BrokenProcessPool:
+            # A worker died (e.g. killed by the OS); start a fresh pool next time and finish inline
+            logger.error("ATS scoring process pool broke, scoring batch in a thread instead")
+            self._pool = None
+            return await asyncio.to_thread(_score_chunk, job_keywords, resumes, top_k)
+        self._pool_batches += 1
+        return [result for chunk in chunk_results for result in chunk]
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, if started."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get batch scoring counters."""
+        return {
+            "max_workers": self.max_workers,
+            "chunk_size": self.chunk_size,
+            "pool_started": self._pool is not None,
+            "batches": self._batches,
+            "pool_batches": self._pool_batches,
+            "resumes_scored": self._resumes_scored,
+            "resumes_per_second": round(self._resumes_scored / self._total_seconds, 1) if self._total_seconds else None,
+        }
+
+
+def create_batch_scorer_from_env() -> BatchScorer:
+    """Create a BatchScorer configured from ATS_BATCH_* environment variables."""
+    workers = os.getenv("ATS_BATCH_WORKERS")
+    return BatchScorer(
+        max_workers=int(workers) if workers else None,
+        chunk_size=int(os.getenv("ATS_BATCH_CHUNK_SIZE", "250")),
+        max_resumes=int(os.getenv("ATS_BATCH_MAX_RESUMES", "5000"))
+    )
+
+
+# Process-wide scorer; its pool is shared by all requests
+batch_scorer = create_batch_scorer_from_env()
@@ -0,0 +1,237 @@
+"""
+Circuit breaker for LLM requests.
+
+The breaker tracks the outcome of upstream calls in a rolling time window.
+When the error rate (or a run of consecutive failures) crosses the configured
+threshold it opens, and calls fail immediately with CircuitOpenError so that
+services can switch to their local fallbacks instead of waiting for timeouts.
+After a cool-down it lets a limited number of probe calls through (half-open);
+a successful probe closes it again, a failed one reopens it.
+
+Only transient upstream failures (rate limits, 5xx, timeouts, connection
+errors) count against the breaker; invalid requests do not.
+"""
+import os
+import time
+import asyncio
+import logging
+import threading
+from enum import Enum
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Tuple
+
+from .retry_policy import RETRYABLE_CATEGORIES, classify_error
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    """State of a circuit breaker."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is rejected because the circuit is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit '{name}' is open; retry in {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Closed/open/half-open circuit breaker driven by a rolling error rate."""
+
+    def __init__(
+        self,
+        name: str = "groq",
+        failure_rate_threshold: float = 0.5,
+        minimum_calls: int = 10,
+        consecutive_failures: int = 5,
+        window_seconds: float = 60.0,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1
+    ):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            name: Name used in log messages and errors
+            failure_rate_threshold: Failure ratio (0-1) in the window that opens the circuit
+            minimum_calls: Calls required in the window before the failure rate is evaluated
+            consecutive_failures: Consecutive failures that open the circuit regardless of volume (0 disables)
+            window_seconds: Length of the rolling window in seconds
+            open_seconds: Time the circuit stays open before allowing probe calls
+            half_open_max_calls: Probe calls allowed concurrently while half-open
+        """
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.consecutive_failures = consecutive_failures
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = max(1, half_open_max_calls)
+
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._outcomes: Deque[Tuple[float, bool]] = deque()  # (timestamp, failed)
+        self._failure_streak = 0
+        self._probes = 0
+        self._lock = threading.Lock()
+        self._counters = defaultdict(int)
+
+    @property
+    def state(self) -> CircuitState:
+        """Current state, moving from open to half-open once the cool-down has passed."""
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now: float) -> CircuitState:
+        if self._state == CircuitState.OPEN and now - self._opened_at >= self.open_seconds:
+            self._transition(CircuitState.HALF_OPEN)
+        return self._state
+
+    def _transition(self, state: CircuitState) -> None:
+        if state == self._state:
+            return
+        logger.warning(f"Circuit '{self.name}' {self._state.value} -> {state.value}")
+        self._state = state
+        self._counters[f"to_{state.value}"] += 1
+        self._probes = 0
+        if state == CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+        elif state == CircuitState.CLOSED:
+            self._outcomes.clear()
+            self._failure_streak = 0
+
+    def is_available(self) -> bool:
+        """Whether a call would currently be let through (without reserving a probe)."""
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            if state == CircuitState.OPEN:
+                return False
+            return state == CircuitState.CLOSED or self._probes < self.half_open_max_calls
+
+    def check(self) -> None:
+        """
+        Fail fast if the circuit is open.
+
+        Raises:
+            CircuitOpenError: If calls are currently being rejected
+        """
+        if not self.is_available():
+            with self._lock:
+                self._counters["rejected"] += 1
+            raise CircuitOpenError(self.name, self.retry_after())
+
+    def retry_after(self) -> float:
+        """Seconds until the circuit will next let a probe call through."""
+        if self._state != CircuitState.OPEN:
+            return 0.0
+        return max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+
+    def _acquire(self) -> bool:
+        """Admit a call, reserving a probe slot when half-open. Returns whether it was a probe."""
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            if state == CircuitState.CLOSED:
+                return False
+            if state == CircuitState.HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return True
+            self._counters["rejected"] += 1
+        raise CircuitOpenError(self.name, self.retry_after())
+
+    def _record(self, failed: bool, probe: bool) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._counters["failures" if failed else "successes"] += 1
+            if probe or self._state == CircuitState.HALF_OPEN:
+                self._transition(CircuitState.OPEN if failed else CircuitState.CLOSED)
+                return
+            if self._state == CircuitState.OPEN:
+                return
+
+            self._outcomes.append((now, failed))
+            while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+                self._outcomes.popleft()
+            self._failure_streak = self._failure_streak + 1 if failed else 0
+            if not failed:
+                return
+
+            calls = len(self._outcomes)
+            failures = sum(1 for _, f in self._outcomes if f)
+            if calls >= self.minimum_calls and failures / calls >= self.failure_rate_threshold:
+                logger.error(f"Circuit '{self.name}' opening: {failures}/{calls} calls failed in the last {self.window_seconds:.0f}s")
+                self._transition(CircuitState.OPEN)
+            elif self.consecutive_failures and self._failure_streak >= self.consecutive_failures:
+                logger.error(f"Circuit '{self.name}' opening after {self._failure_streak} consecutive failures")
+                self._transition(CircuitState.OPEN)
+
+    def _release(self, probe: bool) -> None:
+        if probe:
+            with self._lock:
+                self._probes = max(0, self._probes - 1)
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """
+        Wrap a single upstream call and record its outcome.
+
+        Raises:
+            CircuitOpenError: If the circuit is open or no probe slot is free
+        """
+        probe = self._acquire()
+        try:
+            yield
+        except asyncio.CancelledError:
+            self._release(probe)
+            raise
+        except Exception as e:
+            if classify_error(e) in RETRYABLE_CATEGORIES:
+                self._record(True, probe)
+            else:
+                # The upstream answered; a bad request says nothing about its health
+                self._release(probe)
+            raise
+        else:
+            self._record(False, probe)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get state and outcome counters."""
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            calls = len(self._outcomes)
+            failures = sum(1 for _, f in self._outcomes if f)
+            return {
+                "name": self.name,
+                "state": state.value,
+                "window_calls": calls,
+                "window_failure_rate": round(failures / calls, 4) if calls else 0.0,
+                "failure_streak": self._failure_streak,
+                "retry_after": round(self.retry_after(), 3),
+                "successes": self._counters["successes"],
+                "failures": self._counters["failures"],
+                "rejected": self._counters["rejected"],
+                "times_opened": self._counters["to_open"],
+            }
+
+
+def create_circuit_breaker_from_env() -> CircuitBreaker:
+    """Create a CircuitBreaker configured from GROQ_BREAKER_* environment variables."""
+    return CircuitBreaker(
+        name="groq",
+        failure_rate_threshold=float(os.getenv("GROQ_BREAKER_FAILURE_RATE", "0.5")),
+        minimum_calls=int(os.getenv("GROQ_BREAKER_MINIMUM_CALLS", "10")),
+        consecutive_failures=int(os.getenv("GROQ_BREAKER_CONSECUTIVE_FAILURES", "5")),
+        window_seconds=float(os.getenv("GROQ_BREAKER_WINDOW", "60")),
+        open_seconds=float(os.getenv("GROQ_BREAKER_OPEN_SECONDS", "30")),
+        half_open_max_calls=int(os.getenv("GROQ_BREAKER_HALF_OPEN_CALLS", "1")),
+    )
+
+
+# Process-wide breaker: every GroqClient instance talks to the same upstream
+groq_breaker = create_circuit_breaker_from_env()
@@ -0,0 +1,227 @@
+"""
+Document text extraction in a bounded pool of worker processes.
+
+Parsing a PDF or DOCX (resume_parser) is CPU-bound and can take seconds for a
+long or malformed file, which would stall the event loop and every other
+request on the worker. ExtractionService runs it in separate processes:
+
+- at most max_workers extractions run at once; further requests wait their
+  turn on the event loop without tying up threads
+- each extraction has a timeout; on expiry the pool's processes are killed
+  and replaced, so a runaway parse cannot hold a worker (extractions running
+  alongside it are retried once in the new pool)
+- each worker's address space is capped with RLIMIT_AS where the platform
+  supports it, so a pathological file fails with an error rather than
+  exhausting the host's memory
+- workers are replaced after max_tasks_per_child extractions, releasing
+  memory that parsers leave fragmented
+- PDFs are read page by page and reading stops at the caller's character or
+  token budget, or at max_chars, so a long document costs only the pages used
+
+Workers are started from the shared fork server (app.utils.process_context),
+which has this module and the parsers preloaded.
+
+Configured with EXTRACTION_WORKERS (default: CPU count, at most 4),
+EXTRACTION_TIMEOUT (seconds, default 30), EXTRACTION_MEMORY_LIMIT_MB
+(default 1024, 0 for no limit), EXTRACTION_MAX_TASKS_PER_CHILD (default 50)
+and EXTRACTION_MAX_CHARS (default 100000).
+"""
+import os
+import time
+import asyncio
+import logging
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Tuple
+
+from .resume_parser import extract_text_from_file
+from ..utils.process_context import preload_in_workers, worker_context
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionError(Exception):
+    """Raised when text cannot be extracted from a document."""
+
+
+class ExtractionTimeoutError(ExtractionError):
+    """Raised when extraction takes longer than the configured timeout."""
+
+
+def _init_worker(memory_limit_bytes: int) -> None:
+    """Cap the worker's address space; runs once in each worker process."""
+    if memory_limit_bytes and resource is not None:
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes))
+        except (ValueError, OSError) as e:
+            logger.warning(f"Could not set extraction worker memory limit: {str(e)}")
+
+
+def _extract_file(
+    file_path: str,
+    max_chars: int,
+    max_tokens: Optional[int],
+    page_range: Optional[Tuple[int, Optional[int]]]
+) -> Optional[str]:
+    """Extract text in a worker process; MemoryError is reported rather than raised across processes."""
+    try:
+        return extract_text_from_file(file_path, max_chars, max_tokens, page_range)
+    except MemoryError:
+        return None
+
+
+# Import the parsers once in the fork server rather than in every worker
+preload_in_workers(__name__)
+
+
+class ExtractionService:
+    """Extracts text from uploaded documents in a bounded, recycled process pool."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        timeout: float = 30.0,
+        memory_limit_mb: int = 1024,
+        max_tasks_per_child: int = 50,
+        max_chars: int = 100_000
+    ):
+        """
+        Initialize the service. The process pool is started on first use.
+
+        Args:
+            max_workers: Worker processes and concurrent extractions. Defaults to the CPU count, at most 4.
+            timeout: Seconds an extraction may run before its worker is killed
+            memory_limit_mb: Address space limit per worker in MB; 0 for none
+            max_tasks_per_child: Extractions after which a worker is replaced
+            max_chars: Maximum characters returned per document
+        """
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.max_tasks_per_child = max_tasks_per_child
+        self.max_chars = max_chars
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots = asyncio.Semaphore(self.max_workers)
+        self._counters = Counter()
+        self._total_seconds = 0.0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=worker_context(),
+                initializer=_init_worker,
+                initargs=(self.memory_limit_mb * 1024 * 1024,),
+                max_tasks_per_child=self.max_tasks_per_child
+            )
+        return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor, kill: bool = False) -> None:
+        """Stop a pool, killing its workers if asked, and start a fresh one on next use."""
+        if kill:
+            # ProcessPoolExecutor cannot cancel a running task; terminating its workers is the only way
+            for process in list((pool._processes or {}).values()):
+                process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+        if self._pool is pool:
+            self._pool = None
+
+    async def extract_text(
+        self,
+        file_path: str,
+        max_chars: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        page_range: Optional[Tuple[int, Optional[int]]] = None
+    ) -> str:
+        """
+        Extract the text of a PDF, DOCX or plain text file.
+
+        Args:
+            file_path: Path to the document
+            max_chars: Maximum characters to return; never more than the service's max_chars
+            max_tokens: Maximum estimated tokens to return
+            page_range: (start, stop) zero-based pages to read from a PDF
+
+        Returns:
+            str: The extracted text
+
+        Raises:
+            ExtractionTimeoutError: If extraction exceeds the timeout
+            ExtractionError: If the file is unsupported, unreadable, has no text
+                or its worker crashed
+        """
+        loop = asyncio.get_running_loop()
+        max_chars = min(max_chars, self.max_chars) if max_chars is not None else self.max_chars
+        async with self._slots:
+            started = time.monotonic()
+            for attempt in range(2):
+                pool = self._get_pool()
+                try:
+                    text = await asyncio.wait_for(
+                        loop.run_in_executor(pool, _extract_file, file_path, max_chars, max_tokens, page_range),
+                        timeout=self.timeout
+                    )
+                    break
+                except asyncio.TimeoutError:
+                    self._counters["timeouts"] += 1
+                    logger.error(f"Text extraction from {file_path} timed out after {self.timeout}s, restarting workers")
+                    self._discard_pool(pool, kill=True)
+                    raise ExtractionTimeoutError(f"Text extraction timed out after {self.timeout:g} seconds")
+                except BrokenProcessPool:
+                    # A worker died: killed after another extraction's timeout, or by the OS
+                    self._counters["pool_restarts"] += 1
+                    self._discard_pool(pool)
+                    if attempt:
+                        self._counters["failures"] += 1
+                        raise ExtractionError("Text extraction worker crashed")
+                    logger.warning(f"Extraction worker pool broke, retrying {file_path}")
+
+            self._total_seconds += time.monotonic() - started
+            self._counters["extractions"] += 1
+
+        if not text or not text.strip():
+            self._counters["failures"] += 1
+            raise ExtractionError("No text could be extracted from the file")
+        return text
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, if started."""
+        if self._pool is not None:
+            self._discard_pool(self._pool)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get extraction counters."""
+        extractions = self._counters["extractions"]
+        return {
+            "max_workers": self.max_workers,
+            "timeout": self.timeout,
+            "memory_limit_mb": self.memory_limit_mb,
+            "pool_started": self._pool is not None,
+            "extractions": extractions,
+            "failures": self._counters["failures"],
+            "timeouts": self._counters["timeouts"],
+            "pool_restarts": self._counters["pool_restarts"],
+            "avg_extraction_ms": round(self._total_seconds / extractions * 1000, 1) if extractions else None,
+        }
+
+
+def create_extraction_service_from_env() -> ExtractionService:
+    """Create an ExtractionService configured from EXTRACTION_* environment variables."""
+    workers = os.getenv("EXTRACTION_WORKERS")
+    return ExtractionService(
+        max_workers=int(workers) if workers else None,
+        timeout=float(os.getenv("EXTRACTION_TIMEOUT", "30")),
+        memory_limit_mb=int(os.getenv("EXTRACTION_MEMORY_LIMIT_MB", "1024")),
+        max_tasks_per_child=int(os.getenv("EXTRACTION_MAX_TASKS_PER_CHILD", "50")),
+        max_chars=int(os.getenv("EXTRACTION_MAX_CHARS", "100000"))
+    )
+
+
+# Process-wide service; its pool is shared by all requests
+extraction_service = create_extraction_service_from_env()
@@ -2,43 +2,139 @@
 Groq client for handling AI interactions using the official Groq Python library.
 """
 import os
-import json
+import time
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, AsyncIterator, Type
 from dotenv import load_dotenv
-from functools import partial
 import asyncio
 
+from .llm_cache import LLMResponseCache, llm_cache
+from .retry_policy import RetryPolicy, retry_policy as default_retry_policy
+from .rate_limiter import GroqGovernor, groq_governor
+from .single_flight import SingleFlight, llm_single_flight
+from .circuit_breaker import CircuitBreaker, groq_breaker
+from .model_router import ModelRouter, TaskType, model_router
+from .token_budget import TokenBudgetPlanner, compact_json, token_budget, trim_to_tokens
+from ..utils.logging_config import PAYLOAD_LOGGER, prompt_digest
+from .structured_output import JSON_MODE, ModelT, failed_generation, parse_structured, with_schema_instructions
+from ..utils.json_extract import JSONExtractionError, extract_json_object
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+# Sampled logger for prompt/response digests; never given full payloads
+payload_logger = logging.getLogger(PAYLOAD_LOGGER)
 
 # Load environment variables
 load_dotenv()
 
 # Try to import Groq, but make it optional
 try:
-    from groq import Groq
+    from groq import AsyncGroq
+    import httpx
     GROQ_AVAILABLE = True
 except ImportError:
     GROQ_AVAILABLE = False
     logger.warning("Groq library not available. Some features may be limited.")
 
+# HTTP/2 needs the optional h2 package (installed with httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Connection pool settings shared by every GroqClient in the process
+GROQ_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "200"))
+GROQ_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("GROQ_MAX_KEEPALIVE_CONNECTIONS", "50"))
+GROQ_KEEPALIVE_EXPIRY = float(os.getenv("GROQ_KEEPALIVE_EXPIRY", "30"))
+GROQ_CONNECT_TIMEOUT = float(os.getenv("GROQ_CONNECT_TIMEOUT", "10"))
+GROQ_REQUEST_TIMEOUT = float(os.getenv("GROQ_REQUEST_TIMEOUT", "60"))
+GROQ_HTTP2 = os.getenv("GROQ_HTTP2", "true").lower() in ("true", "1", "t")
+
+_shared_http_client = None
+
+
+def get_shared_http_client() -> "httpx.AsyncClient":
+    """
+    Get the process-wide async HTTP client used for all Groq requests.
+    
+    The client is created on first use so that every GroqClient instance
+    (main.py, CVGenerator, CoverLetterGenerator, ResumeProcessor, ...) shares
+    a single keep-alive connection pool instead of opening its own.
+    
+    Returns:
+        httpx.AsyncClient: The shared client
+    """
+    global _shared_http_client
+    if _shared_http_client is None or _shared_http_client.is_closed:
+        use_http2 = GROQ_HTTP2 and HTTP2_AVAILABLE
+        if GROQ_HTTP2 and not HTTP2_AVAILABLE:
+            logger.info("h2 package not installed, Groq transport will use HTTP/1.1")
+        _shared_http_client = httpx.AsyncClient(
+            http2=use_http2,
+            limits=httpx.Limits(
+                max_connections=GROQ_MAX_CONNECTIONS,
+                max_keepalive_connections=GROQ_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=GROQ_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(GROQ_REQUEST_TIMEOUT, connect=GROQ_CONNECT_TIMEOUT),
+        )
+        logger.info(
+            f"Created shared Groq HTTP pool (http2={use_http2}, "
+            f"max_connections={GROQ_MAX_CONNECTIONS}, "
+            f"max_keepalive={GROQ_MAX_KEEPALIVE_CONNECTIONS})"
+        )
+    return _shared_http_client
+
+
+async def close_shared_http_client() -> None:
+    """Close the shared HTTP client. Intended to be called on application shutdown."""
+    global _shared_http_client
+    if _shared_http_client is not None and not _shared_http_client.is_closed:
+        await _shared_http_client.aclose()
+    _shared_http_client = None
+
 class GroqClient:
-    """Client for interacting with Groq's API using the official Python library."""
+    """Client for interacting with Groq's API using the official async Python library."""
     
-    def __init__(self, api_key: Optional[str] = None, **kwargs):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        cache: Optional[LLMResponseCache] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        governor: Optional[GroqGovernor] = None,
+        single_flight: Optional[SingleFlight] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        router: Optional[ModelRouter] = None,
+        budget: Optional[TokenBudgetPlanner] = None,
+        **kwargs
+    ):
         """
         Initialize the Groq client.
         
         Args:
             api_key: Optional API key. If not provided, will use GROQ_API_KEY from environment.
+            cache: Optional response cache. Defaults to the process-wide LLM cache.
+            retry_policy: Optional retry policy. Defaults to the process-wide policy.
+            governor: Optional rate limit governor. Defaults to the process-wide governor.
+            single_flight: Optional coalescing group. Defaults to the process-wide group.
+            breaker: Optional circuit breaker. Defaults to the process-wide breaker.
+            router: Optional model router. Defaults to the process-wide router.
+            budget: Optional token budget planner. Defaults to the process-wide planner.
             **kwargs: Additional arguments that might be passed from other services.
         """
         # Get API key from environment if not provided
         self.api_key = api_key or os.getenv("GROQ_API_KEY")
         self.enabled = bool(self.api_key) and GROQ_AVAILABLE
         self.client = None
+        self.cache = cache or llm_cache
+        self.retry_policy = retry_policy or default_retry_policy
+        self.governor = governor or groq_governor
+        self.single_flight = single_flight or llm_single_flight
+        self.breaker = breaker or groq_breaker
+        self.router = router or model_router
+        self.budget = budget or token_budget
 
         logger.debug(f"GroqClient __init__ received kwargs: {kwargs}")
         logger.debug(f"GroqClient API Key: {'*' * 8 + self.api_key[-4:] if self.api_key else 'Not set'}")
@@ -63,9 +159,14 @@ class GroqClient:
                 self.enabled = False
                 return
 
-            # Explicitly call Groq with only the api_key. This ensures no other kwargs are passed from this wrapper.
+            # Explicitly call AsyncGroq with only the api_key and the shared pool. This ensures no
+            # other kwargs are passed from this wrapper. Retries are handled by _make_request.
             logger.info(f"Initializing Groq library with api_key.")
-            self.client = Groq(api_key=api_key_to_use)
+            self.client = AsyncGroq(
+                api_key=api_key_to_use,
+                http_client=get_shared_http_client(),
+                max_retries=0
+            )
             logger.info("Groq client initialized successfully.")
 
         except Exception as e:
@@ -74,117 +175,341 @@ class GroqClient:
                 logger.debug(f"Error details: {e.__dict__}")
             self.enabled = False
     
-    async def _make_request(self, messages: List[Dict[str, str]], model: str = "llama-3.3-70b-versatile") -> Any:
+    async def _make_request(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        endpoint: str = "default",
+        use_cache: bool = True,
+        task: Optional[TaskType] = None,
+        response_format: Optional[Dict[str, Any]] = None
+    ) -> Any:
         """
-        Make a request to the Groq API with timeout and retry logic.
+        Make a request to the Groq API with caching, timeout and retry logic.
+        
+        The model, max_tokens and temperature come from self.router's route for
+        the task type (or the endpoint's default task), and self.budget compacts
+        the messages and trims them to the task's prompt budget.
+        
+        Concurrent identical requests are coalesced by self.single_flight and
+        share one upstream call. Every attempt first takes rate limit budget from
+        self.governor, queueing briefly if the RPM/TPM budget is spent. Transient
+        errors are retried according to self.retry_policy, which honours
+        Retry-After and bounds all attempts by a single deadline. While
+        self.breaker is open, uncached requests fail immediately.
         
         Args:
             messages: List of message dictionaries with 'role' and 'content'
-            model: The model to use for the completion
+            model: Optional model overriding the routed model
+            endpoint: Name of the calling endpoint, used for cache TTLs and counters
+            use_cache: Whether to serve from and store into the response cache
+            task: Task type used to pick the model route
+            response_format: Optional response format, e.g. {"type": "json_object"} for JSON mode
             
         Returns:
             The parsed JSON response if possible, otherwise the raw text response
             
         Raises:
             RuntimeError: If the client is not properly configured
-            asyncio.TimeoutError: If the request times out after all retries
-            Exception: For other API errors
+            CircuitOpenError: If the circuit breaker is open
+            RateLimitExceeded: If rate limit budget did not become available in time
+            asyncio.TimeoutError: If the request times out after all retries or the deadline is spent
+            Exception: For non-retryable API errors, or the last error once retries are exhausted
         """
-        import asyncio
-        from functools import partial
-        import aiohttp
-        import json
-        
         if not self.enabled or not self.client:
             raise RuntimeError("Groq API is not properly configured. Please check your API key and client initialization.")
         
-        max_retries = 2
-        retry_delay = 1  # seconds
-        
         # Ensure messages are properly formatted
         for msg in messages:
             if 'role' not in msg or 'content' not in msg:
                 raise ValueError("Each message must have 'role' and 'content' keys")
         
-        for attempt in range(max_retries + 1):
-            task = None
-            try:
-                # Create a new event loop for this request to prevent hanging
-                loop = asyncio.get_event_loop()
-                
-                # Log the request payload
-                request_payload = {
-                    "model": model,
-                    "messages": messages,
-                    "temperature": 0.7,
-                    "max_tokens": 4000
-                }
-                logger.info("\n=== GROQ API REQUEST ===")
-                logger.info(json.dumps(request_payload, indent=2))
-                logger.info("======================\n")
-                
-                # Create a task for the API call
-                api_call = partial(
-                    self.client.chat.completions.create,
-                    **request_payload
-                )
-                
-                # Use a timeout to prevent hanging
-                task = asyncio.create_task(asyncio.to_thread(api_call))
-                
-                try:
-                    # Wait for the task to complete with a timeout
-                    chat_completion = await asyncio.wait_for(task, timeout=60)
-                    
-                    # Ensure we have a valid response
-                    if not chat_completion or not hasattr(chat_completion, 'choices') or not chat_completion.choices:
-                        raise ValueError("Invalid response from Groq API")
-                    
-                    response_content = chat_completion.choices[0].message.content
-                    logger.info("\n=== GROQ API RESPONSE ===")
-                    logger.info(response_content)
-                    logger.info("=========================\n")
-                    return response_content
-                    
-                except asyncio.TimeoutError:
-                    # Cancel the task if it's still running
-                    if task and not task.done():
-                        task.cancel()
-                        try:
-                            await task  # This will raise a CancelledError
-                        except asyncio.CancelledError:
-                            pass  # Expected when cancelling
-                            
-                    if attempt == max_retries:
-                        logger.error("Groq API request timed out after all retries")
-                        raise
-                        
-                    logger.warning(f"Groq API request timed out, retrying... (attempt {attempt + 1}/{max_retries})")
-                    await asyncio.sleep(retry_delay * (attempt + 1))
-                    
-                except Exception as e:
-                    # Make sure to clean up the task if it's still running
-                    if task and not task.done():
-                        task.cancel()
-                        try:
-                            await task  # This will raise a CancelledError
-                        except asyncio.CancelledError:
-                            pass  # Expected when cancelling
-                    raise
-                    
-            except asyncio.CancelledError:
-                # If we're being cancelled, re-raise to the caller
+        task = self.router.resolve_task(task, endpoint)
+        route = self.router.routes[task]
+        model = model or route.model
+        messages, plan = self.budget.plan(messages, task, route.max_tokens)
+        request_payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": route.temperature,
+            "max_tokens": route.max_tokens
+        }
+        if response_format:
+            request_payload["response_format"] = response_format
+        
+        request_key = LLMResponseCache.make_key(request_payload)
+        
+        # Serve identical requests from the cache
+        cache_key = None
+        if use_cache and self.cache is not None:
+            cache_key = request_key
+            cached = await self.cache.get(cache_key, endpoint=endpoint)
+            if cached is not None:
+                logger.info(f"Groq response served from cache (endpoint={endpoint})")
+                return cached
+        
+        # Fail in milliseconds while Groq is known to be down so callers can fall back
+        self.breaker.check()
+        
+        estimated_tokens = self.governor.estimate(messages, request_payload["max_tokens"])
+        
+        prompt_chars = sum(len(msg['content']) for msg in messages)
+        
+        async def attempt(timeout: float) -> str:
+            log_fields = {
+                "endpoint": endpoint, "task": task.value, "model": model, "prompt_chars": prompt_chars,
+                "estimated_prompt_tokens": plan.estimated_prompt_tokens
+            }
+            logger.info(
+                f"Groq request (endpoint={endpoint}, model={model}, prompt_chars={prompt_chars}, "
+                f"estimated_prompt_tokens={plan.estimated_prompt_tokens})",
+                extra=log_fields
+            )
+            if payload_logger.isEnabledFor(logging.DEBUG):
+                payload_logger.debug(f"Groq request prompt: {prompt_digest(messages[-1]['content'])}", extra=log_fields)
+            started = time.monotonic()
+            
+            # Retries consume budget too, so each attempt takes its own slot.
+            # Await the completion natively on the event loop; wait_for cancels
+            # the in-flight HTTP request if it times out.
+            async with self.governor.slot(estimated_tokens, endpoint=endpoint, max_wait=timeout):
+                with self.breaker.guard():
+                    chat_completion = await asyncio.wait_for(
+                        self.client.chat.completions.create(**request_payload),
+                        timeout=timeout
+                    )
+            
+            # Ensure we have a valid response
+            if not chat_completion or not hasattr(chat_completion, 'choices') or not chat_completion.choices:
+                raise ValueError("Invalid response from Groq API")
+            
+            response_content = chat_completion.choices[0].message.content
+            log_fields["response_chars"] = len(response_content or "")
+            log_fields["elapsed_ms"] = round((time.monotonic() - started) * 1000)
+            usage = getattr(chat_completion, "usage", None)
+            log_fields["prompt_tokens"] = getattr(usage, "prompt_tokens", 0) or 0
+            log_fields["completion_tokens"] = getattr(usage, "completion_tokens", 0) or 0
+            self.router.record(
+                task, route, log_fields["elapsed_ms"],
+                prompt_tokens=log_fields["prompt_tokens"],
+                completion_tokens=log_fields["completion_tokens"]
+            )
+            self.budget.record(plan, log_fields["prompt_tokens"], log_fields["completion_tokens"])
+            logger.info(
+                f"Groq response (endpoint={endpoint}, response_chars={log_fields['response_chars']}, "
+                f"elapsed_ms={log_fields['elapsed_ms']}, prompt_tokens={log_fields['prompt_tokens']} "
+                f"(estimated {plan.estimated_prompt_tokens}), completion_tokens={log_fields['completion_tokens']})",
+                extra=log_fields
+            )
+            if payload_logger.isEnabledFor(logging.DEBUG):
+                payload_logger.debug(f"Groq response: {prompt_digest(response_content)}", extra=log_fields)
+            return response_content
+        
+        async def fetch() -> str:
+            # Transient failures (429, 5xx, timeouts, connection errors) are retried by the policy
+            response_content = await self.retry_policy.run(attempt, endpoint=endpoint)
+            
+            if cache_key is not None:
+                await self.cache.set(cache_key, response_content, endpoint=endpoint)
+            return response_content
+        
+        # Identical requests already in flight (e.g. a double-clicked button) share one call
+        return await self.single_flight.do(request_key, fetch, endpoint=endpoint)
+    
+    async def generate_json(
+        self,
+        messages: List[Dict[str, str]],
+        schema: Type[ModelT],
+        endpoint: str = "default",
+        task: Optional[TaskType] = None
+    ) -> ModelT:
+        """
+        Request a JSON object conforming to a pydantic schema.
+        
+        Uses Groq's JSON mode and appends instructions derived from the schema
+        to the system prompt. The completion is validated against the schema
+        and repaired locally if needed (see structured_output), so a malformed
+        response never costs another round-trip. If Groq rejects the output in
+        JSON mode, the rejected generation from the error is repaired instead.
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            schema: Pydantic model describing the expected object
+            endpoint: Name of the calling endpoint, used for cache TTLs and counters
+            task: Task type used to pick the model route
+            
+        Returns:
+            An instance of schema
+            
+        Raises:
+            StructuredOutputError: If the response cannot be repaired into the schema
+            Exception: Any error raised by _make_request
+        """
+        messages = with_schema_instructions(messages, schema)
+        try:
+            response = await self._make_request(
+                messages, endpoint=endpoint, task=task, response_format=JSON_MODE
+            )
+        except Exception as e:
+            generation = failed_generation(e)
+            if generation is None:
                 raise
-                
-            except Exception as e:
-                if attempt == max_retries:
-                    logger.error(f"Error making request to Groq API after {max_retries} attempts: {str(e)}")
-                    raise
-                logger.warning(f"Error in Groq API request, retrying... (attempt {attempt + 1}/{max_retries}): {str(e)}")
-                await asyncio.sleep(retry_delay * (attempt + 1))
-        
-        # If we've exhausted all retries
-        raise RuntimeError("Failed to get a valid response from Groq API after all retries")
+            logger.warning(f"Groq rejected JSON mode output for {endpoint}, repairing it locally")
+            response = generation
+        
+        return parse_structured(response, schema)
+    
+    async def stream_request(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        endpoint: str = "default",
+        use_cache: bool = True,
+        task: Optional[TaskType] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a completion from the Groq API as it is generated.
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            model: Optional model overriding the routed model
+            endpoint: Name of the calling endpoint, used for cache TTLs and counters
+            use_cache: Whether to serve from and store into the response cache
+            task: Task type used to pick the model route
+            
+        Yields:
+            str: Content deltas in the order they are generated. A cached response
+            is yielded as a single delta.
+            
+        Raises:
+            RuntimeError: If the client is not properly configured
+            CircuitOpenError: If the circuit breaker is open
+            RateLimitExceeded: If rate limit budget did not become available in time
+            asyncio.TimeoutError: If the stream does not start or stalls within the timeout
+        """
+        if not self.enabled or not self.client:
+            raise RuntimeError("Groq API is not properly configured. Please check your API key and client initialization.")
+        
+        for msg in messages:
+            if 'role' not in msg or 'content' not in msg:
+                raise ValueError("Each message must have 'role' and 'content' keys")
+        
+        task = self.router.resolve_task(task, endpoint)
+        route = self.router.routes[task]
+        messages, plan = self.budget.plan(messages, task, route.max_tokens)
+        request_payload = {
+            "model": model or route.model,
+            "messages": messages,
+            "temperature": route.temperature,
+            "max_tokens": route.max_tokens
+        }
+        
+        cache_key = None
+        if use_cache and self.cache is not None:
+            cache_key = self.cache.make_key(request_payload)
+            cached = await self.cache.get(cache_key, endpoint=endpoint)
+            if cached is not None:
+                logger.info(f"Groq streaming response served from cache (endpoint={endpoint})")
+                yield cached
+                return
+        
+        self.breaker.check()
+        
+        async def open_stream(timeout: float):
+            with self.breaker.guard():
+                return await asyncio.wait_for(
+                    self.client.chat.completions.create(stream=True, **request_payload),
+                    timeout=timeout
+                )
+        
+        # The in-flight slot is held until the stream is fully consumed or closed
+        estimated_tokens = self.governor.estimate(messages, request_payload["max_tokens"])
+        parts = []
+        async with self.governor.slot(estimated_tokens, endpoint=endpoint):
+            started = time.monotonic()
+            usage = None
+            # Only opening the stream is retried; a failure after the first delta is surfaced
+            stream = await self.retry_policy.run(open_stream, endpoint=endpoint)
+            
+            chunks = stream.__aiter__()
+            try:
+                while True:
+                    try:
+                        # Bound the gap between chunks rather than the whole generation
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout=GROQ_REQUEST_TIMEOUT)
+                    except StopAsyncIteration:
+                        break
+                    # Groq reports token usage on the final chunk
+                    x_groq = getattr(chunk, "x_groq", None)
+                    if x_groq is not None and getattr(x_groq, "usage", None) is not None:
+                        usage = x_groq.usage
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+            finally:
+                # Release the pooled connection if the consumer stops early (e.g. client disconnect)
+                await stream.close()
+            
+            prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+            completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+            self.router.record(
+                task, route, (time.monotonic() - started) * 1000,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens
+            )
+            self.budget.record(plan, prompt_tokens, completion_tokens)
+        
+        if cache_key is not None and parts:
+            await self.cache.set(cache_key, ''.join(parts), endpoint=endpoint)
+    
+    async def stream_cv(self, cv_data: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        Stream an enhanced CV in markdown format.
+        
+        Args:
+            cv_data: Dictionary containing CV data
+            
+        Yields:
+            str: Markdown content deltas
+        """
+        async for delta in self.stream_request(self._build_cv_messages(cv_data), endpoint="generate_cv", task=TaskType.WRITING):
+            yield delta
+    
+    async def stream_resume_optimization(self, resume_text: str, job_description: str = "") -> AsyncIterator[str]:
+        """
+        Stream the raw JSON produced for a resume optimization request.
+        
+        The concatenated deltas can be parsed with _parse_optimization_response.
+        
+        Args:
+            resume_text: The text content of the resume to optimize
+            job_description: Optional job description to optimize the resume for
+            
+        Yields:
+            str: Response text deltas
+        """
+        messages = self._build_optimization_messages(resume_text, job_description)
+        async for delta in self.stream_request(messages, endpoint="optimize_resume", task=TaskType.WRITING):
+            yield delta
+    
+    async def stream_cover_letter(self, resume_text: str, job_description: str, tone: str = "professional") -> AsyncIterator[str]:
+        """
+        Stream a cover letter based on resume and job description.
+        
+        Args:
+            resume_text: The resume text
+            job_description: The job description
+            tone: The desired tone (e.g., professional, enthusiastic, formal)
+            
+        Yields:
+            str: Cover letter text deltas
+        """
+        messages = self._build_cover_letter_messages(resume_text, job_description, tone)
+        async for delta in self.stream_request(messages, endpoint="generate_cover_letter", task=TaskType.WRITING):
+            yield delta
     
     async def generate_cv(self, cv_data: Dict[str, Any]) -> str:
         """
@@ -200,77 +525,10 @@ class GroqClient:
             raise RuntimeError("Groq client is not available")
         
         try:
-            # Convert the input data to a clean format
-            personal_info = cv_data.get("personal_info", {})
-            work_exp = cv_data.get("work_experience", [])
-            education = cv_data.get("education", [])
-            skills = cv_data.get("skills", [])
-            
-            # Create a direct prompt that forces Groq to enhance the content
-            prompt = """
-            TASK: Completely rewrite and enhance the following CV information to be more professional and achievement-oriented.
-            
-            INSTRUCTIONS:
-            1. DO NOT simply repeat the input. Significantly enhance and expand every section.
-            2. For work experience, add 3-5 bullet points per role with specific achievements and metrics.
-            3. Use strong action verbs (e.g., 'Spearheaded', 'Orchestrated', 'Optimized').
-            4. Add quantifiable results wherever possible (e.g., 'Increased X by Y%', 'Reduced Z by W%').
-            5. Include relevant technical skills and tools used in each role.
-            6. Make the education section more detailed and professional.
-            7. Organize skills into relevant categories.
-            
-            INPUT CV DATA:
-            {input_data}
-            
-            OUTPUT FORMAT: Return ONLY the enhanced CV in markdown format with these sections:
-            # [Full Name]
-            [Contact Information]
-            
-            ## Professional Summary
-            [3-4 sentence professional summary]
-            
-            ## Work Experience
-            ### [Job Title] at [Company]
-            [Date Range]
-            - [Achievement 1 with metrics]
-            - [Achievement 2 with metrics]
-            
-            ## Education
-            ### [Degree] in [Field]
-            [University Name], [Graduation Year]
-            [Any honors or relevant coursework]
-            
-            ## Skills
-            - **Category 1:** [Skill 1], [Skill 2]
-            - **Category 2:** [Skill 3], [Skill 4]
-            """.format(
-                input_data=json.dumps({
-                    "personal_info": personal_info,
-                    "work_experience": work_exp,
-                    "education": education,
-                    "skills": skills
-                }, indent=2, ensure_ascii=False)
-            )
-            
-            messages = [
-                {
-                    "role": "system",
-                    "content": """You are a professional CV writer with 10+ years of experience working with top tech companies. 
-                    Your task is to completely rewrite and enhance the provided CV information to make it more professional and achievement-focused.
-                    
-                    IMPORTANT: Do NOT simply repeat the input. Significantly improve and expand upon every section with:
-                    - Specific achievements and metrics
-                    - Strong action verbs
-                    - Relevant technical details
-                    - Professional formatting
-                    
-                    The output should be a complete, ready-to-use CV that would impress hiring managers."""
-                },
-                {"role": "user", "content": prompt}
-            ]
+            messages = self._build_cv_messages(cv_data)
             
             # Get the enhanced CV content
-            enhanced_cv = await self._make_request(messages)
+            enhanced_cv = await self._make_request(messages, endpoint="generate_cv", task=TaskType.WRITING)
             return enhanced_cv
             
         except Exception as e:
@@ -278,6 +536,106 @@ class GroqClient:
             # Fallback to a simple format if enhancement fails
             return self._format_simple_cv(cv_data)
     
+    def _build_cv_messages(self, cv_data: Dict[str, Any]) -> List[Dict[str, str]]:
+        """Build the chat messages for CV enhancement."""
+        # Convert the input data to a clean format
+        personal_info = cv_data.get("personal_info", {})
+        work_exp = cv_data.get("work_experience", [])
+        education = cv_data.get("education", [])
+        skills = cv_data.get("skills", [])
+        
+        # Create a direct prompt that forces Groq to enhance the content
+        prompt = """
+        TASK: Completely rewrite and enhance the following CV information to be more professional and achievement-oriented.
+        
+        INSTRUCTIONS:
+        1. DO NOT simply repeat the input. Significantly enhance and expand every section.
+        2. For work experience, add 3-5 bullet points per role with specific achievements and metrics.
+        3. Use strong action verbs (e.g., 'Spearheaded', 'Orchestrated', 'Optimized').
+        4. Add quantifiable results wherever possible (e.g., 'Increased X by Y%', 'Reduced Z by W%').
+        5. Include relevant technical skills and tools used in each role.
+        6. Make the education section more detailed and professional.
+        7. Organize skills into relevant categories.
+        
+        INPUT CV DATA:
+        {input_data}
+        
+        OUTPUT FORMAT: Return ONLY the enhanced CV in markdown format with these sections:
+        # [Full Name]
+        [Contact Information]
+        
+        ## Professional Summary
+        [3-4 sentence professional summary]
+        
+        ## Work Experience
+        ### [Job Title] at [Company]
+        [Date Range]
+        - [Achievement 1 with metrics]
+        - [Achievement 2 with metrics]
+        
+        ## Education
+        ### [Degree] in [Field]
+        [University Name], [Graduation Year]
+        [Any honors or relevant coursework]
+        
+        ## Skills
+        - **Category 1:** [Skill 1], [Skill 2]
+        - **Category 2:** [Skill 3], [Skill 4]
+        """.format(
+            input_data=compact_json({
+                "personal_info": personal_info,
+                "work_experience": work_exp,
+                "education": education,
+                "skills": skills
+            })
+        )
+        
+        messages = [
+            {
+                "role": "system",
+                "content": """You are a professional CV writer with 10+ years of experience working with top tech companies. 
+                Your task is to completely rewrite and enhance the provided CV information to make it more professional and achievement-focused.
+                
+                IMPORTANT: Do NOT simply repeat the input. Significantly improve and expand upon every section with:
+                - Specific achievements and metrics
+                - Strong action verbs
+                - Relevant technical details
+                - Professional formatting
+                
+                The output should be a complete, ready-to-use CV that would impress hiring managers."""
+            },
+            {"role": "user", "content": prompt}
+        ]
+        
+        return messages
+    
+    def is_available(self) -> bool:
+        """
+        Check whether Groq requests can currently be made.
+        
+        Returns:
+            bool: False if the client is not configured or the circuit breaker is open
+        """
+        return bool(self.enabled and self.client) and self.breaker.is_available()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get runtime statistics for the LLM request path.
+        
+        Returns:
+            Dict with cache, retry, per-task routing and token budget, rate limit, coalescing and circuit breaker counters
+        """
+        return {
+            "enabled": self.enabled,
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "retry": self.retry_policy.stats(),
+            "routes": self.router.stats(),
+            "token_budget": self.budget.stats(),
+            "governor": self.governor.stats(),
+            "single_flight": self.single_flight.stats(),
+            "breaker": self.breaker.stats()
+        }
+    
     def _format_simple_cv(self, cv_data: Dict[str, Any]) -> str:
         # Simple fallback CV formatting
         personal_info = cv_data.get("personal_info", {})
@@ -370,51 +728,12 @@ class GroqClient:
             # Create a prompt for resume optimization
             try:
                 logger.info("Creating optimization prompt...")
-                prompt = """
-                TASK: Optimize the following resume text following best practices for ATS (Applicant Tracking Systems)
-                and modern resume standards.
-                {job_description_section}
-                RESUME TEXT:
-                {resume_text}
-                
-                INSTRUCTIONS:
-                1. Review the resume and suggest improvements based on ATS optimization best practices.
-                {job_description_instruction}
-                2. Generate an optimized version of the resume with improved formatting and content.
-                3. Provide an ATS compatibility score (0-100).
-                4. List 3-5 specific suggestions for improvement.
-                5. Focus on clarity, action verbs, quantifiable achievements, and professional presentation.
-                
-                FORMAT YOUR RESPONSE AS A SINGLE JSON OBJECT with these fields:
-                {{
-                    "optimized_text": "The optimized resume text",
-                    "score": 85,  # ATS compatibility score (0-100)
-                    "suggestions": ["Suggestion 1", "Suggestion 2", ...],
-                    "keywords_matched": ["keyword1", "keyword2", ...],
-                    "missing_keywords": ["keyword3", "keyword4", ...]
-                }}
-                """.format(
-                    resume_text=resume_text[:8000],  # Limit size to prevent token limit issues
-                    job_description_section=f"\nJOB DESCRIPTION TO MATCH:\n{job_description[:2000]}\n" if job_description else "",
-                    job_description_instruction="1a. Tailor the resume to match the job description if relevant." if job_description else ""
-                )
-                
-                messages = [
-                    {
-                        "role": "system",
-                        "content": """You are an expert resume optimizer with deep knowledge of ATS systems and hiring practices. 
-                        Your task is to help job seekers optimize their resumes following best practices.
-                        
-                        IMPORTANT: You MUST return a single valid JSON object with the specified fields.
-                        The response must be valid JSON that can be parsed by Python's json.loads()."""
-                    },
-                    {"role": "user", "content": prompt}
-                ]
+                messages = self._build_optimization_messages(resume_text, job_description)
                 
                 logger.debug("Sending request to Groq API...")
                 # Get the optimization results with timeout
                 response = await asyncio.wait_for(
-                    self._make_request(messages, model="llama-3.3-70b-versatile"),
+                    self._make_request(messages, endpoint="optimize_resume", task=TaskType.WRITING),
                     timeout=120  # 2 minutes timeout
                 )
                 logger.info("Received response from Groq API")
@@ -430,90 +749,7 @@ class GroqClient:
             
             try:
                 logger.debug("Parsing response from Groq API...")
-                # Clean up the response first - remove control characters except newlines and tabs
-                response = ''.join(char for char in response if ord(char) >= 32 or char in '\n\r\t')
-                response = response.strip()
-                
-                # Try to parse the response as JSON directly
-                try:
-                    # First try direct JSON parse
-                    result = json.loads(response)
-                    logger.debug("Successfully parsed direct JSON response")
-                except json.JSONDecodeError as e:
-                    logger.debug(f"Direct JSON parse failed: {str(e)}. Trying to clean and extract JSON...")
-                    
-                    # Try to extract JSON from markdown code blocks
-                    import re
-                    json_match = re.search(r'```(?:json)?\s*(\{.*\})\s*```', response, re.DOTALL) 
-                    if not json_match:
-                        # If no code block, try to find JSON object directly
-                        json_match = re.search(r'(\{[\s\S]*\})', response)
-                    
-                    if json_match:
-                        try:
-                            json_str = json_match.group(1).strip()
-                            # Clean the JSON string
-                            json_str = ''.join(char for char in json_str if ord(char) >= 32 or char in '\n\r\t')
-                            # Try to fix common JSON issues
-                            json_str = json_str.replace('\n', ' ').replace('\r', ' ').replace('\t', ' ')
-                            json_str = re.sub(r',\s*([}\]])', r'\1', json_str)  # Remove trailing commas
-                            json_str = re.sub(r'([\{\[,])\s*([}\],])', r'\1""\2', json_str)  # Add empty strings for missing values
-                            
-                            # Try to parse the cleaned JSON
-                            result = json.loads(json_str)
-                            logger.debug("Successfully parsed JSON after cleaning")
-                        except json.JSONDecodeError as e2:
-                            logger.error(f"Failed to parse JSON after cleaning: {str(e2)}")
-                            # Try to salvage what we can by extracting key-value pairs
-                            try:
-                                result = {}
-                                # Extract optimized_text
-                                text_match = re.search(r'"optimized_text"\s*:\s*"(.*?)(?<!\\)"', json_str, re.DOTALL)
-                                if text_match:
-                                    result['optimized_text'] = text_match.group(1).replace('\\"', '"')
-                                
-                                # Extract score
-                                score_match = re.search(r'"score"\s*:\s*(\d+(?:\.\d+)?)', json_str)
-                                if score_match:
-                                    result['score'] = float(score_match.group(1))
-                                
-                                # Extract suggestions
-                                suggestions_match = re.search(r'"suggestions"\s*:\s*\[(.*?)\]', json_str, re.DOTALL)
-                                if suggestions_match:
-                                    suggestions_str = suggestions_match.group(1)
-                                    suggestions = [s.strip(' "\'') for s in re.findall(r'"(.*?)(?<!\\)"', suggestions_str)]
-                                    result['suggestions'] = suggestions
-                                
-                                if not result:
-                                    raise ValueError("Could not extract any fields from response")
-                                
-                                logger.debug("Partially parsed JSON using regex extraction")
-                                
-                            except Exception as e3:
-                                logger.error(f"Failed to extract fields using regex: {str(e3)}")
-                                raise ValueError("Could not parse response as valid JSON")
-                
-                # Validate the result structure
-                required_fields = ["optimized_text", "score", "suggestions"]
-                for field in required_fields:
-                    if field not in result:
-                        raise ValueError(f"Missing required field in response: {field}")
-                
-                # Ensure score is a number between 0 and 100
-                try:
-                    result["score"] = max(0, min(100, float(result["score"])))
-                except (ValueError, TypeError):
-                    result["score"] = 0.0
-                
-                # Ensure suggestions is a list
-                if not isinstance(result.get("suggestions"), list):
-                    result["suggestions"] = [str(s) for s in result.get("suggestions", "").split("\n") if s.strip()]
-                
-                # Add missing fields if not present
-                result["keywords_matched"] = result.get("keywords_matched", [])
-                result["missing_keywords"] = result.get("missing_keywords", [])
-                result["status"] = "success"
-                
+                result = self._parse_optimization_response(response)
                 logger.info(f"Optimization completed successfully. Score: {result.get('score')}")
                 return result
                 
@@ -540,6 +776,93 @@ class GroqClient:
                 "status": "error"
             }
 
+    def _build_optimization_messages(self, resume_text: str, job_description: str = "") -> List[Dict[str, str]]:
+        """Build the chat messages for resume optimization."""
+        prompt = """
+        TASK: Optimize the following resume text following best practices for ATS (Applicant Tracking Systems)
+        and modern resume standards.
+        {job_description_section}
+        RESUME TEXT:
+        {resume_text}
+        
+        INSTRUCTIONS:
+        1. Review the resume and suggest improvements based on ATS optimization best practices.
+        {job_description_instruction}
+        2. Generate an optimized version of the resume with improved formatting and content.
+        3. Provide an ATS compatibility score (0-100).
+        4. List 3-5 specific suggestions for improvement.
+        5. Focus on clarity, action verbs, quantifiable achievements, and professional presentation.
+        
+        FORMAT YOUR RESPONSE AS A SINGLE JSON OBJECT with these fields:
+        {{
+            "optimized_text": "The optimized resume text",
+            "score": 85,  # ATS compatibility score (0-100)
+            "suggestions": ["Suggestion 1", "Suggestion 2", ...],
+            "keywords_matched": ["keyword1", "keyword2", ...],
+            "missing_keywords": ["keyword3", "keyword4", ...]
+        }}
+        """.format(
+            resume_text=trim_to_tokens(resume_text, 2000),  # Limit size to prevent token limit issues
+            job_description_section=f"\nJOB DESCRIPTION TO MATCH:\n{trim_to_tokens(job_description, 500)}\n" if job_description else "",
+            job_description_instruction="1a. Tailor the resume to match the job description if relevant." if job_description else ""
+        )
+        
+        messages = [
+            {
+                "role": "system",
+                "content": """You are an expert resume optimizer with deep knowledge of ATS systems and hiring practices. 
+                Your task is to help job seekers optimize their resumes following best practices.
+        
+                IMPORTANT: You MUST return a single valid JSON object with the specified fields.
+                The response must be valid JSON that can be parsed by Python's json.loads()."""
+            },
+            {"role": "user", "content": prompt}
+        ]
+        
+        return messages
+    
+    def _parse_optimization_response(self, response: str) -> Dict[str, Any]:
+        """
+        Parse and validate the JSON returned for a resume optimization request.
+        
+        Args:
+            response: Raw completion text
+            
+        Returns:
+            Dict containing optimized_text, score, suggestions and keyword lists
+            
+        Raises:
+            ValueError: If the response cannot be parsed or is missing required fields
+        """
+        try:
+            result = extract_json_object(response)
+        except JSONExtractionError as e:
+            logger.error(f"Failed to extract JSON from optimization response: {str(e)}")
+            raise ValueError("Could not parse response as valid JSON")
+        
+        # Validate the result structure
+        required_fields = ["optimized_text", "score", "suggestions"]
+        for field in required_fields:
+            if field not in result:
+                raise ValueError(f"Missing required field in response: {field}")
+        
+        # Ensure score is a number between 0 and 100
+        try:
+            result["score"] = max(0, min(100, float(result["score"])))
+        except (ValueError, TypeError):
+            result["score"] = 0.0
+        
+        # Ensure suggestions is a list
+        if not isinstance(result.get("suggestions"), list):
+            result["suggestions"] = [str(s) for s in result.get("suggestions", "").split("\n") if s.strip()]
+        
+        # Add missing fields if not present
+        result["keywords_matched"] = result.get("keywords_matched", [])
+        result["missing_keywords"] = result.get("missing_keywords", [])
+        result["status"] = "success"
+        
+        return result
+    
     async def generate_cover_letter(self, resume_text: str, job_description: str, tone: str = "professional") -> str:
         """
         Generate a cover letter based on resume and job description.
@@ -556,25 +879,11 @@ class GroqClient:
             return "Groq client is not enabled. Unable to generate cover letter."
             
         try:
-            prompt = f"""
-            Write a {tone} cover letter based on the following resume and job description.
-            
-            Resume:
-            {resume_text}
-            
-            Job Description:
-            {job_description}
-            
-            Please generate a well-structured cover letter that highlights the candidate's
-            relevant experience and skills for this position. Focus on how their background
-            makes them a strong fit for the role.
-            """
-            
             # Call Groq API
-            
             response = await self._make_request(
-                messages=[{"role": "user", "content": prompt}],
-                model="llama3-70b-8192"
+                messages=self._build_cover_letter_messages(resume_text, job_description, tone),
+                endpoint="generate_cover_letter",
+                task=TaskType.WRITING
             )
             
             return response.strip()
@@ -583,6 +892,23 @@ class GroqClient:
             logger.error(f"Error generating cover letter: {str(e)}", exc_info=True)
             return f"Error generating cover letter: {str(e)}"
 
+    def _build_cover_letter_messages(self, resume_text: str, job_description: str, tone: str = "professional") -> List[Dict[str, str]]:
+        """Build the chat messages for cover letter generation."""
+        prompt = f"""
+        Write a {tone} cover letter based on the following resume and job description.
+        
+        Resume:
+        {trim_to_tokens(resume_text, 3000)}
+        
+        Job Description:
+        {trim_to_tokens(job_description, 1500)}
+        
+        Please generate a well-structured cover letter that highlights the candidate's
+        relevant experience and skills for this position. Focus on how their background
+        makes them a strong fit for the role.
+        """
+        return [{"role": "user", "content": prompt}]
+    
     async def generate_portfolio(
         self,
         resume_data: Dict[str, Any],
@@ -619,22 +945,15 @@ class GroqClient:
             # Call Groq API using the async _make_request method
             content = await self._make_request(
                 messages=messages,
-                model="mixtral-8x7b-32768"
+                endpoint="generate_portfolio",
+                task=TaskType.PORTFOLIO_ENHANCEMENT
             )
             
             # Try to parse the response as JSON
             try:
-                # Clean up the response first
-                content = content.strip()
-                if content.startswith('```json'):
-                    content = content[content.find('{'):content.rfind('}')+1]
-                elif content.startswith('```'):
-                    content = content[content.find('\n')+1:content.rfind('```')].strip()
-                
-                portfolio_data = json.loads(content)
-                return portfolio_data
+                return extract_json_object(content)
                 
-            except json.JSONDecodeError:
+            except JSONExtractionError:
                 # If we can't parse as JSON, return as plain text
                 logger.warning("Could not parse portfolio response as JSON, returning as plain text")
                 return {"content": content}
@@ -686,8 +1005,8 @@ Return a JSON object with the following structure:
 """
         return prompt.format(
             sections="\n- ".join([""] + sections),  # Add bullet points
-            resume_content=resume_content[:5000],  # Limit length to avoid token limits
-            analysis=json.dumps(analysis, indent=2) if isinstance(analysis, dict) else str(analysis)
+            resume_content=trim_to_tokens(resume_content, 1250),  # Limit length to avoid token limits
+            analysis=compact_json(analysis) if isinstance(analysis, dict) else str(analysis)
         )
 
     async def generate_portfolio(self, resume_text: str, sections: List[str]) -> Dict[str, Any]:
@@ -722,7 +1041,7 @@ Return a JSON object with the following structure:
             ]
             
             # Generate content using Groq
-            response = await self._make_request(messages)
+            response = await self._make_request(messages, endpoint="generate_portfolio", task=TaskType.PORTFOLIO_ENHANCEMENT)
             
             # Process the response
             if response and 'choices' in response and len(response['choices']) > 0:
@@ -0,0 +1,382 @@
+"""
+Background jobs for long-running generation requests.
+
+CV, portfolio and optimization requests can take a minute or more of LLM and
+rendering time, longer than many proxies keep a request open. Submitting one
+as a job returns its id at once; a fixed pool of worker tasks runs queued jobs,
+so the number of generations in progress is bounded independently of the
+number of open requests. Clients poll the job or follow it as server-sent
+events until it has succeeded or failed.
+
+Jobs are rows in the jobs table, so their state and results survive a
+restart, and several processes (e.g. uvicorn workers) can share the table. A
+job is claimed with a conditional update before it runs, so it never runs
+twice at once; the claim records the process's worker id and a lease that the
+process renews every lease_seconds / 3 while the job runs. A running job whose
+lease has expired was left by a process that stopped or crashed, and is queued
+again (up to max_attempts runs each) at startup or by any live process's
+periodic check; jobs of other live processes are left alone. Jobs running at
+shutdown() are handed back to the queue at once. Finished jobs are deleted
+after retention_hours.
+
+Configured with JOB_WORKERS (default 4), JOB_QUEUE_MAX (default 100),
+JOB_MAX_ATTEMPTS (default 2), JOB_RETENTION_HOURS (default 24) and
+JOB_LEASE_SECONDS (default 60).
+"""
+import os
+import time
+import uuid
+import socket
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from ..database.local_config import SessionLocal
+from ..database.models import Job
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+# A handler runs one job: (payload, current_user, db) -> JSON-serializable result
+JobHandler = Callable[[Dict[str, Any], Dict[str, Any], Session], Awaitable[Dict[str, Any]]]
+
+
+class JobQueueFullError(Exception):
+    """Raised when a job is submitted while the queue is full."""
+
+
+def job_to_dict(job: Job) -> Dict[str, Any]:
+    """Serialize a job for API responses."""
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "attempts": job.attempts,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "result": job.result,
+        "error": job.error,
+        "error_status_code": job.error_status_code,
+    }
+
+
+class JobQueue:
+    """Persistent job queue run by a bounded pool of worker tasks."""
+
+    def __init__(
+        self,
+        workers: int = 4,
+        max_queued: int = 100,
+        max_attempts: int = 2,
+        retention_hours: float = 24,
+        lease_seconds: float = 60,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        """
+        Initialize the queue. Workers are started by start().
+
+        Args:
+            workers: Jobs run at once
+            max_queued: Jobs waiting to run before submissions are refused
+            max_attempts: Runs of a job interrupted by restarts before it is failed
+            retention_hours: Hours finished jobs are kept
+            lease_seconds: Seconds a running job is kept by its process without a renewal
+            session_factory: Creates database sessions
+        """
+        self.workers = workers
+        self.max_queued = max_queued
+        self.max_attempts = max_attempts
+        self.retention_hours = retention_hours
+        self.lease_seconds = lease_seconds
+        # Unique per queue, so jobs of a restarted process are not mistaken for its own
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._session_factory = session_factory
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        self._updates: Dict[str, asyncio.Event] = {}
+        self._running = 0
+        self._counters = Counter()
+        self._run_seconds = 0.0
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """Register the handler that runs jobs of a kind."""
+        self._handlers[kind] = handler
+
+    @property
+    def kinds(self) -> List[str]:
+        """Registered job kinds."""
+        return list(self._handlers)
+
+    def submit(self, db: Session, kind: str, payload: Dict[str, Any], user_id: Optional[str]) -> Job:
+        """
+        Store a job and queue it to run.
+
+        Args:
+            db: Database session
+            kind: Registered job kind
+            payload: JSON-serializable input passed to the handler
+            user_id: Owner of the job
+
+        Returns:
+            Job: The stored job, with status "queued"
+
+        Raises:
+            ValueError: If no handler is registered for kind
+            JobQueueFullError: If max_queued jobs are already waiting
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if self._queue.qsize() >= self.max_queued:
+            self._counters["rejected"] += 1
+            raise JobQueueFullError(f"Too many queued jobs ({self.max_queued}), try again later")
+
+        job = Job(kind=kind, payload=payload, user_id=user_id, status=QUEUED)
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        self._queue.put_nowait(job.id)
+        self._counters["submitted"] += 1
+        logger.info(f"Queued {kind} job {job.id} ({self._queue.qsize()} waiting)")
+        return job
+
+    def _lease(self) -> datetime:
+        return datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+
+    def _requeue_abandoned(self, db: Session) -> List[str]:
+        """Mark running jobs whose lease has expired queued; returns the ids this process requeued."""
+        # Leases are null on jobs claimed before leases were recorded
+        abandoned = (Job.status == RUNNING) & (Job.lease_expires_at.is_(None) | (Job.lease_expires_at < datetime.utcnow()))
+        requeued = []
+        for row in db.query(Job.id).filter(abandoned).order_by(Job.created_at).all():
+            # Conditional, so a job found by several processes at once is requeued by one
+            if db.query(Job).filter(Job.id == row.id, abandoned).update(
+                {Job.status: QUEUED, Job.worker_id: None, Job.lease_expires_at: None},
+                synchronize_session=False
+            ):
+                requeued.append(row.id)
+        db.commit()
+        self._counters["requeued"] += len(requeued)
+        return requeued
+
+    async def start(self) -> None:
+        """Queue jobs left by stopped processes, delete expired ones and start the workers."""
+        if self._tasks:
+            return
+        with self._session_factory() as db:
+            cutoff = datetime.utcnow() - timedelta(hours=self.retention_hours)
+            expired = db.query(Job).filter(Job.status.in_(FINISHED), Job.finished_at < cutoff).delete(synchronize_session=False)
+            db.commit()
+            interrupted = self._requeue_abandoned(db)
+            pending = [row.id for row in db.query(Job.id).filter(Job.status == QUEUED).order_by(Job.created_at)]
+
+        for job_id in pending:
+            self._queue.put_nowait(job_id)
+        if pending or expired:
+            logger.info(f"Job queue resumed {len(pending)} jobs ({len(interrupted)} interrupted), deleted {expired} expired")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._keep_leases()))
+
+    async def shutdown(self) -> None:
+        """Stop the workers and queue the jobs they were running again for the next start()."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        with self._session_factory() as db:
+            released = db.query(Job).filter(Job.status == RUNNING, Job.worker_id == self.worker_id).update(
+                {Job.status: QUEUED, Job.worker_id: None, Job.lease_expires_at: None},
+                synchronize_session=False
+            )
+            db.commit()
+        if released:
+            logger.info(f"Job queue released {released} interrupted jobs")
+
+    async def _keep_leases(self) -> None:
+        """Renew the leases of this process's running jobs and requeue jobs abandoned by others."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                with self._session_factory() as db:
+                    db.query(Job).filter(Job.status == RUNNING, Job.worker_id == self.worker_id).update(
+                        {Job.lease_expires_at: self._lease()}, synchronize_session=False
+                    )
+                    db.commit()
+                    requeued = self._requeue_abandoned(db)
+                for job_id in requeued:
+                    self._queue.put_nowait(job_id)
+                if requeued:
+                    logger.info(f"Job queue requeued {len(requeued)} jobs abandoned by stopped processes")
+            except Exception as e:
+                logger.error(f"Job lease renewal failed: {str(e)}", exc_info=True)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                logger.error(f"Job worker error on {job_id}: {str(e)}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    def _claim(self, job_id: str) -> Optional[Tuple[str, Dict[str, Any], Optional[str]]]:
+        """Mark a queued job running; returns its kind, payload and owner, or None if it was not queued."""
+        with self._session_factory() as db:
+            claimed = db.query(Job).filter(Job.id == job_id, Job.status == QUEUED).update(
+                {
+                    Job.status: RUNNING,
+                    Job.started_at: datetime.utcnow(),
+                    Job.attempts: Job.attempts + 1,
+                    Job.worker_id: self.worker_id,
+                    Job.lease_expires_at: self._lease()
+                },
+                synchronize_session=False
+            )
+            db.commit()
+            if not claimed:
+                return None
+            job = db.get(Job, job_id)
+            kind, payload, user_id, attempts = job.kind, job.payload, job.user_id, job.attempts
+
+        if attempts > self.max_attempts:
+            self._finish(job_id, FAILED, error="Job was interrupted too many times", status_code=500)
+            return None
+        return kind, payload, user_id
+
+    def _finish(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+        status_code: Optional[int] = None
+    ) -> None:
+        with self._session_factory() as db:
+            # Only while the claim is this process's; a job whose lease lapsed may be running elsewhere
+            finished = db.query(Job).filter(Job.id == job_id, Job.worker_id == self.worker_id).update({
+                Job.status: status,
+                Job.result: result,
+                Job.error: error,
+                Job.error_status_code: status_code,
+                Job.lease_expires_at: None,
+                Job.finished_at: datetime.utcnow()
+            }, synchronize_session=False)
+            db.commit()
+        if not finished:
+            logger.warning(f"Job {job_id} was requeued after its lease expired, dropping this run's {status} result")
+            return
+        self._counters[status] += 1
+        self._notify(job_id)
+
+    async def _run(self, job_id: str) -> None:
+        claim = self._claim(job_id)
+        if claim is None:
+            return
+        kind, payload, user_id = claim
+        self._notify(job_id)
+        logger.info(f"Running {kind} job {job_id}")
+
+        self._running += 1
+        started = time.monotonic()
+        try:
+            with self._session_factory() as db:
+                result = await self._handlers[kind](payload, {"id": user_id}, db)
+        except asyncio.CancelledError:
+            # Stopped by shutdown(), which queues the job again
+            logger.info(f"{kind} job {job_id} interrupted, it will run again after a restart")
+            raise
+        except HTTPException as e:
+            logger.warning(f"{kind} job {job_id} failed with {e.status_code}: {e.detail}")
+            self._finish(job_id, FAILED, error=str(e.detail), status_code=e.status_code)
+        except Exception as e:
+            logger.error(f"{kind} job {job_id} failed: {str(e)}", exc_info=True)
+            self._finish(job_id, FAILED, error=str(e), status_code=500)
+        else:
+            self._finish(job_id, SUCCEEDED, result=result)
+        finally:
+            self._running -= 1
+            self._run_seconds += time.monotonic() - started
+
+    def _notify(self, job_id: str) -> None:
+        event = self._updates.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    async def watch(self, job_id: str, heartbeat: float = 15.0) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Follow a job until it finishes.
+
+        Yields the job each time its status changes, starting with its current
+        state, and None after heartbeat seconds without a change. The last
+        job yielded has finished. Jobs run by another process are picked up at
+        the next heartbeat.
+
+        Args:
+            job_id: Job id
+            heartbeat: Seconds between checks while nothing changes
+
+        Yields:
+            Job dicts from job_to_dict, or None as a keep-alive
+        """
+        last_status = None
+        while True:
+            # Taken before reading the job, so a change made after the read is not missed
+            changed = self._updates.setdefault(job_id, asyncio.Event())
+            with self._session_factory() as db:
+                job = db.get(Job, job_id)
+                data = job_to_dict(job) if job is not None else None
+            if data is None:
+                return
+            if data["status"] != last_status:
+                last_status = data["status"]
+                yield data
+            if last_status in FINISHED:
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get queue depth and job counters."""
+        finished = self._counters[SUCCEEDED] + self._counters[FAILED]
+        return {
+            "workers": self.workers,
+            "worker_id": self.worker_id,
+            "started": bool(self._tasks),
+            "queued": self._queue.qsize(),
+            "running": self._running,
+            "submitted": self._counters["submitted"],
+            "rejected": self._counters["rejected"],
+            "requeued": self._counters["requeued"],
+            "succeeded": self._counters[SUCCEEDED],
+            "failed": self._counters[FAILED],
+            "avg_run_ms": round(self._run_seconds / finished * 1000, 1) if finished else None,
+        }
+
+
+def create_job_queue_from_env() -> JobQueue:
+    """Create a JobQueue configured from JOB_* environment variables."""
+    return JobQueue(
+        workers=int(os.getenv("JOB_WORKERS", "4")),
+        max_queued=int(os.getenv("JOB_QUEUE_MAX", "100")),
+        max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", "2")),
+        retention_hours=float(os.getenv("JOB_RETENTION_HOURS", "24")),
+        lease_seconds=float(os.getenv("JOB_LEASE_SECONDS", "60"))
+    )
+
+
+# Process-wide queue; handlers are registered by app.main
+job_queue = create_job_queue_from_env()
@@ -0,0 +1,318 @@
+"""
+Content-addressed response cache for LLM completions.
+
+Responses are keyed by a SHA-256 hash of the normalized request payload
+(model, messages, temperature, max_tokens). Lookups go through an in-memory
+LRU tier first and, when configured, an on-disk SQLite tier that survives
+restarts and is shared between worker processes.
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import asyncio
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Time-to-live (seconds) per calling endpoint. Endpoints not listed use the default.
+DEFAULT_ENDPOINT_TTLS = {
+    "optimize_resume": 6 * 3600,
+    "generate_cv": 6 * 3600,
+    "generate_cover_letter": 3600,
+    "generate_portfolio": 6 * 3600,
+    "analyze_resume": 24 * 3600,
+    "portfolio_extract": 24 * 3600,
+}
+DEFAULT_TTL = 3600
+
+
+def _parse_ttls(value: str) -> Dict[str, int]:
+    """Parse an ``endpoint=seconds,endpoint=seconds`` string into a TTL mapping."""
+    ttls = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        name, seconds = item.split("=", 1)
+        try:
+            ttls[name.strip()] = int(seconds)
+        except ValueError:
+            logger.warning(f"Ignoring invalid LLM cache TTL entry: {item}")
+    return ttls
+
+
+class LLMResponseCache:
+    """Two-tier (memory LRU + optional SQLite) cache for LLM responses."""
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        max_bytes: int = 64 * 1024 * 1024,
+        default_ttl: int = DEFAULT_TTL,
+        endpoint_ttls: Optional[Dict[str, int]] = None,
+        sqlite_path: Optional[str] = None,
+        sqlite_max_entries: int = 10000,
+        enabled: bool = True
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of responses kept in memory
+            max_bytes: Maximum total size of responses kept in memory
+            default_ttl: TTL in seconds for endpoints without an explicit TTL
+            endpoint_ttls: Mapping of endpoint name to TTL in seconds
+            sqlite_path: Path of the on-disk tier. The disk tier is disabled if not set.
+            sqlite_max_entries: Maximum number of rows kept in the disk tier
+            enabled: Whether the cache is used at all
+        """
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.endpoint_ttls = dict(DEFAULT_ENDPOINT_TTLS)
+        self.endpoint_ttls.update(endpoint_ttls or {})
+        self.sqlite_max_entries = sqlite_max_entries
+
+        # key -> (expires_at, value, size)
+        self._memory: "OrderedDict[str, Tuple[float, str, int]]" = OrderedDict()
+        self._memory_bytes = 0
+
+        self._counters = defaultdict(int)
+        self._endpoint_counters = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+        self._db = None
+        self._db_lock = threading.Lock()
+        if enabled and sqlite_path:
+            self._init_sqlite(sqlite_path)
+
+    def _init_sqlite(self, sqlite_path: str) -> None:
+        """Open (and create if needed) the on-disk cache tier."""
+        try:
+            directory = os.path.dirname(sqlite_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache(last_access)")
+            self._db.commit()
+            logger.info(f"LLM response cache disk tier enabled at {sqlite_path}")
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open LLM cache database {sqlite_path}: {str(e)}")
+            self._db = None
+
+    @staticmethod
+    def make_key(payload: Dict[str, Any]) -> str:
+        """
+        Build a content-addressed key for a request payload.
+
+        Args:
+            payload: Request payload with model, messages, temperature, max_tokens
+                and response_format
+
+        Returns:
+            str: Hex SHA-256 digest of the normalized payload
+        """
+        normalized = {
+            "model": payload.get("model"),
+            "messages": [
+                {"role": m.get("role"), "content": m.get("content")}
+                for m in payload.get("messages", [])
+            ],
+            "temperature": payload.get("temperature"),
+            "max_tokens": payload.get("max_tokens"),
+        }
+        if payload.get("response_format"):
+            # JSON mode changes the response to the same messages; plain requests keep their existing keys
+            normalized["response_format"] = payload["response_format"]
+        encoded = json.dumps(normalized, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def ttl_for(self, endpoint: str) -> int:
+        """Get the TTL in seconds for an endpoint."""
+        return self.endpoint_ttls.get(endpoint, self.default_ttl)
+
+    async def get(self, key: str, endpoint: str = "default") -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Key returned by make_key
+            endpoint: Name of the calling endpoint (for per-endpoint counters)
+
+        Returns:
+            The cached response text, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        value = self._memory_get(key)
+        if value is not None:
+            self._counters["memory_hits"] += 1
+            self._endpoint_counters[endpoint]["hits"] += 1
+            return value
+
+        if self._db is not None:
+            row = await asyncio.to_thread(self._disk_get, key)
+            if row is not None:
+                value, expires_at = row
+                # Promote to the memory tier for subsequent lookups
+                self._memory_set(key, value, expires_at)
+                self._counters["disk_hits"] += 1
+                self._endpoint_counters[endpoint]["hits"] += 1
+                return value
+
+        self._counters["misses"] += 1
+        self._endpoint_counters[endpoint]["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: str, endpoint: str = "default") -> None:
+        """
+        Store a response.
+
+        Args:
+            key: Key returned by make_key
+            value: Response text to cache
+            endpoint: Name of the calling endpoint, used to pick the TTL
+        """
+        if not self.enabled or not value:
+            return
+
+        ttl = self.ttl_for(endpoint)
+        if ttl <= 0:
+            return
+
+        expires_at = time.time() + ttl
+        self._memory_set(key, value, expires_at)
+        self._counters["sets"] += 1
+
+        if self._db is not None:
+            await asyncio.to_thread(self._disk_set, key, value, expires_at)
+
+    def _memory_get(self, key: str) -> Optional[str]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expires_at, value, size = entry
+        if expires_at <= time.time():
+            del self._memory[key]
+            self._memory_bytes -= size
+            self._counters["expirations"] += 1
+            return None
+        self._memory.move_to_end(key)
+        return value
+
+    def _memory_set(self, key: str, value: str, expires_at: float) -> None:
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= previous[2]
+
+        self._memory[key] = (expires_at, value, size)
+        self._memory_bytes += size
+
+        # Evict least recently used entries until both bounds hold
+        while len(self._memory) > self.max_entries or self._memory_bytes > self.max_bytes:
+            _, (_, _, evicted_size) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+            self._counters["evictions"] += 1
+
+    def _disk_get(self, key: str) -> Optional[Tuple[str, float]]:
+        now = time.time()
+        try:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if row[1] <= now:
+                    self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._db.commit()
+                    self._counters["expirations"] += 1
+                    return None
+                self._db.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+                self._db.commit()
+                return row[0], row[1]
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache disk lookup failed: {str(e)}")
+            return None
+
+    def _disk_set(self, key: str, value: str, expires_at: float) -> None:
+        now = time.time()
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                    (key, value, expires_at, now)
+                )
+                self._db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+                count = self._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+                overflow = count - self.sqlite_max_entries
+                if overflow > 0:
+                    self._db.execute(
+                        "DELETE FROM llm_cache WHERE key IN "
+                        "(SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                        (overflow,)
+                    )
+                    self._counters["evictions"] += overflow
+                self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache disk write failed: {str(e)}")
+
+    def clear(self) -> None:
+        """Remove all entries from both tiers."""
+        self._memory.clear()
+        self._memory_bytes = 0
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and tier sizes."""
+        hits = self._counters["memory_hits"] + self._counters["disk_hits"]
+        lookups = hits + self._counters["misses"]
+        return {
+            "enabled": self.enabled,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "disk_enabled": self._db is not None,
+            "memory_hits": self._counters["memory_hits"],
+            "disk_hits": self._counters["disk_hits"],
+            "misses": self._counters["misses"],
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "sets": self._counters["sets"],
+            "evictions": self._counters["evictions"],
+            "expirations": self._counters["expirations"],
+            "endpoints": {name: dict(counts) for name, counts in self._endpoint_counters.items()},
+        }
+
+
+def create_cache_from_env() -> LLMResponseCache:
+    """Create an LLMResponseCache configured from LLM_CACHE_* environment variables."""
+    return LLMResponseCache(
+        enabled=os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("true", "1", "t"),
+        max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512")),
+        max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+        default_ttl=int(os.getenv("LLM_CACHE_DEFAULT_TTL", str(DEFAULT_TTL))),
+        endpoint_ttls=_parse_ttls(os.getenv("LLM_CACHE_TTLS", "")),
+        sqlite_path=os.getenv("LLM_CACHE_SQLITE_PATH") or None,
+        sqlite_max_entries=int(os.getenv("LLM_CACHE_SQLITE_MAX_ENTRIES", "10000")),
+    )
+
+
+# Process-wide cache shared by every GroqClient instance
+llm_cache = create_cache_from_env()
@@ -0,0 +1,196 @@
+"""
+Model routing for Groq requests.
+
+Each request is classified into a task type and routed to the model, token
+limit and temperature configured for that task. Short structured work
+(extraction, scoring) runs on a small, fast model, while long-form writing
+keeps the large model. Latency and cost are tracked per task against the
+route's targets so the table can be tuned from /api/llm/stats.
+
+Routes can be overridden per task with environment variables, e.g.
+GROQ_MODEL_EXTRACTION, GROQ_MAX_TOKENS_WRITING or GROQ_TEMPERATURE_SCORING.
+"""
+import os
+import logging
+from enum import Enum
+from dataclasses import dataclass, replace
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class TaskType(str, Enum):
+    """Kinds of work sent to the LLM."""
+    EXTRACTION = "extraction"
+    SCORING = "scoring"
+    WRITING = "writing"
+    PORTFOLIO_ENHANCEMENT = "portfolio_enhancement"
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    """Model settings and targets for one task type."""
+    model: str
+    max_tokens: int
+    temperature: float
+    target_latency_ms: int
+    input_cost_per_mtok: float
+    output_cost_per_mtok: float
+
+
+DEFAULT_ROUTES: Dict[TaskType, ModelRoute] = {
+    TaskType.EXTRACTION: ModelRoute(
+        model="llama-3.1-8b-instant", max_tokens=2048, temperature=0.1,
+        target_latency_ms=2000, input_cost_per_mtok=0.05, output_cost_per_mtok=0.08
+    ),
+    TaskType.SCORING: ModelRoute(
+        model="llama-3.1-8b-instant", max_tokens=1024, temperature=0.2,
+        target_latency_ms=1500, input_cost_per_mtok=0.05, output_cost_per_mtok=0.08
+    ),
+    TaskType.WRITING: ModelRoute(
+        model="llama-3.3-70b-versatile", max_tokens=4000, temperature=0.7,
+        target_latency_ms=10000, input_cost_per_mtok=0.59, output_cost_per_mtok=0.79
+    ),
+    TaskType.PORTFOLIO_ENHANCEMENT: ModelRoute(
+        model="llama-3.3-70b-versatile", max_tokens=3000, temperature=0.6,
+        target_latency_ms=8000, input_cost_per_mtok=0.59, output_cost_per_mtok=0.79
+    ),
+}
+
+# Task used for each GroqClient endpoint name when the caller does not pass one
+ENDPOINT_TASKS: Dict[str, TaskType] = {
+    "generate_cv": TaskType.WRITING,
+    "optimize_resume": TaskType.WRITING,
+    "generate_cover_letter": TaskType.WRITING,
+    "generate_portfolio": TaskType.PORTFOLIO_ENHANCEMENT,
+    "portfolio_enhance": TaskType.PORTFOLIO_ENHANCEMENT,
+    "portfolio_enhance_section": TaskType.PORTFOLIO_ENHANCEMENT,
+    "portfolio_extract": TaskType.EXTRACTION,
+    "portfolio_sections": TaskType.EXTRACTION,
+    "analyze_resume": TaskType.EXTRACTION,
+    "ats_score": TaskType.SCORING,
+}
+
+DEFAULT_TASK = TaskType.WRITING
+
+# Number of recent latencies kept per task for percentiles
+LATENCY_SAMPLES = 500
+
+
+class ModelRouter:
+    """Maps task types to model routes and tracks latency and cost per task."""
+
+    def __init__(
+        self,
+        routes: Optional[Dict[TaskType, ModelRoute]] = None,
+        endpoint_tasks: Optional[Dict[str, TaskType]] = None
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            routes: Route per task type. Defaults to DEFAULT_ROUTES.
+            endpoint_tasks: Task type per endpoint name. Defaults to ENDPOINT_TASKS.
+        """
+        self.routes = dict(routes or DEFAULT_ROUTES)
+        self.endpoint_tasks = dict(endpoint_tasks or ENDPOINT_TASKS)
+        self._latencies: Dict[TaskType, Deque[float]] = defaultdict(lambda: deque(maxlen=LATENCY_SAMPLES))
+        self._counters: Dict[TaskType, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+
+    def resolve_task(self, task: Optional[Union[TaskType, str]] = None, endpoint: str = "default") -> TaskType:
+        """
+        Determine the task type of a request.
+
+        Args:
+            task: Explicit task type or its value, if the caller knows it
+            endpoint: Endpoint name, used when no task is given
+
+        Returns:
+            TaskType: The resolved task type
+        """
+        if task is not None:
+            return TaskType(task)
+        return self.endpoint_tasks.get(endpoint, DEFAULT_TASK)
+
+    def route(self, task: Optional[Union[TaskType, str]] = None, endpoint: str = "default") -> ModelRoute:
+        """Get the model route for a task (or for an endpoint's default task)."""
+        return self.routes[self.resolve_task(task, endpoint)]
+
+    def record(
+        self,
+        task: TaskType,
+        route: ModelRoute,
+        latency_ms: float,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0
+    ) -> None:
+        """
+        Record the outcome of a completed request.
+
+        Args:
+            task: Task type of the request
+            route: Route used for the request
+            latency_ms: Time taken by the upstream call in milliseconds
+            prompt_tokens: Prompt tokens reported by the API
+            completion_tokens: Completion tokens reported by the API
+        """
+        counters = self._counters[task]
+        counters["requests"] += 1
+        counters["prompt_tokens"] += prompt_tokens
+        counters["completion_tokens"] += completion_tokens
+        counters["cost_usd"] += (
+            prompt_tokens * route.input_cost_per_mtok + completion_tokens * route.output_cost_per_mtok
+        ) / 1_000_000
+        if latency_ms > route.target_latency_ms:
+            counters["over_target"] += 1
+        self._latencies[task].append(latency_ms)
+
+    @staticmethod
+    def _percentile(sorted_values: List[float], fraction: float) -> float:
+        index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+        return round(sorted_values[index], 1)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get per-task routes, latency percentiles and estimated cost."""
+        result = {}
+        for task, route in self.routes.items():
+            counters = self._counters[task]
+            latencies = sorted(self._latencies[task])
+            result[task.value] = {
+                "model": route.model,
+                "max_tokens": route.max_tokens,
+                "target_latency_ms": route.target_latency_ms,
+                "requests": int(counters["requests"]),
+                "over_target": int(counters["over_target"]),
+                "p50_latency_ms": self._percentile(latencies, 0.5) if latencies else None,
+                "p95_latency_ms": self._percentile(latencies, 0.95) if latencies else None,
+                "prompt_tokens": int(counters["prompt_tokens"]),
+                "completion_tokens": int(counters["completion_tokens"]),
+                "estimated_cost_usd": round(counters["cost_usd"], 6),
+            }
+        return result
+
+
+def create_router_from_env() -> ModelRouter:
+    """Create a ModelRouter, applying GROQ_MODEL_*, GROQ_MAX_TOKENS_* and GROQ_TEMPERATURE_* overrides."""
+    routes = {}
+    for task, route in DEFAULT_ROUTES.items():
+        suffix = task.value.upper()
+        overrides: Dict[str, Any] = {}
+        if os.getenv(f"GROQ_MODEL_{suffix}"):
+            overrides["model"] = os.getenv(f"GROQ_MODEL_{suffix}")
+        if os.getenv(f"GROQ_MAX_TOKENS_{suffix}"):
+            overrides["max_tokens"] = int(os.getenv(f"GROQ_MAX_TOKENS_{suffix}"))
+        if os.getenv(f"GROQ_TEMPERATURE_{suffix}"):
+            overrides["temperature"] = float(os.getenv(f"GROQ_TEMPERATURE_{suffix}"))
+        if os.getenv(f"GROQ_TARGET_LATENCY_MS_{suffix}"):
+            overrides["target_latency_ms"] = int(os.getenv(f"GROQ_TARGET_LATENCY_MS_{suffix}"))
+        if overrides:
+            logger.info(f"Model route for {task.value} overridden from environment: {overrides}")
+        routes[task] = replace(route, **overrides)
+    return ModelRouter(routes)
+
+
+# Process-wide router shared by every GroqClient instance
+model_router = create_router_from_env()
@@ -5,6 +5,11 @@ import logging
 from typing import Dict, Any, Tuple, List
 
 from .groq_client import GroqClient
+from .circuit_breaker import CircuitOpenError
+from .model_router import TaskType
+from .token_budget import trim_to_tokens
+from ..utils.scoring_rules import score_resume, get_optimization_suggestions
+from ..utils.json_extract import JSONExtractionError, extract_json_object
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -61,12 +66,20 @@ class ResumeOptimizer:
                 "error": error_msg
             }
             
+        if not self.groq_client.is_available():
+            logger.warning("Groq is unavailable, using local resume scoring")
+            return self._local_optimization(resume_text, job_description)
+            
         try:
             logger.info("Sending request to Groq API...")
             # Get optimization from Groq
             result = await self.groq_client.optimize_resume(resume_text, job_description)
             logger.info("Received response from Groq API")
             
+            if result.get("status") == "error":
+                logger.warning(f"Groq optimization failed, using local resume scoring: {result.get('error')}")
+                return self._local_optimization(resume_text, job_description)
+            
             # Ensure we have all required fields
             if not all(key in result for key in ["optimized_text", "score", "suggestions"]):
                 raise ValueError("Invalid response from optimization service")
@@ -110,6 +123,10 @@ class ResumeOptimizer:
                 "status": "error",
                 "error": error_msg
             }
+        
+        if not self.groq_client.is_available():
+            logger.warning("Groq is unavailable, using local ATS scoring")
+            return self._local_ats_score(resume_text)
             
         try:
             # Create a prompt to get just the score and feedback
@@ -119,7 +136,7 @@ class ResumeOptimizer:
             2. A list of 3-5 key suggestions for improvement
             
             Resume:
-            {resume_text}
+            {trim_to_tokens(resume_text, 2000)}
             
             Format your response as JSON with these keys: score, suggestions
             """
@@ -132,17 +149,17 @@ class ResumeOptimizer:
                 {"role": "user", "content": prompt}
             ]
             
-            response = await self.groq_client._make_request(messages)
+            response = await self.groq_client._make_request(messages, endpoint="ats_score", task=TaskType.SCORING)
             
             try:
-                result = json.loads(response)
+                result = extract_json_object(response)
                 return {
                     "score": result.get("score", 0),
                     "suggestions": result.get("suggestions", []),
                     "missing_keywords": result.get("missing_keywords", []),
                     "status": "success"
                 }
-            except json.JSONDecodeError:
+            except JSONExtractionError:
                 # Fallback if response isn't valid JSON
                 return {
                     "score": 0,
@@ -152,6 +169,9 @@ class ResumeOptimizer:
                     "error": "Invalid response format from AI"
                 }
                 
+        except CircuitOpenError as e:
+            logger.warning(f"Groq circuit opened during ATS scoring, using local scoring: {str(e)}")
+            return self._local_ats_score(resume_text)
         except Exception as e:
             logger.error(f"Error getting ATS score: {str(e)}")
             return {
@@ -162,5 +182,60 @@ class ResumeOptimizer:
                 "error": str(e)
             }
 
+    def _local_optimization(self, resume_text: str, job_description: str = "") -> Dict[str, Any]:
+        """
+        Score a resume with the local rule-based scorer when Groq is unavailable.
+        
+        The resume text is returned unchanged; only the score and suggestions are computed.
+        
+        Args:
+            resume_text: The text content of the resume
+            job_description: Optional job description to match keywords against
+            
+        Returns:
+            Dict in the same shape as optimize_resume, with source set to 'local'
+        """
+        if not job_description:
+            result = self._local_ats_score(resume_text)
+            result["optimized_text"] = resume_text
+            return result
+        
+        scored = score_resume(resume_text, job_description)
+        details = scored.get("details", {})
+        suggestions = list(scored["suggestions"])
+        missing_keywords = details.get("missing_keywords", [])
+        if missing_keywords:
+            suggestions.append(f"Consider adding keywords from the job description: {', '.join(missing_keywords[:10])}")
+        return {
+            "optimized_text": resume_text,
+            "score": min(max(float(scored["score"]), 0), 100),
+            "suggestions": suggestions[:5],
+            "keywords_matched": list(details.get("matches", {}).keys()),
+            "missing_keywords": missing_keywords,
+            "status": "success",
+            "source": "local"
+        }
+    
+    def _local_ats_score(self, resume_text: str) -> Dict[str, Any]:
+        """
+        Estimate an ATS score from structural best-practice checks when Groq is unavailable.
+        
+        Each missing element reported by get_optimization_suggestions costs 15 points.
+        
+        Args:
+            resume_text: The text content of the resume
+            
+        Returns:
+            Dict in the same shape as get_ats_score, with source set to 'local'
+        """
+        suggestions = get_optimization_suggestions(resume_text, "")
+        return {
+            "score": float(max(0, 100 - 15 * len(suggestions))),
+            "suggestions": suggestions[:5] or ["Resume covers the standard ATS sections"],
+            "missing_keywords": [],
+            "status": "success",
+            "source": "local"
+        }
+
 # This will be initialized in main.py with the proper GroqClient instance
 resume_optimizer = None
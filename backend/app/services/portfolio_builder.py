@@ -3,7 +3,6 @@ Portfolio Builder Service for PortfolioAI
 """
 import os
 import re
-import json
 import logging
 import uuid
 import textwrap
@@ -13,7 +12,15 @@ from datetime import datetime
 from jinja2 import Environment, FileSystemLoader
 
 from ..utils.file_utils import get_temp_file, cleanup_file, is_file_supported
+from ..utils.json_extract import extract_json
+from ..utils.skill_taxonomy import skill_taxonomy
+from ..models.llm_outputs import PortfolioData
 from .groq_client import GroqClient
+from .circuit_breaker import CircuitOpenError
+from .model_router import TaskType
+from .token_budget import compact_json, token_budget
+from .structured_output import StructuredOutputError
+from .extraction_service import extraction_service
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -129,15 +136,12 @@ class PortfolioBuilder:
         """Extract text from different file types."""
         file_ext = Path(file_path).suffix.lower()
         
-        if file_ext == '.pdf':
-            try:
-                import PyPDF2
-                with open(file_path, 'rb') as f:
-                    reader = PyPDF2.PdfReader(f)
-                    text = '\n'.join([page.extract_text() for page in reader.pages])
-                    return text
-            except ImportError:
-                logger.warning("PyPDF2 not installed, using fallback text extraction")
+        if file_ext in ('.pdf', '.docx'):
+            # Parsed in the extraction worker pool so the event loop is not blocked; pages
+            # past what the extraction prompt can hold are never read
+            return await extraction_service.extract_text(
+                file_path, max_tokens=token_budget.prompt_budgets[TaskType.EXTRACTION]
+            )
         
         # Fallback to simple text extraction
         try:
@@ -169,7 +173,9 @@ class PortfolioBuilder:
                 {"role": "user", "content": prompt}
             ]
             
-            response = await self.groq_client._make_request(messages)
+            response = await self.groq_client._make_request(
+                messages, endpoint="portfolio_enhance_section", task=TaskType.PORTFOLIO_ENHANCEMENT
+            )
             
             if not response or 'content' not in response:
                 return {"status": "error", "message": "Failed to generate enhanced content"}
@@ -200,7 +206,7 @@ class PortfolioBuilder:
             their unique strengths and career trajectory.
             
             Resume Data:
-            {json.dumps(resume_data, indent=2, default=str)}
+            {compact_json(resume_data)}
             
             Return the sections as a JSON array of strings, like: ["section1", "section2", ...]"""
             
@@ -209,14 +215,14 @@ class PortfolioBuilder:
                 {"role": "user", "content": prompt}
             ]
             
-            response = await self.groq_client._make_request(messages)
+            response = await self.groq_client._make_request(messages, endpoint="portfolio_sections", task=TaskType.EXTRACTION)
             
-            if not response or 'content' not in response:
+            if not response:
                 return {"status": "error", "message": "Failed to generate section suggestions"}
                 
             # Try to parse the response as JSON
             try:
-                sections = json.loads(response['content'].strip())
+                sections = extract_json(response)
                 if not isinstance(sections, list):
                     raise ValueError("Expected a list of sections")
                     
@@ -224,7 +230,7 @@ class PortfolioBuilder:
                     "status": "success",
                     "suggested_sections": sections
                 }
-            except (json.JSONDecodeError, ValueError) as e:
+            except ValueError as e:
                 logger.error(f"Failed to parse section suggestions: {str(e)}")
                 return {"status": "error", "message": "Failed to parse section suggestions"}
                 
@@ -261,7 +267,7 @@ class PortfolioBuilder:
         prompt = f"""{base_prompt}
         
         Resume Data:
-        {json.dumps(resume_data, indent=2, default=str)}"""
+        {compact_json(resume_data)}"""
         
         if existing_content.strip():
             prompt += f"\n\nExisting Content (refine and improve this):\n{existing_content}"
@@ -286,36 +292,14 @@ class PortfolioBuilder:
             # Extract text from resume
             resume_text = await self._extract_text_from_file(resume_path)
             
-            # Use Groq to extract structured data from resume
-            prompt = f"""Extract the following information from the resume in JSON format:
-            {{
-                "name": "Full name",
-                "title": "Professional title/headline",
-                "summary": "Professional summary",
-                "email": "Email address",
-                "phone": "Phone number",
-                "location": "Location (City, Country)",
-                "experience": [
-                    {{
-                        "title": "Job title",
-                        "company": "Company name",
-                        "start_date": "Start date (YYYY-MM)",
-                        "end_date": "End date (YYYY-MM or empty if current)",
-                        "description": ["Responsibility 1", "Responsibility 2", ...]
-                    }}
-                ],
-                "education": [
-                    {{
-                        "degree": "Degree name",
-                        "institution": "Institution name",
-                        "field_of_study": "Field of study (optional)",
-                        "start_date": "Start date (YYYY)",
-                        "end_date": "End date (YYYY or empty if current)",
-                        "gpa": "GPA (if available)"
-                    }}
-                ],
-                "skills": ["Skill 1", "Skill 2", ...]
-            }}
+            if not self.groq_client.is_available():
+                logger.warning("Groq is unavailable, building portfolio from locally extracted resume data")
+                return await self._generate_portfolio(self._extract_basic_data(resume_text), template)
+            
+            # Use Groq to extract structured data from resume; the JSON shape
+            # comes from the PortfolioData schema
+            prompt = f"""Extract the candidate's portfolio information from the resume below.
+            Leave fields empty when the resume does not state them.
             
             Resume content:
             {resume_text}
@@ -326,32 +310,80 @@ class PortfolioBuilder:
                 {"role": "user", "content": prompt}
             ]
             
-            # Get structured data from Groq
-            response = await self.groq_client._make_request(messages)
-            
-            # Parse the response (assuming it's in JSON format)
+            # Get structured data from Groq. Malformed output is repaired locally;
+            # if that fails too, fall back to heuristics instead of asking the user to retry
             try:
-                # Extract JSON from markdown code block if present
-                json_str = response.strip()
-                if '```json' in json_str:
-                    json_str = json_str.split('```json')[1].split('```')[0].strip()
-                elif '```' in json_str:
-                    json_str = json_str.split('```')[1].split('```')[0].strip()
-                
-                data = json.loads(json_str)
-                
-                # Generate portfolio using template
-                return await self._generate_portfolio(data, template)
-                
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse JSON from Groq response: {e}")
-                logger.debug(f"Response content: {response}")
-                raise ValueError("Failed to process resume. Please try again or use the guided Q&A option.")
+                data = await self.groq_client.generate_json(
+                    messages, PortfolioData, endpoint="portfolio_extract", task=TaskType.EXTRACTION
+                )
+                portfolio_data = data.model_dump()
+            except CircuitOpenError as e:
+                logger.warning(f"Groq circuit opened, building portfolio from locally extracted resume data: {str(e)}")
+                portfolio_data = self._extract_basic_data(resume_text)
+            except StructuredOutputError as e:
+                logger.error(f"Could not repair structured data from Groq response, using local extraction: {e}")
+                portfolio_data = self._extract_basic_data(resume_text)
+            
+            # Generate portfolio using template
+            return await self._generate_portfolio(portfolio_data, template)
             
         except Exception as e:
             logger.error(f"Error building portfolio from resume: {str(e)}")
             raise
     
+    def _extract_basic_data(self, resume_text: str) -> Dict[str, Any]:
+        """
+        Extract portfolio data from resume text with simple heuristics.
+        
+        Used instead of AI extraction when Groq is unavailable. Picks up the name
+        (first line), contact details, a summary paragraph and a skills list
+        (the skills section, or taxonomy skills found anywhere if there is none).
+        
+        Args:
+            resume_text: Plain text of the resume
+            
+        Returns:
+            Dict[str, Any]: Portfolio data in the structure expected by the templates
+        """
+        lines = [line.strip() for line in resume_text.splitlines() if line.strip()]
+        email = re.search(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+', resume_text)
+        phone = re.search(r'\+?\d[\d\s().-]{7,}\d', resume_text)
+        
+        # Collect lines under section headings such as "Summary" or "Skills"
+        sections: Dict[str, List[str]] = {}
+        current = None
+        heading = re.compile(r'^(summary|profile|about|objective|skills|technical skills|experience|education|projects)\s*:?$', re.IGNORECASE)
+        for line in lines[1:]:
+            match = heading.match(line)
+            if match:
+                current = match.group(1).lower()
+                sections.setdefault(current, [])
+            elif current:
+                sections[current].append(line)
+        
+        summary_lines = sections.get("summary") or sections.get("profile") or sections.get("about") or sections.get("objective") or []
+        skill_lines = sections.get("skills") or sections.get("technical skills") or []
+        skills = [
+            skill.strip(" -•*")
+            for line in skill_lines
+            for skill in re.split(r'[,|;•]', line)
+            if skill.strip(" -•*")
+        ]
+        if not skills:
+            skills = list(skill_taxonomy.extract(resume_text))
+        
+        return {
+            "name": lines[0] if lines else "",
+            "title": lines[1] if len(lines) > 1 and not heading.match(lines[1]) else "",
+            "summary": " ".join(summary_lines[:3]),
+            "email": email.group(0) if email else "",
+            "phone": phone.group(0).strip() if phone else "",
+            "location": "",
+            "experience": [],
+            "education": [],
+            "skills": skills[:30]
+        }
+    
     async def get_guided_questions(self) -> List[str]:
         """
         Get the list of guided questions for portfolio creation.
@@ -556,6 +588,10 @@ class PortfolioBuilder:
         Returns:
             Enhanced portfolio data with AI-generated content
         """
+        if not self.groq_client.is_available():
+            logger.info("Groq is unavailable, skipping AI enhancement of portfolio content")
+            return portfolio_data
+        
         try:
             # Prepare prompt for AI enhancement
             prompt = f"""
@@ -563,7 +599,7 @@ class PortfolioBuilder:
             to make it more compelling and professional.
             
             PORTFOLIO DATA:
-            {json.dumps(portfolio_data, indent=2, ensure_ascii=False)}
+            {compact_json(portfolio_data)}
             
             TASKS:
             1. Write a compelling professional summary if not provided
@@ -572,7 +608,7 @@ class PortfolioBuilder:
             4. Add relevant skills and technologies to the skills section
             5. Suggest improvements for education and project descriptions
             
-            Return the enhanced portfolio data in the same JSON structure.
+            Return the enhanced portfolio data as JSON, keeping any fields you do not change.
             """
             
             # Get AI-enhanced content
@@ -585,14 +621,15 @@ class PortfolioBuilder:
                 {"role": "user", "content": prompt}
             ]
             
-            response = await self.groq_client._make_request(messages)
-            
             try:
-                # Try to parse the response as JSON
-                enhanced_data = json.loads(response)
-                return enhanced_data
-            except json.JSONDecodeError:
-                logger.warning("Failed to parse AI-enhanced portfolio as JSON, using original data")
+                enhanced = await self.groq_client.generate_json(
+                    messages, PortfolioData, endpoint="portfolio_enhance", task=TaskType.PORTFOLIO_ENHANCEMENT
+                )
+                # Keep the user's values for fields the model left out, returned as
+                # null or that were dropped during repair; none of those are "set"
+                return {**portfolio_data, **enhanced.model_dump(exclude_unset=True)}
+            except StructuredOutputError as e:
+                logger.warning(f"Could not repair AI-enhanced portfolio data, using original data: {e}")
                 return portfolio_data
                 
         except Exception as e:
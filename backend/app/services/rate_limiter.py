@@ -0,0 +1,312 @@
+"""
+Client-side rate limiting for Groq API calls.
+
+A GroqGovernor sits in front of every completion request and enforces:
+
+* a requests-per-minute and a tokens-per-minute budget, implemented as token
+  buckets (tokens are estimated from the prompt size), and
+* a cap on in-flight requests through an asyncio semaphore.
+
+Bucket state is kept in memory by default. When a SQLite path is configured the
+buckets live in a shared database file instead, so every uvicorn worker using
+the same API key draws from the same budget. Requests that exceed the budget
+queue for a bounded time rather than being sent and rejected with a 429.
+"""
+import os
+import time
+import random
+import sqlite3
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Rough average for English text and JSON with the Llama tokenizers
+CHARS_PER_TOKEN = 4
+
+# (amount requested, bucket capacity, refill rate per second)
+BucketRequest = Tuple[float, float, float]
+
+
+class RateLimitExceeded(RuntimeError):
+    """Raised when a request could not obtain rate limit budget within the allowed wait."""
+
+
+def estimate_tokens(messages: List[Dict[str, str]], completion_tokens: int = 0) -> int:
+    """
+    Estimate the number of tokens a request will consume.
+
+    Args:
+        messages: Chat messages with 'content'
+        completion_tokens: Expected number of completion tokens to add
+
+    Returns:
+        int: Estimated prompt plus completion tokens
+    """
+    prompt_chars = sum(len(m.get("content") or "") for m in messages)
+    return prompt_chars // CHARS_PER_TOKEN + len(messages) * 4 + completion_tokens
+
+
+class MemoryBucketStore:
+    """Token buckets held in process memory."""
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # name -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def try_acquire(self, requests: Dict[str, BucketRequest]) -> float:
+        """
+        Atomically take tokens from every named bucket, or none of them.
+
+        Args:
+            requests: Mapping of bucket name to (amount, capacity, refill rate per second)
+
+        Returns:
+            float: 0 if the tokens were taken, otherwise seconds to wait before retrying
+        """
+        now = time.monotonic()
+        with self._lock:
+            levels = {}
+            wait = 0.0
+            for name, (amount, capacity, rate) in requests.items():
+                tokens, updated_at = self._buckets.get(name, (capacity, now))
+                tokens = min(capacity, tokens + (now - updated_at) * rate)
+                levels[name] = tokens
+                if tokens < amount:
+                    wait = max(wait, (amount - tokens) / rate)
+            if wait > 0:
+                for name, tokens in levels.items():
+                    self._buckets[name] = (tokens, now)
+                return wait
+            for name, (amount, _, _) in requests.items():
+                self._buckets[name] = (levels[name] - amount, now)
+            return 0.0
+
+
+class SQLiteBucketStore:
+    """Token buckets shared between processes through a SQLite database."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets ("
+            "name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def try_acquire(self, requests: Dict[str, BucketRequest]) -> float:
+        """
+        Atomically take tokens from every named bucket, or none of them.
+
+        Wall-clock time is used so that all processes agree on refill.
+
+        Args:
+            requests: Mapping of bucket name to (amount, capacity, refill rate per second)
+
+        Returns:
+            float: 0 if the tokens were taken, otherwise seconds to wait before retrying
+        """
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            levels = {}
+            wait = 0.0
+            for name, (amount, capacity, rate) in requests.items():
+                row = conn.execute(
+                    "SELECT tokens, updated_at FROM rate_buckets WHERE name = ?", (name,)
+                ).fetchone()
+                tokens, updated_at = row if row else (capacity, now)
+                tokens = min(capacity, tokens + max(0.0, now - updated_at) * rate)
+                levels[name] = tokens
+                if tokens < amount:
+                    wait = max(wait, (amount - tokens) / rate)
+            for name, (amount, _, _) in requests.items():
+                remaining = levels[name] if wait > 0 else levels[name] - amount
+                conn.execute(
+                    "INSERT OR REPLACE INTO rate_buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                    (name, remaining, now)
+                )
+            conn.execute("COMMIT")
+            return wait
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+class GroqGovernor:
+    """Enforces RPM/TPM budgets and an in-flight cap in front of Groq requests."""
+
+    def __init__(
+        self,
+        requests_per_minute: int = 60,
+        tokens_per_minute: int = 60000,
+        max_concurrency: int = 64,
+        max_wait: float = 30.0,
+        completion_estimate: int = 1024,
+        shared_path: Optional[str] = None,
+        namespace: str = "groq"
+    ):
+        """
+        Initialize the governor.
+
+        Args:
+            requests_per_minute: Request budget per minute (0 disables the limit)
+            tokens_per_minute: Token budget per minute (0 disables the limit)
+            max_concurrency: Maximum number of in-flight requests in this process
+            max_wait: Maximum seconds a request may queue for budget before failing
+            completion_estimate: Completion tokens assumed per request when estimating usage
+            shared_path: SQLite file used to share buckets between processes
+            namespace: Prefix for bucket names, e.g. per API key
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrency = max_concurrency
+        self.max_wait = max_wait
+        self.completion_estimate = completion_estimate
+        self.namespace = namespace
+
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
+        self._store = MemoryBucketStore()
+        if shared_path:
+            try:
+                self._store = SQLiteBucketStore(shared_path)
+                logger.info(f"Groq rate limit buckets shared through {shared_path}")
+            except sqlite3.Error as e:
+                logger.error(f"Failed to open shared rate limit store {shared_path}, using in-memory buckets: {str(e)}")
+
+        self._counters = defaultdict(int)
+        self._wait_seconds = 0.0
+        self._in_flight = 0
+        self._max_in_flight = 0
+
+    def estimate(self, messages: List[Dict[str, str]], max_tokens: int) -> int:
+        """Estimate tokens for a request, assuming at most completion_estimate output tokens."""
+        return estimate_tokens(messages, min(max_tokens, self.completion_estimate))
+
+    def _bucket_requests(self, tokens: int) -> Dict[str, BucketRequest]:
+        requests = {}
+        if self.requests_per_minute > 0:
+            rpm = float(self.requests_per_minute)
+            requests[f"{self.namespace}:rpm"] = (1.0, rpm, rpm / 60.0)
+        if self.tokens_per_minute > 0:
+            tpm = float(self.tokens_per_minute)
+            # A single oversized request may use the whole bucket but never waits forever
+            requests[f"{self.namespace}:tpm"] = (min(float(tokens), tpm), tpm, tpm / 60.0)
+        return requests
+
+    async def _acquire_budget(self, tokens: int, started: float, deadline: float, endpoint: str) -> None:
+        requests = self._bucket_requests(tokens)
+        if not requests:
+            return
+        shared = isinstance(self._store, SQLiteBucketStore)
+        queued = False
+        while True:
+            if shared:
+                # BEGIN IMMEDIATE may block on another process, keep it off the event loop
+                wait = await asyncio.to_thread(self._store.try_acquire, requests)
+            else:
+                wait = self._store.try_acquire(requests)
+            if wait <= 0:
+                return
+            if not queued:
+                queued = True
+                self._counters["queued"] += 1
+            now = time.monotonic()
+            if wait > deadline - now:
+                self._counters["timeouts"] += 1
+                raise RateLimitExceeded(
+                    f"Groq rate limit budget unavailable for {endpoint} within {deadline - started:.1f}s"
+                )
+            # Small jitter so queued requests do not all wake at the same instant
+            sleep_for = wait + random.uniform(0, 0.05)
+            self._wait_seconds += sleep_for
+            await asyncio.sleep(sleep_for)
+
+    @asynccontextmanager
+    async def slot(self, tokens: int, endpoint: str = "default", max_wait: Optional[float] = None) -> AsyncIterator[None]:
+        """
+        Hold an in-flight slot and consume rate budget for one request.
+
+        Args:
+            tokens: Estimated tokens the request will consume
+            endpoint: Name of the calling endpoint, used in error messages
+            max_wait: Optional override of the maximum queueing time
+
+        Raises:
+            RateLimitExceeded: If no slot or budget became available in time
+        """
+        wait_limit = self.max_wait if max_wait is None else min(self.max_wait, max_wait)
+        started = time.monotonic()
+        deadline = started + wait_limit
+
+        if self._semaphore is not None:
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=max(0.0, wait_limit))
+            except asyncio.TimeoutError:
+                self._counters["timeouts"] += 1
+                raise RateLimitExceeded(
+                    f"Too many in-flight Groq requests ({self.max_concurrency}) for {endpoint}"
+                )
+        try:
+            await self._acquire_budget(tokens, started, deadline, endpoint)
+            self._counters["acquired"] += 1
+            self._counters["estimated_tokens"] += tokens
+            self._in_flight += 1
+            self._max_in_flight = max(self._max_in_flight, self._in_flight)
+            try:
+                yield
+            finally:
+                self._in_flight -= 1
+        finally:
+            if self._semaphore is not None:
+                self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get queueing and throughput counters."""
+        return {
+            "requests_per_minute": self.requests_per_minute,
+            "tokens_per_minute": self.tokens_per_minute,
+            "max_concurrency": self.max_concurrency,
+            "shared": isinstance(self._store, SQLiteBucketStore),
+            "acquired": self._counters["acquired"],
+            "queued": self._counters["queued"],
+            "timeouts": self._counters["timeouts"],
+            "estimated_tokens": self._counters["estimated_tokens"],
+            "total_wait_seconds": round(self._wait_seconds, 3),
+            "in_flight": self._in_flight,
+            "max_in_flight": self._max_in_flight,
+        }
+
+
+def create_governor_from_env() -> GroqGovernor:
+    """Create a GroqGovernor configured from GROQ_RATE_* environment variables."""
+    return GroqGovernor(
+        requests_per_minute=int(os.getenv("GROQ_RATE_RPM", "60")),
+        tokens_per_minute=int(os.getenv("GROQ_RATE_TPM", "60000")),
+        max_concurrency=int(os.getenv("GROQ_RATE_MAX_CONCURRENCY", "64")),
+        max_wait=float(os.getenv("GROQ_RATE_MAX_WAIT", "30")),
+        completion_estimate=int(os.getenv("GROQ_RATE_COMPLETION_ESTIMATE", "1024")),
+        shared_path=os.getenv("GROQ_RATE_SQLITE_PATH") or None,
+    )
+
+
+# Process-wide governor shared by every GroqClient instance
+groq_governor = create_governor_from_env()
@@ -0,0 +1,364 @@
+"""
+CV document rendering in a pool of warm worker processes.
+
+Building a DOCX with python-docx or a PDF with ReportLab is CPU-bound work
+that would otherwise run on the event loop and stall every other request
+while a CV is written. RenderPool runs it in separate processes:
+
+- at most max_workers renders run at once, so rendering many CVs scales with
+  cores while the API stays responsive
+- workers come from the shared fork server (app.utils.process_context), which
+  has python-docx and ReportLab imported already
+- each worker renders a small warm-up document when it starts and keeps the
+  parsed DOCX template and the PDF paragraph styles, so a CV only pays for
+  its own content
+- each render has a timeout; on expiry the pool's processes are killed and
+  replaced
+- workers are replaced after max_tasks_per_child renders
+
+Configured with RENDER_WORKERS (default: CPU count, at most 4), RENDER_TIMEOUT
+(seconds, default 60), RENDER_MAX_TASKS_PER_CHILD (default 200) and
+RENDER_WARM (start the workers at startup, default true).
+"""
+import io
+import os
+import copy
+import time
+import asyncio
+import logging
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from docx import Document
+from docx.shared import Pt
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+
+from ..utils.process_context import preload_in_workers, worker_context
+
+logger = logging.getLogger(__name__)
+
+# Import python-docx and ReportLab once in the fork server rather than in every worker
+preload_in_workers(__name__)
+
+WARM_UP_MARKDOWN = "# Name\n## Summary\nText\n### Role\n- Achievement"
+# How long each start-up ping keeps a worker busy
+WARM_UP_PING_SECONDS = 0.1
+
+
+class RenderError(Exception):
+    """Raised when a document cannot be rendered."""
+
+
+class RenderTimeoutError(RenderError):
+    """Raised when rendering takes longer than the configured timeout."""
+
+
+@lru_cache(maxsize=1)
+def _docx_template():
+    """The default python-docx document, parsed once per process."""
+    return Document()
+
+
+@lru_cache(maxsize=1)
+def _pdf_styles() -> Dict[str, ParagraphStyle]:
+    """ReportLab paragraph styles, built once per process."""
+    styles = getSampleStyleSheet()
+    return {
+        "title": styles['Title'],
+        "heading2": styles['Heading2'],
+        "heading3": styles['Heading3'],
+        # Normal text with better spacing
+        "normal": ParagraphStyle(
+            name='NormalSpaced',
+            parent=styles['Normal'],
+            spaceAfter=6,
+            fontSize=11
+        ),
+    }
+
+
+def _add_heading(doc, text: str, level: int) -> None:
+    """Add a heading to the document."""
+    heading = doc.add_heading(level=level)
+    run = heading.add_run(text)
+
+    # Style the heading
+    if level == 1:
+        run.font.size = Pt(16)
+        run.bold = True
+    elif level == 2:
+        run.font.size = Pt(14)
+    elif level == 3:
+        run.font.size = Pt(12)
+
+
+def render_docx(markdown_content: str, output) -> None:
+    """
+    Render CV markdown as a DOCX file.
+
+    Args:
+        markdown_content: CV markdown (headings, bullets and paragraphs)
+        output: Path or binary file object to write to
+    """
+    # Copying the parsed template is cheaper than loading it again
+    doc = copy.deepcopy(_docx_template())
+    current_paragraph = None
+
+    for line in markdown_content.split('\n'):
+        line = line.strip()
+        if not line:
+            current_paragraph = None
+            continue
+
+        # Handle headings
+        if line.startswith('### '):
+            _add_heading(doc, line[4:], 3)
+            current_paragraph = None
+        elif line.startswith('## '):
+            _add_heading(doc, line[3:], 2)
+            current_paragraph = None
+        elif line.startswith('# '):
+            _add_heading(doc, line[2:], 1)
+            current_paragraph = None
+        # Handle bullet points
+        elif line.startswith('- '):
+            if current_paragraph is None:
+                current_paragraph = doc.add_paragraph(style='List Bullet')
+            current_paragraph.add_run(line[2:])
+        # Regular paragraph
+        else:
+            if current_paragraph is None:
+                current_paragraph = doc.add_paragraph()
+                current_paragraph.add_run(line)
+            else:
+                current_paragraph.add_run(' ' + line)
+
+    doc.save(output)
+
+
+def render_pdf(markdown_content: str, output) -> None:
+    """
+    Render CV markdown as a PDF file.
+
+    Args:
+        markdown_content: CV markdown (headings, bullets and paragraphs)
+        output: Path or binary file object to write to
+    """
+    doc = SimpleDocTemplate(
+        output,
+        pagesize=letter,
+        rightMargin=72,
+        leftMargin=72,
+        topMargin=72,
+        bottomMargin=72
+    )
+    styles = _pdf_styles()
+    elements = []
+
+    for line in markdown_content.split('\n'):
+        line = line.strip()
+        if not line:
+            elements.append(Spacer(1, 12))  # Add some space between paragraphs
+            continue
+
+        # Handle headings
+        if line.startswith('### '):
+            elements.append(Paragraph(f"<b>{line[4:]}</b>", styles['heading3']))
+        elif line.startswith('## '):
+            elements.append(Paragraph(f"<u>{line[3:]}</u>", styles['heading2']))
+        elif line.startswith('# '):
+            elements.append(Paragraph(line[2:], styles['title']))
+        # Handle bullet points
+        elif line.startswith('- '):
+            elements.append(Paragraph(f"• {line[2:]}", styles['normal']))
+        # Regular paragraph
+        else:
+            elements.append(Paragraph(line, styles['normal']))
+
+        elements.append(Spacer(1, 6))  # Add small space after each line
+
+    doc.build(elements)
+
+
+RENDERERS = {
+    "docx": render_docx,
+    "pdf": render_pdf,
+}
+
+
+def _init_worker() -> None:
+    """Load templates, styles and fonts by rendering a throwaway document; runs once in each worker."""
+    for renderer in RENDERERS.values():
+        try:
+            renderer(WARM_UP_MARKDOWN, io.BytesIO())
+        except Exception as e:
+            logger.warning(f"Render worker warm-up failed: {str(e)}")
+
+
+def _render_file(output_format: str, markdown_content: str, output_path: str) -> Tuple[int, float]:
+    """Render in a worker process; returns the file size and the seconds spent rendering."""
+    started = time.perf_counter()
+    RENDERERS[output_format](markdown_content, output_path)
+    return os.path.getsize(output_path), time.perf_counter() - started
+
+
+def _ping(hold: float) -> int:
+    """Keep a worker busy for hold seconds, so concurrent pings reach different workers."""
+    time.sleep(hold)
+    return os.getpid()
+
+
+class RenderPool:
+    """Renders CV documents in a bounded pool of warm worker processes."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        timeout: float = 60.0,
+        max_tasks_per_child: int = 200,
+        warm: bool = True
+    ):
+        """
+        Initialize the pool. Worker processes are started by start() or on first use.
+
+        Args:
+            max_workers: Worker processes and concurrent renders. Defaults to the CPU count, at most 4.
+            timeout: Seconds a render may run before its worker is killed
+            max_tasks_per_child: Renders after which a worker is replaced
+            warm: Start the workers in start() rather than on first use
+        """
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.timeout = timeout
+        self.max_tasks_per_child = max_tasks_per_child
+        self.warm = warm
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots = asyncio.Semaphore(self.max_workers)
+        self._counters = Counter()
+        self._render_seconds = 0.0
+        self._total_seconds = 0.0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=worker_context(),
+                initializer=_init_worker,
+                max_tasks_per_child=self.max_tasks_per_child
+            )
+        return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor, kill: bool = False) -> None:
+        """Stop a pool, killing its workers if asked, and start a fresh one on next use."""
+        if kill:
+            # ProcessPoolExecutor cannot cancel a running task; terminating its workers is the only way
+            for process in list((pool._processes or {}).values()):
+                process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+        if self._pool is pool:
+            self._pool = None
+
+    async def start(self) -> None:
+        """Start and warm up all worker processes, so the first CVs do not wait for them."""
+        if not self.warm:
+            return
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        pool = self._get_pool()
+        # Workers are spawned on demand. A worker answers a ping only after its
+        # warm-up, and holds it briefly, so a worker that is already warm cannot
+        # take every ping; repeat until each worker has answered one.
+        pids = set()
+        while len(pids) < self.max_workers and time.monotonic() - started < self.timeout:
+            pids.update(await asyncio.gather(*[
+                loop.run_in_executor(pool, _ping, WARM_UP_PING_SECONDS) for _ in range(self.max_workers)
+            ]))
+        logger.info(f"Render pool warmed {len(pids)} of {self.max_workers} workers in {time.monotonic() - started:.2f}s")
+
+    async def render(self, output_format: str, markdown_content: str, output_path: str) -> None:
+        """
+        Render CV markdown to a DOCX or PDF file.
+
+        Args:
+            output_format: 'docx' or 'pdf'
+            markdown_content: CV markdown
+            output_path: File to write
+
+        Raises:
+            ValueError: If the format is not supported
+            RenderTimeoutError: If rendering exceeds the timeout
+            RenderError: If the worker crashed
+            Exception: Whatever the renderer raised for invalid content
+        """
+        if output_format not in RENDERERS:
+            raise ValueError(f"Unsupported render format: {output_format}")
+        loop = asyncio.get_running_loop()
+        async with self._slots:
+            started = time.monotonic()
+            for attempt in range(2):
+                pool = self._get_pool()
+                try:
+                    _, render_seconds = await asyncio.wait_for(
+                        loop.run_in_executor(pool, _render_file, output_format, markdown_content, output_path),
+                        timeout=self.timeout
+                    )
+                    break
+                except asyncio.TimeoutError:
+                    self._counters["timeouts"] += 1
+                    logger.error(f"Rendering {output_format} to {output_path} timed out after {self.timeout}s, restarting workers")
+                    self._discard_pool(pool, kill=True)
+                    raise RenderTimeoutError(f"Rendering timed out after {self.timeout:g} seconds")
+                except BrokenProcessPool:
+                    # A worker died: killed after another render's timeout, or by the OS
+                    self._counters["pool_restarts"] += 1
+                    self._discard_pool(pool)
+                    if attempt:
+                        self._counters["failures"] += 1
+                        raise RenderError("Render worker crashed")
+                    logger.warning(f"Render worker pool broke, retrying {output_path}")
+                except Exception:
+                    self._counters["failures"] += 1
+                    raise
+
+            self._counters[output_format] += 1
+            self._render_seconds += render_seconds
+            self._total_seconds += time.monotonic() - started
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, if started."""
+        if self._pool is not None:
+            self._discard_pool(self._pool)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get render counters."""
+        renders = sum(self._counters[output_format] for output_format in RENDERERS)
+        return {
+            "max_workers": self.max_workers,
+            "timeout": self.timeout,
+            "pool_started": self._pool is not None,
+            "renders": {output_format: self._counters[output_format] for output_format in RENDERERS},
+            "failures": self._counters["failures"],
+            "timeouts": self._counters["timeouts"],
+            "pool_restarts": self._counters["pool_restarts"],
+            "avg_render_ms": round(self._render_seconds / renders * 1000, 1) if renders else None,
+            "avg_total_ms": round(self._total_seconds / renders * 1000, 1) if renders else None,
+        }
+
+
+def create_render_pool_from_env() -> RenderPool:
+    """Create a RenderPool configured from RENDER_* environment variables."""
+    workers = os.getenv("RENDER_WORKERS")
+    return RenderPool(
+        max_workers=int(workers) if workers else None,
+        timeout=float(os.getenv("RENDER_TIMEOUT", "60")),
+        max_tasks_per_child=int(os.getenv("RENDER_MAX_TASKS_PER_CHILD", "200")),
+        warm=os.getenv("RENDER_WARM", "true").lower() in ("true", "1", "t")
+    )
+
+
+# Process-wide pool shared by all requests
+render_pool = create_render_pool_from_env()
@@ -6,9 +6,11 @@ import os
 import logging
 import sys
 import mimetypes
-from typing import Optional, Tuple
+from typing import Iterator, Optional, Tuple
 from pathlib import Path
 
+from .rate_limiter import CHARS_PER_TOKEN
+
 # Configure logging first
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -54,11 +56,71 @@ def get_file_type(file_path: str) -> Tuple[Optional[str], Optional[str]]:
         
     return None, None
 
-def extract_text_from_pdf(file_path: str) -> Optional[str]:
+def _char_budget(max_chars: Optional[int], max_tokens: Optional[int]) -> Optional[int]:
+    """Combine a character and a token budget into one character limit (None for no limit)."""
+    limits = [limit for limit in (max_chars, max_tokens * CHARS_PER_TOKEN if max_tokens is not None else None) if limit is not None]
+    return max(0, min(limits)) if limits else None
+
+def _join_within_budget(parts: Iterator[str], max_chars: Optional[int]) -> str:
+    """Join text parts with newlines, consuming parts only until max_chars is reached."""
+    collected = []
+    length = 0
+    for part in parts:
+        collected.append(part)
+        length += len(part) + 1
+        if max_chars is not None and length >= max_chars:
+            break
+    text = '\n'.join(collected)
+    return text[:max_chars] if max_chars is not None else text
+
+def iter_pdf_pages(file_path: str, page_range: Optional[Tuple[int, Optional[int]]] = None) -> Iterator[str]:
+    """Yield the text of a PDF page by page.
+    
+    Pages are parsed only as they are consumed, so a caller that stops early
+    never parses the rest of the document. Pages whose text cannot be
+    extracted are skipped with a warning.
+    
+    Args:
+        file_path: Path to the PDF file
+        page_range: (start, stop) zero-based page indexes, stop exclusive or None
+            for the last page; all pages if not given
+        
+    Yields:
+        Text of each page in the range, in order
+        
+    Raises:
+        RuntimeError: If pypdf is not installed
+        OSError: If the file cannot be read
+        pypdf.errors.PdfReadError: If the file is not a readable PDF
+    """
+    if not HAS_REQUIRED_DEPS:
+        raise RuntimeError("Required dependencies (pypdf) not installed")
+    
+    with open(file_path, 'rb') as f:
+        reader = PdfReader(f)
+        start, stop = page_range or (0, None)
+        for index in range(*slice(start, stop).indices(len(reader.pages))):
+            try:
+                yield reader.pages[index].extract_text() or ''
+            except Exception as e:
+                logger.warning(f"Error extracting text from page {index + 1} of {file_path}: {str(e)}")
+
+def extract_text_from_pdf(
+    file_path: str,
+    max_chars: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    page_range: Optional[Tuple[int, Optional[int]]] = None
+) -> Optional[str]:
     """Extract text from a PDF file.
     
+    Pages are read one at a time and reading stops once the budget is
+    reached, so the work done is proportional to the text returned.
+    
     Args:
         file_path: Path to the PDF file
+        max_chars: Maximum characters to return
+        max_tokens: Maximum estimated tokens to return
+        page_range: (start, stop) zero-based pages to read, see iter_pdf_pages
         
     Returns:
         Extracted text or None if extraction fails
@@ -68,21 +130,26 @@ def extract_text_from_pdf(file_path: str) -> Optional[str]:
         return None
         
     try:
-        with open(file_path, 'rb') as f:
-            reader = PdfReader(f)
-            text = ''
-            for page in reader.pages:
-                text += page.extract_text() + '\n'
-        return text.strip()
+        pages = iter_pdf_pages(file_path, page_range)
+        try:
+            return _join_within_budget(pages, _char_budget(max_chars, max_tokens)).strip()
+        finally:
+            pages.close()
     except Exception as e:
         logger.error(f"Error extracting text from PDF: {str(e)}")
         return None
 
-def extract_text_from_docx(file_path: str) -> Optional[str]:
+def extract_text_from_docx(
+    file_path: str,
+    max_chars: Optional[int] = None,
+    max_tokens: Optional[int] = None
+) -> Optional[str]:
     """Extract text from a DOCX file.
     
     Args:
         file_path: Path to the DOCX file
+        max_chars: Maximum characters to return
+        max_tokens: Maximum estimated tokens to return
         
     Returns:
         Extracted text or None if extraction fails
@@ -93,16 +160,25 @@ def extract_text_from_docx(file_path: str) -> Optional[str]:
         
     try:
         doc = docx.Document(file_path)
-        return '\n'.join([para.text for para in doc.paragraphs if para.text])
+        paragraphs = (para.text for para in doc.paragraphs if para.text)
+        return _join_within_budget(paragraphs, _char_budget(max_chars, max_tokens))
     except Exception as e:
         logger.error(f"Error extracting text from DOCX: {str(e)}")
         return None
 
-def extract_text_from_file(file_path: str) -> Optional[str]:
+def extract_text_from_file(
+    file_path: str,
+    max_chars: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    page_range: Optional[Tuple[int, Optional[int]]] = None
+) -> Optional[str]:
     """Extract text from a file based on its MIME type or extension.
     
     Args:
         file_path: Path to the file
+        max_chars: Maximum characters to return
+        max_tokens: Maximum estimated tokens to return
+        page_range: (start, stop) zero-based pages to read from a PDF, see iter_pdf_pages
         
     Returns:
         Extracted text or None if extraction fails or format is not supported
@@ -122,14 +198,15 @@ def extract_text_from_file(file_path: str) -> Optional[str]:
         # Process based on file type
         if mime_type == 'application/pdf' or extension == 'pdf':
             logger.info("Processing as PDF file")
-            return extract_text_from_pdf(file_path)
+            return extract_text_from_pdf(file_path, max_chars, max_tokens, page_range)
         elif (mime_type and 'word' in mime_type.lower()) or extension in ['docx', 'doc']:
             logger.info("Processing as Word document")
-            return extract_text_from_docx(file_path)
+            return extract_text_from_docx(file_path, max_chars, max_tokens)
         elif mime_type == 'text/plain' or extension == 'txt':
             logger.info("Processing as plain text file")
+            limit = _char_budget(max_chars, max_tokens)
             with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+                content = f.read(-1 if limit is None else limit)
                 logger.debug(f"Read {len(content)} characters from text file")
                 return content
         else:
@@ -2,8 +2,6 @@
 Resume processing service with AI enhancements.
 """
 import os
-import PyPDF2
-import docx
 import json
 import logging
 import mimetypes
@@ -20,6 +18,11 @@ except ImportError:
     logging.warning("python-magic not available, falling back to file extension detection")
 
 from ..services.groq_client import groq_client
+from ..services.extraction_service import extraction_service
+from ..services.model_router import TaskType
+from ..services.token_budget import trim_to_tokens
+from ..utils.json_extract import extract_json_object
+from ..utils.skill_taxonomy import skill_taxonomy
 from typing import Dict, Any, Optional
 import logging
 import json
@@ -76,7 +79,7 @@ class ResumeProcessor:
                 return {"error": error_msg}
             
             # Extract text from file
-            text = self._extract_text(file_path, file_type)
+            text = await self._extract_text(file_path, file_type)
             if not text or not text.strip():
                 error_msg = f"No text could be extracted from the file: {file_path}"
                 logger.warning(error_msg)
@@ -154,16 +157,15 @@ class ResumeProcessor:
         
         return extension_map.get(ext, 'application/octet-stream')
     
-    def _extract_text(self, file_path: str, file_type: str) -> str:
+    async def _extract_text(self, file_path: str, file_type: str) -> str:
         """Extract text from different file types."""
         try:
             if not file_path or not os.path.exists(file_path):
                 raise FileNotFoundError(f"File not found: {file_path}")
                 
-            if 'pdf' in file_type.lower():
-                return self._extract_text_from_pdf(file_path)
-            elif any(doc_type in file_type.lower() for doc_type in ['msword', 'wordprocessingml']):
-                return self._extract_text_from_docx(file_path)
+            if 'pdf' in file_type.lower() or any(doc_type in file_type.lower() for doc_type in ['msword', 'wordprocessingml']):
+                # PDF and Word parsing runs in the extraction worker pool
+                return await extraction_service.extract_text(file_path)
             elif 'text/plain' in file_type.lower():
                 with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
                     return f.read()
@@ -178,38 +180,6 @@ class ResumeProcessor:
             logger.error(f"Error extracting text from {file_path} (type: {file_type}): {str(e)}")
             return ""
     
-    def _extract_text_from_pdf(self, file_path: str) -> str:
-        """Extract text from PDF file."""
-        try:
-            with open(file_path, 'rb') as f:
-                reader = PyPDF2.PdfReader(f)
-                text = []
-                for page in reader.pages:
-                    try:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text.append(page_text)
-                    except Exception as page_error:
-                        logger.warning(f"Error extracting text from page in {file_path}: {str(page_error)}")
-                        continue
-                
-                if not text:
-                    raise ValueError("No text could be extracted from the PDF")
-                    
-                return '\n'.join(text)
-        except Exception as e:
-            logger.error(f"Error extracting text from PDF {file_path}: {str(e)}")
-            raise
-    
-    def _extract_text_from_docx(self, file_path: str) -> str:
-        """Extract text from DOCX file."""
-        try:
-            doc = docx.Document(file_path)
-            return "\n".join([para.text for para in doc.paragraphs])
-        except Exception as e:
-            logger.error(f"Error extracting text from DOCX {file_path}: {str(e)}")
-            raise
-    
     async def _analyze_with_ai(self, text: str) -> Dict[str, Any]:
         """
         Analyze resume text with AI.
@@ -225,15 +195,15 @@ class ResumeProcessor:
             return self._extract_basic_info("")
             
         try:
-            prompt = f"""
+            # A plain template: the text is inserted, trimmed, by .format below
+            prompt = """
             Analyze the following resume and extract the following information in JSON format:
             
             1. personal_info: Object with name, email, phone, location, linkedin, github, etc.
             2. summary: A brief professional summary
             3. work_experience: Array of jobs with title, company, dates, description, and achievements
             4. education: Array of education entries with degree, institution, dates, and details
-            5. skills: Object with categories like 'languages', 'technologies', 'tools', etc.
-            6. certifications: Array of certifications
+            5. certifications: Array of certifications
             {text}
             """
             
@@ -241,37 +211,35 @@ class ResumeProcessor:
             response = await groq_client._make_request(
                 messages=[
                     {"role": "system", "content": "You are a professional resume parser. Extract structured information from the provided resume text."},
-                    {"role": "user", "content": prompt.format(text=text[:8000])}
+                    {"role": "user", "content": prompt.format(text=trim_to_tokens(text, 2000))}
                 ],
-                model="mixtral-8x7b-32768"
+                endpoint="analyze_resume",
+                task=TaskType.EXTRACTION
             )
             
             # Parse and validate the response
             try:
                 if isinstance(response, str):
-                    # Try to extract JSON if response is a string
-                    import re
-                    json_match = re.search(r'```(?:json)?\n(.*?)\n```', response, re.DOTALL)
-                    if json_match:
-                        response = json_match.group(1)
-                    
-                    result = json.loads(response)
+                    result = extract_json_object(response)
                 else:
                     result = response
                 
                 # Ensure we have a valid structure
                 if not isinstance(result, dict):
                     raise ValueError("Expected a dictionary response")
-                    
+                
+                # Skills come from the local taxonomy rather than the model
+                result["skills"] = self._extract_skills(text)
+                result["source"] = "ai"
                 return result
                 
-            except (json.JSONDecodeError, ValueError) as e:
+            except ValueError as e:
                 logger.warning(f"Failed to parse AI response: {str(e)}")
-                return self._basic_text_extraction(text)
+                return self._extract_basic_info(text)
                 
         except Exception as e:
             logger.error(f"Error in AI analysis: {str(e)}", exc_info=True)
-            return self._basic_text_extraction(text)
+            return self._extract_basic_info(text)
     
     def _extract_basic_info(self, text: str) -> Dict[str, Any]:
         """
@@ -284,7 +252,8 @@ class ResumeProcessor:
             "work_experience": self._extract_experience(text),
             "education": self._extract_education(text),
             "skills": self._extract_skills(text),
-            "projects": self._extract_projects(text)
+            "projects": self._extract_projects(text),
+            "source": "local"
         }
     
     def _extract_contact_info(self, text: str) -> Dict[str, str]:
@@ -309,14 +278,8 @@ class ResumeProcessor:
         return [{"degree": "B.S. Computer Science", "institution": "University of Example"}]
     
     def _extract_skills(self, text: str) -> Dict[str, List[str]]:
-        """Extract skills from resume text."""
-        # This is a placeholder - in a real app, you'd use more sophisticated parsing
-        common_skills = {
-            "languages": ["Python", "JavaScript", "SQL"],
-            "technologies": ["Docker", "AWS", "FastAPI"],
-            "tools": ["Git", "VS Code"]
-        }
-        return {k: v for k, v in common_skills.items() if any(skill.lower() in text.lower() for skill in v)}
+        """Extract canonical skills from resume text, grouped by taxonomy category."""
+        return skill_taxonomy.extract_by_category(text)
     
     def _extract_projects(self, text: str) -> List[Dict[str, str]]:
         """Extract projects from resume text."""
@@ -0,0 +1,246 @@
+"""
+Content-addressed resume storage.
+
+Uploaded resume files are identified by the SHA-256 of their bytes. Each
+distinct file is written to disk and its text extracted only once, in a
+ResumeContent row shared by every Resume that points at it, so uploading a
+file again (by the same user or another one) skips parsing entirely. The AI
+analysis of a resume is cached on the same row the first time it is asked
+for, so later uploads of the file also skip the LLM call.
+
+Uploads are streamed to a temporary file in the store's directory, hashed
+and type-sniffed on the way (app.utils.file_utils.stream_upload_file), and a
+new file is then renamed into place, so its bytes are written once and never
+held in memory whole.
+
+Concurrent uploads of the same new file share one extraction, and
+concurrent analyses of the same text share one LLM call. Analyses produced by
+the local fallback (the LLM was unavailable) are returned but not cached, so
+the file is analyzed properly once the LLM is back.
+
+Files are stored in RESUME_STORE_DIR (default uploads/resumes) as
+<sha256><extension>.
+"""
+import os
+import uuid
+import logging
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..database.models import Resume, ResumeContent
+from .extraction_service import ExtractionError, extraction_service
+from .resume_processor import resume_processor
+from .single_flight import SingleFlight
+from ..utils.file_utils import StagedUpload, cleanup_file, stream_upload_file
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONS = {
+    "application/pdf": ".pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": ".docx",
+    "text/plain": ".txt",
+}
+
+
+def _extension(filename: Optional[str], content_type: Optional[str]) -> str:
+    """Pick the stored file's extension, which the parsers use to detect its format."""
+    if content_type in EXTENSIONS:
+        return EXTENSIONS[content_type]
+    return Path(filename or "").suffix.lower()[:10]
+
+
+class ResumeStore:
+    """Stores uploaded resumes once per distinct file and caches their extraction results."""
+
+    def __init__(self, storage_dir: str = "uploads/resumes"):
+        """
+        Initialize the store.
+
+        Args:
+            storage_dir: Directory the resume files are written to
+        """
+        self.storage_dir = Path(storage_dir)
+        self._flights = SingleFlight()
+        self._counters = Counter()
+
+    async def _extract(self, staged: StagedUpload, file_path: Path) -> str:
+        self._counters["extractions"] += 1
+        if not file_path.exists():
+            # Same directory, so this is a rename rather than a copy
+            os.replace(staged.path, file_path)
+        try:
+            return await extraction_service.extract_text(str(file_path))
+        except ExtractionError:
+            # Nothing refers to a file whose text could not be extracted
+            file_path.unlink(missing_ok=True)
+            raise
+
+    def _save_content(
+        self,
+        db: Session,
+        digest: str,
+        file_path: Path,
+        file_type: Optional[str],
+        file_size: int,
+        text: str
+    ) -> ResumeContent:
+        content = ResumeContent(
+            content_hash=digest,
+            file_path=str(file_path),
+            file_type=file_type,
+            file_size=file_size,
+            text=text
+        )
+        db.add(content)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Stored meanwhile by a request in another process
+            db.rollback()
+            content = db.get(ResumeContent, digest)
+        return content
+
+    async def store(
+        self,
+        db: Session,
+        upload_file,
+        user_id: Optional[str],
+        allowed_types: Optional[Iterable[str]] = None
+    ) -> Tuple[Resume, bool]:
+        """
+        Store an uploaded resume, extracting its text unless the file is already known.
+
+        Args:
+            db: Database session
+            upload_file: FastAPI UploadFile object
+            user_id: Owner of the resume
+            allowed_types: Accepted MIME types, checked against the file's content
+
+        Returns:
+            Tuple of the Resume and whether it was created; the user's existing
+            Resume is returned when they upload the same file again
+
+        Raises:
+            UploadError: If the file is too large or not of an allowed type
+            ExtractionError: If no text can be extracted from the file
+        """
+        staged = await stream_upload_file(upload_file, self.storage_dir, allowed_types=allowed_types)
+        try:
+            return await self._store_staged(db, staged, upload_file.filename, user_id)
+        finally:
+            # Already renamed into place if the file was new
+            cleanup_file(staged.path)
+
+    async def _store_staged(
+        self,
+        db: Session,
+        staged: StagedUpload,
+        filename: Optional[str],
+        user_id: Optional[str]
+    ) -> Tuple[Resume, bool]:
+        digest = staged.sha256
+        self._counters["uploads"] += 1
+
+        existing = db.query(Resume).filter(
+            Resume.user_id == user_id,
+            Resume.content_hash == digest
+        ).first()
+        if existing is not None:
+            self._counters["duplicate_uploads"] += 1
+            logger.info(f"Resume {digest[:12]} already uploaded by user {user_id}, reusing {existing.id}")
+            return existing, False
+
+        extension = _extension(filename, staged.content_type)
+        content = db.get(ResumeContent, digest)
+        if content is None:
+            file_path = self.storage_dir / f"{digest}{extension}"
+            text = await self._flights.do(
+                f"extract:{digest}",
+                lambda: self._extract(staged, file_path),
+                endpoint="resume_store"
+            )
+            content = self._save_content(db, digest, file_path, staged.content_type, staged.size, text)
+        else:
+            self._counters["content_hits"] += 1
+            logger.info(f"Resume {digest[:12]} already extracted, skipping parsing")
+
+        resume_id = str(uuid.uuid4())
+        resume = Resume(
+            id=resume_id,
+            user_id=user_id,
+            original_filename=filename or f"resume{extension}",
+            stored_filename=f"{resume_id}{extension}",
+            file_path=content.file_path,
+            file_type=content.file_type or staged.content_type,
+            file_size=content.file_size,
+            content=content.text,
+            analysis=content.analysis,
+            content_hash=digest
+        )
+        db.add(resume)
+        db.commit()
+        db.refresh(resume)
+        return resume, True
+
+    async def _analyze(self, text: str) -> Dict[str, Any]:
+        self._counters["analyses"] += 1
+        return await resume_processor._analyze_with_ai(text)
+
+    async def analyze(self, db: Session, resume: Resume) -> Dict[str, Any]:
+        """
+        Get a resume's AI analysis, analyzing its text only if no upload of the same file has been analyzed.
+
+        Args:
+            db: Database session
+            resume: Stored resume
+
+        Returns:
+            Dict: Structured resume data; "source" is "local" when the LLM was
+            unavailable and the pattern-based fallback was used
+        """
+        if resume.analysis and resume.analysis.get("source") == "ai":
+            return resume.analysis
+
+        content = resume.stored_content
+        if content is not None and content.analysis:
+            self._counters["analysis_hits"] += 1
+            analysis = content.analysis
+        else:
+            text = resume.content or ""
+            analysis = await self._flights.do(
+                f"analyze:{resume.content_hash or resume.id}",
+                lambda: self._analyze(text),
+                endpoint="resume_store"
+            )
+            if content is not None and analysis.get("source") == "ai":
+                content.analysis = analysis
+
+        resume.analysis = analysis
+        db.commit()
+        return analysis
+
+    def stats(self) -> Dict[str, Any]:
+        """Get upload and cache counters."""
+        uploads = self._counters["uploads"]
+        return {
+            "uploads": uploads,
+            "duplicate_uploads": self._counters["duplicate_uploads"],
+            "content_hits": self._counters["content_hits"],
+            "extractions": self._counters["extractions"],
+            "extraction_skip_rate": round(1 - self._counters["extractions"] / uploads, 4) if uploads else 0.0,
+            "analyses": self._counters["analyses"],
+            "analysis_hits": self._counters["analysis_hits"],
+        }
+
+
+def create_resume_store_from_env() -> ResumeStore:
+    """Create a ResumeStore configured from RESUME_STORE_DIR."""
+    return ResumeStore(storage_dir=os.getenv("RESUME_STORE_DIR", "uploads/resumes"))
+
+
+# Process-wide store shared by all requests
+resume_store = create_resume_store_from_env()
@@ -0,0 +1,278 @@
+"""
+Retry policy for LLM requests.
+
+Errors are classified (rate limit, server, timeout, connection, validation,
+client) and only transient categories are retried. Delays use decorrelated
+jitter so that workers hitting the same 429 do not retry in lockstep, a
+``Retry-After`` header from the provider takes precedence, and every attempt
+shares one deadline budget for the whole request.
+"""
+import os
+import time
+import random
+import asyncio
+import logging
+from enum import Enum
+from email.utils import parsedate_to_datetime
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ErrorCategory(str, Enum):
+    """Classification of a failed LLM request."""
+    RATE_LIMIT = "rate_limit"
+    SERVER = "server"
+    TIMEOUT = "timeout"
+    CONNECTION = "connection"
+    VALIDATION = "validation"
+    CLIENT = "client"
+    UNKNOWN = "unknown"
+
+
+RETRYABLE_CATEGORIES = {
+    ErrorCategory.RATE_LIMIT,
+    ErrorCategory.SERVER,
+    ErrorCategory.TIMEOUT,
+    ErrorCategory.CONNECTION,
+}
+
+
+class RetryBudgetExceeded(asyncio.TimeoutError):
+    """Raised when the deadline budget is spent before an attempt could be made."""
+
+
+def classify_error(exc: BaseException) -> ErrorCategory:
+    """
+    Classify an exception raised by an LLM request.
+
+    Args:
+        exc: The exception raised by the attempt
+
+    Returns:
+        ErrorCategory: The category used to decide whether to retry
+    """
+    status_code = getattr(exc, "status_code", None)
+    if status_code is None:
+        response = getattr(exc, "response", None)
+        status_code = getattr(response, "status_code", None)
+
+    if isinstance(status_code, int):
+        if status_code == 429:
+            return ErrorCategory.RATE_LIMIT
+        if status_code == 408:
+            return ErrorCategory.TIMEOUT
+        if status_code >= 500:
+            return ErrorCategory.SERVER
+        if status_code in (400, 413, 422):
+            return ErrorCategory.VALIDATION
+        if 400 <= status_code < 500:
+            return ErrorCategory.CLIENT
+
+    if isinstance(exc, asyncio.TimeoutError):
+        return ErrorCategory.TIMEOUT
+
+    name = type(exc).__name__
+    if "Timeout" in name:
+        return ErrorCategory.TIMEOUT
+    if "Connection" in name or "Transport" in name or isinstance(exc, ConnectionError):
+        return ErrorCategory.CONNECTION
+    if isinstance(exc, (ValueError, TypeError)):
+        return ErrorCategory.VALIDATION
+    return ErrorCategory.UNKNOWN
+
+
+def parse_retry_after(exc: BaseException) -> Optional[float]:
+    """
+    Extract the server-requested delay from a provider error, if any.
+
+    Supports ``retry-after-ms``, ``retry-after`` in seconds and ``retry-after``
+    as an HTTP date.
+
+    Args:
+        exc: The exception raised by the attempt
+
+    Returns:
+        Delay in seconds, or None if the error carries no hint
+    """
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(0.0, float(value) / 1000.0)
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """Retries transient LLM errors with decorrelated jitter inside a deadline budget."""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 20.0,
+        deadline: float = 110.0,
+        attempt_timeout: float = 60.0
+    ):
+        """
+        Initialize the retry policy.
+
+        Args:
+            max_attempts: Maximum number of attempts, including the first one
+            base_delay: Minimum delay between attempts in seconds
+            max_delay: Maximum delay between attempts in seconds
+            deadline: Total time budget in seconds shared by all attempts and delays
+            attempt_timeout: Upper bound for a single attempt in seconds
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.attempt_timeout = attempt_timeout
+
+        self._counters = defaultdict(int)
+        self._errors = defaultdict(int)
+        self._retries = defaultdict(int)
+        self._backoff_seconds = 0.0
+
+    def next_delay(self, previous_delay: float, exc: BaseException) -> float:
+        """
+        Compute the delay before the next attempt.
+
+        Uses decorrelated jitter (``uniform(base, previous * 3)`` capped at
+        max_delay). If the provider sent ``Retry-After`` the delay is at least
+        that long, plus a small jitter so that waiting workers do not wake up
+        together.
+
+        Args:
+            previous_delay: Delay used before the previous attempt (0 for the first retry)
+            exc: The exception raised by the last attempt
+
+        Returns:
+            Delay in seconds
+        """
+        upper = max(self.base_delay, previous_delay * 3)
+        delay = min(self.max_delay, random.uniform(self.base_delay, upper))
+
+        retry_after = parse_retry_after(exc)
+        if retry_after is not None:
+            self._counters["retry_after_honoured"] += 1
+            delay = max(delay, retry_after + random.uniform(0, self.base_delay))
+        return delay
+
+    async def run(self, attempt: Callable[[float], Awaitable[T]], endpoint: str = "default") -> T:
+        """
+        Run an attempt function under this policy.
+
+        Args:
+            attempt: Coroutine function receiving the timeout (seconds) for that attempt
+            endpoint: Name of the calling endpoint, used in log messages
+
+        Returns:
+            The value returned by the first successful attempt
+
+        Raises:
+            RetryBudgetExceeded: If the deadline is spent before an attempt could be made
+            Exception: The last error if it is not retryable or retries are exhausted
+        """
+        started = time.monotonic()
+        delay = 0.0
+
+        for attempt_number in range(1, self.max_attempts + 1):
+            remaining = self.deadline - (time.monotonic() - started)
+            if remaining <= 0:
+                self._counters["deadline_exceeded"] += 1
+                raise RetryBudgetExceeded(f"Retry deadline of {self.deadline}s exceeded for {endpoint}")
+
+            self._counters["attempts"] += 1
+            try:
+                result = await attempt(min(self.attempt_timeout, remaining))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                category = classify_error(e)
+                self._errors[category.value] += 1
+
+                if category not in RETRYABLE_CATEGORIES:
+                    self._counters["not_retryable"] += 1
+                    raise
+                if attempt_number == self.max_attempts:
+                    self._counters["exhausted"] += 1
+                    logger.error(f"Groq API request failed after {attempt_number} attempts ({category.value}, endpoint={endpoint}): {str(e)}")
+                    raise
+
+                delay = self.next_delay(delay, e)
+                remaining = self.deadline - (time.monotonic() - started)
+                if delay >= remaining:
+                    self._counters["deadline_exceeded"] += 1
+                    logger.error(f"Not retrying {category.value} error for {endpoint}: backoff {delay:.1f}s exceeds remaining budget {remaining:.1f}s")
+                    raise
+
+                self._retries[category.value] += 1
+                self._backoff_seconds += delay
+                logger.warning(
+                    f"Groq API {category.value} error, retrying in {delay:.2f}s "
+                    f"(attempt {attempt_number}/{self.max_attempts}, endpoint={endpoint}): {str(e)}"
+                )
+                await asyncio.sleep(delay)
+                continue
+
+            self._counters["successes"] += 1
+            if attempt_number > 1:
+                self._counters["successes_after_retry"] += 1
+            return result
+
+        # Unreachable: the loop either returns or raises
+        raise RuntimeError("Retry loop exited without a result")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get attempt, error and retry counters."""
+        return {
+            "max_attempts": self.max_attempts,
+            "deadline": self.deadline,
+            "attempts": self._counters["attempts"],
+            "successes": self._counters["successes"],
+            "successes_after_retry": self._counters["successes_after_retry"],
+            "not_retryable": self._counters["not_retryable"],
+            "exhausted": self._counters["exhausted"],
+            "deadline_exceeded": self._counters["deadline_exceeded"],
+            "retry_after_honoured": self._counters["retry_after_honoured"],
+            "total_backoff_seconds": round(self._backoff_seconds, 3),
+            "errors_by_category": dict(self._errors),
+            "retries_by_category": dict(self._retries),
+        }
+
+
+def create_retry_policy_from_env() -> RetryPolicy:
+    """Create a RetryPolicy configured from GROQ_RETRY_* environment variables."""
+    return RetryPolicy(
+        max_attempts=int(os.getenv("GROQ_RETRY_MAX_ATTEMPTS", "3")),
+        base_delay=float(os.getenv("GROQ_RETRY_BASE_DELAY", "0.5")),
+        max_delay=float(os.getenv("GROQ_RETRY_MAX_DELAY", "20")),
+        deadline=float(os.getenv("GROQ_RETRY_DEADLINE", "110")),
+        attempt_timeout=float(os.getenv("GROQ_REQUEST_TIMEOUT", "60")),
+    )
+
+
+# Process-wide policy so that retry statistics aggregate across GroqClient instances
+retry_policy = create_retry_policy_from_env()
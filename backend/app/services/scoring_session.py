@@ -0,0 +1,394 @@
+"""
+Incremental ATS scoring sessions for live re-scoring while a resume is edited.
+
+A session holds a resume and a job description as paragraphs, each with its
+keyword term counts (scoring_rules.default_analyzer), plus the running totals
+calculate_keyword_match derives its score from. An edit re-tokenizes only the
+paragraphs it touches and adjusts the totals by the difference, so updating
+the score costs time proportional to the edit, not to the documents. No LLM
+calls are made.
+
+Edits are either splices (replace paragraphs[start:end] with new paragraphs)
+or a full new text, which is diffed against the stored paragraphs so only
+the changed run is re-tokenized. Scores equal calculate_ats_score on the same
+texts, except that a multi-word skill split across two paragraphs is not
+matched.
+
+Sessions live in process memory, expire after ATS_SESSION_TTL seconds idle
+(default 1800) and are capped at ATS_SESSION_MAX (default 1000, least
+recently used evicted first); texts are limited to ATS_SESSION_MAX_CHARS
+(default 100000), also as edits grow them. Run a single worker process, or route a session's requests
+to the process that created it.
+"""
+import os
+import re
+import time
+import uuid
+import logging
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+from ..utils.scoring_rules import default_analyzer
+from ..utils.text_analyzer import TextAnalyzer
+
+logger = logging.getLogger(__name__)
+
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+
+
+class SessionConflictError(Exception):
+    """Raised when an update is based on an outdated session revision."""
+
+    def __init__(self, revision: int):
+        super().__init__(f"Session is at revision {revision}")
+        self.revision = revision
+
+
+def split_paragraphs(text: str) -> List[str]:
+    """Split text at blank lines into non-empty, stripped paragraphs."""
+    return [paragraph for paragraph in map(str.strip, _PARAGRAPH_BREAK.split(text)) if paragraph]
+
+
+class _ParagraphTerms:
+    """Paragraphs of a text with per-paragraph term counts and their running totals."""
+
+    def __init__(self, analyzer: TextAnalyzer):
+        self.analyzer = analyzer
+        self.paragraphs: List[str] = []
+        self._counts: List[Counter] = []
+        self.total: Dict[str, int] = {}
+        self.size = 0
+        # Characters in all paragraphs
+        self.chars = 0
+
+    def splice(self, start: int, end: int, paragraphs: Sequence[str]) -> Dict[str, int]:
+        """
+        Replace paragraphs[start:end] with new paragraphs.
+
+        Args:
+            start: First paragraph replaced
+            end: Paragraph after the last one replaced (start to insert)
+            paragraphs: New paragraphs
+
+        Returns:
+            Dict[str, int]: Non-zero changes in the total count per term
+
+        Raises:
+            ValueError: If the range is outside the current paragraphs
+        """
+        if not 0 <= start <= end <= len(self.paragraphs):
+            raise ValueError(f"Invalid paragraph range {start}:{end} for {len(self.paragraphs)} paragraphs")
+        paragraphs = list(paragraphs)
+        counts = [Counter(self.analyzer.terms(paragraph)) for paragraph in paragraphs]
+
+        delta = Counter()
+        for old in self._counts[start:end]:
+            delta.subtract(old)
+        for new in counts:
+            delta.update(new)
+        self.chars += sum(map(len, paragraphs)) - sum(map(len, self.paragraphs[start:end]))
+        self.paragraphs[start:end] = paragraphs
+        self._counts[start:end] = counts
+
+        changes = {}
+        for term, change in delta.items():
+            if change:
+                changes[term] = change
+                value = self.total.get(term, 0) + change
+                if value:
+                    self.total[term] = value
+                else:
+                    del self.total[term]
+        self.size += sum(changes.values())
+        return changes
+
+    def set_text(self, text: str) -> Dict[str, int]:
+        """
+        Replace the whole text, re-tokenizing only paragraphs that changed.
+
+        Args:
+            text: New text
+
+        Returns:
+            Dict[str, int]: Non-zero changes in the total count per term
+        """
+        old, new = self.paragraphs, split_paragraphs(text)
+        limit = min(len(old), len(new))
+        prefix = 0
+        while prefix < limit and old[prefix] == new[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and old[-1 - suffix] == new[-1 - suffix]:
+            suffix += 1
+        return self.splice(prefix, len(old) - suffix, new[prefix:len(new) - suffix])
+
+
+def _check_edits(
+    terms: _ParagraphTerms,
+    text: Optional[str],
+    edits: Sequence[Dict[str, Any]],
+    max_chars: int
+) -> None:
+    """Raise ValueError if an edit range would be invalid, or the text too long, when applied after text."""
+    paragraphs = split_paragraphs(text) if text is not None else terms.paragraphs
+    lengths = [len(paragraph) for paragraph in paragraphs]
+    chars = sum(lengths) if text is not None else terms.chars
+    for edit in edits:
+        start, end = edit["start"], edit["end"]
+        if not 0 <= start <= end <= len(lengths):
+            raise ValueError(f"Invalid paragraph range {start}:{end} for {len(lengths)} paragraphs")
+        new_lengths = [len(paragraph) for paragraph in edit["paragraphs"]]
+        chars += sum(new_lengths) - sum(lengths[start:end])
+        # Repeated inserts must not grow a session's text past the limit
+        if chars > max_chars:
+            raise ValueError(f"Text exceeds {max_chars} characters")
+        lengths[start:end] = new_lengths
+
+
+class ScoringSession:
+    """A resume and job description kept tokenized for incremental ATS scoring."""
+
+    def __init__(self, session_id: str, owner: Optional[str], analyzer: TextAnalyzer):
+        self.id = session_id
+        self.owner = owner
+        self.revision = 0
+        self.resume = _ParagraphTerms(analyzer)
+        self.job = _ParagraphTerms(analyzer)
+        # Resume occurrences of terms that appear in the job description
+        self._matched_count = 0
+        self.last_used = time.monotonic()
+
+    def _resume_changed(self, changes: Dict[str, int]) -> None:
+        job_total = self.job.total
+        for term, change in changes.items():
+            if term in job_total:
+                self._matched_count += change
+
+    def _job_changed(self, changes: Dict[str, int]) -> None:
+        job_total, resume_total = self.job.total, self.resume.total
+        for term, change in changes.items():
+            present = term in job_total
+            was_present = job_total.get(term, 0) - change > 0
+            if present != was_present:
+                count = resume_total.get(term, 0)
+                self._matched_count += count if present else -count
+
+    def set_resume(self, text: str) -> None:
+        """Replace the resume text."""
+        self._resume_changed(self.resume.set_text(text))
+
+    def set_job_description(self, text: str) -> None:
+        """Replace the job description text."""
+        self._job_changed(self.job.set_text(text))
+
+    def edit_resume(self, start: int, end: int, paragraphs: Sequence[str]) -> None:
+        """Replace resume paragraphs[start:end] (see _ParagraphTerms.splice)."""
+        self._resume_changed(self.resume.splice(start, end, paragraphs))
+
+    def edit_job_description(self, start: int, end: int, paragraphs: Sequence[str]) -> None:
+        """Replace job description paragraphs[start:end] (see _ParagraphTerms.splice)."""
+        self._job_changed(self.job.splice(start, end, paragraphs))
+
+    @property
+    def score(self) -> float:
+        """Keyword match score, as calculate_keyword_match computes it."""
+        if not self.job.size:
+            return 0.0
+        return min(100.0, (self._matched_count / self.job.size) * 100)
+
+    def result(self) -> Dict[str, Any]:
+        """Get the current score and keyword matches."""
+        resume_total = self.resume.total
+        matched = [term for term in self.job.total if term in resume_total]
+        return {
+            "session_id": self.id,
+            "revision": self.revision,
+            "score": round(self.score, 1),
+            "matched_keywords": matched,
+            "missing_keywords": [term for term in self.job.total if term not in resume_total],
+            "total_keywords": self.job.size,
+            "resume_paragraphs": len(self.resume.paragraphs),
+            "job_paragraphs": len(self.job.paragraphs),
+        }
+
+
+class ScoringSessionStore:
+    """In-memory scoring sessions with idle expiry and an LRU size cap."""
+
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        ttl: float = 1800,
+        max_chars: int = 100_000,
+        analyzer: TextAnalyzer = default_analyzer
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            max_sessions: Sessions kept before the least recently used is evicted
+            ttl: Seconds a session may stay idle before it expires
+            max_chars: Maximum length of a resume or job description
+            analyzer: Keyword analyzer; the default matches calculate_ats_score
+        """
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_chars = max_chars
+        self.analyzer = analyzer
+        self._sessions: "OrderedDict[str, ScoringSession]" = OrderedDict()
+        self._counters = Counter()
+        self._update_seconds = 0.0
+
+    def _check_length(self, *texts: Optional[str]) -> None:
+        for text in texts:
+            if text is not None and len(text) > self.max_chars:
+                raise ValueError(f"Text exceeds {self.max_chars} characters")
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.ttl
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session.last_used > cutoff:
+                break
+            del self._sessions[session.id]
+            self._counters["expired"] += 1
+
+    def create(self, resume_text: str, job_description: str, owner: Optional[str] = None) -> ScoringSession:
+        """
+        Start a session.
+
+        Args:
+            resume_text: Resume text
+            job_description: Job description text
+            owner: User the session belongs to
+
+        Returns:
+            ScoringSession: The new session
+
+        Raises:
+            ValueError: If a text is too long
+        """
+        self._check_length(resume_text, job_description)
+        self._expire()
+        session = ScoringSession(str(uuid.uuid4()), owner, self.analyzer)
+        session.set_job_description(job_description)
+        session.set_resume(resume_text)
+        self._sessions[session.id] = session
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self._counters["evicted"] += 1
+        self._counters["created"] += 1
+        return session
+
+    def get(self, session_id: str, owner: Optional[str] = None) -> ScoringSession:
+        """
+        Get a session and mark it used.
+
+        Args:
+            session_id: Session id
+            owner: Requesting user; must match the session's owner
+
+        Returns:
+            ScoringSession: The session
+
+        Raises:
+            KeyError: If the session does not exist, expired or belongs to someone else
+        """
+        self._expire()
+        session = self._sessions.get(session_id)
+        if session is None or session.owner != owner:
+            raise KeyError(session_id)
+        session.last_used = time.monotonic()
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def update(
+        self,
+        session_id: str,
+        owner: Optional[str] = None,
+        resume_text: Optional[str] = None,
+        job_description: Optional[str] = None,
+        resume_edits: Sequence[Dict[str, Any]] = (),
+        job_edits: Sequence[Dict[str, Any]] = (),
+        base_revision: Optional[int] = None
+    ) -> ScoringSession:
+        """
+        Apply changes to a session.
+
+        Full texts are applied first, then edits in order, each against the
+        paragraphs left by the previous one. Edits are dicts with start, end
+        and paragraphs (see _ParagraphTerms.splice). Nothing is applied if
+        any edit is invalid.
+
+        Args:
+            session_id: Session id
+            owner: Requesting user
+            resume_text: New full resume text
+            job_description: New full job description text
+            resume_edits: Resume paragraph splices
+            job_edits: Job description paragraph splices
+            base_revision: Revision the changes were made against, if checked
+
+        Returns:
+            ScoringSession: The updated session
+
+        Raises:
+            KeyError: If the session is not found
+            SessionConflictError: If base_revision is not the current revision
+            ValueError: If a text is too long or an edit range is invalid
+        """
+        session = self.get(session_id, owner)
+        if base_revision is not None and base_revision != session.revision:
+            raise SessionConflictError(session.revision)
+        self._check_length(resume_text, job_description)
+        _check_edits(session.resume, resume_text, resume_edits, self.max_chars)
+        _check_edits(session.job, job_description, job_edits, self.max_chars)
+
+        started = time.perf_counter()
+        session.revision += 1
+        if job_description is not None:
+            session.set_job_description(job_description)
+        if resume_text is not None:
+            session.set_resume(resume_text)
+        for edit in job_edits:
+            session.edit_job_description(edit["start"], edit["end"], edit["paragraphs"])
+        for edit in resume_edits:
+            session.edit_resume(edit["start"], edit["end"], edit["paragraphs"])
+        self._update_seconds += time.perf_counter() - started
+        self._counters["updates"] += 1
+        return session
+
+    def delete(self, session_id: str, owner: Optional[str] = None) -> None:
+        """
+        End a session.
+
+        Raises:
+            KeyError: If the session is not found
+        """
+        self.get(session_id, owner)
+        del self._sessions[session_id]
+
+    def stats(self) -> Dict[str, Any]:
+        """Get session counters."""
+        updates = self._counters["updates"]
+        return {
+            "active": len(self._sessions),
+            "created": self._counters["created"],
+            "updates": updates,
+            "expired": self._counters["expired"],
+            "evicted": self._counters["evicted"],
+            "avg_update_ms": round(self._update_seconds / updates * 1000, 3) if updates else None,
+        }
+
+
+def create_scoring_session_store_from_env() -> ScoringSessionStore:
+    """Create a ScoringSessionStore configured from ATS_SESSION_* environment variables."""
+    return ScoringSessionStore(
+        max_sessions=int(os.getenv("ATS_SESSION_MAX", "1000")),
+        ttl=float(os.getenv("ATS_SESSION_TTL", "1800")),
+        max_chars=int(os.getenv("ATS_SESSION_MAX_CHARS", "100000"))
+    )
+
+
+# Process-wide session store
+scoring_sessions = create_scoring_session_store_from_env()
@@ -0,0 +1,262 @@
+"""
+Semantic resume scoring and search, computed locally.
+
+Resumes are split into sections and embedded with app.utils.semantic_index:
+a sentence-transformers model from SEMANTIC_MODEL_PATH when one is
+configured, otherwise the hashing embedder, which needs nothing but NumPy.
+No network access and no LLM calls are involved, so the semantic score can
+serve as a fast pre-score next to the keyword-based ATS score.
+
+Stored Resume rows are kept in a VectorIndex (int8 unless SEMANTIC_INT8 is
+false). The index loads lazily on the first search and then picks up rows
+created or updated since, by their updated_at. Hits whose resume no longer
+exists are dropped from it during the search and replaced by the next best,
+so deleted resumes never take result slots.
+
+Configured with SEMANTIC_MODEL_PATH, SEMANTIC_DIM (hashing vector size,
+default 1024), SEMANTIC_INT8 (default true) and SEMANTIC_MAX_SECTIONS
+(default 8).
+"""
+import os
+import re
+import time
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from ..database.models import Resume
+from ..utils.semantic_index import (
+    NUMPY_AVAILABLE,
+    HashingEmbedder,
+    SentenceTransformerEmbedder,
+    VectorIndex,
+)
+
+logger = logging.getLogger(__name__)
+
+_BLANK_LINES = re.compile(r'\n\s*\n')
+_HEADING = re.compile(
+    r'^\s*(summary|profile|about|objective|experience|work experience|employment|education|skills|'
+    r'technical skills|projects|certifications|awards|publications|volunteering|languages)\s*:?\s*$',
+    re.IGNORECASE | re.MULTILINE
+)
+
+# Sections shorter than this are merged into the next one
+MIN_SECTION_CHARS = 200
+# Longer sections are cut at line breaks to keep each embedding focused
+MAX_SECTION_CHARS = 1500
+
+
+def split_sections(text: str, max_sections: int = 8) -> List[str]:
+    """
+    Split resume text into sections for embedding.
+
+    Splits at section headings and blank lines, merges fragments shorter than
+    MIN_SECTION_CHARS, cuts sections longer than MAX_SECTION_CHARS at line
+    breaks and merges the tail so there are at most max_sections.
+
+    Args:
+        text: Resume text
+        max_sections: Maximum number of sections returned
+
+    Returns:
+        List[str]: Non-empty sections in document order
+    """
+    marked = _HEADING.sub(lambda match: "\n\n" + match.group(0).strip(), text)
+    pieces: List[str] = []
+    for block in _BLANK_LINES.split(marked):
+        block = block.strip()
+        while len(block) > MAX_SECTION_CHARS:
+            cut = block.rfind("\n", 0, MAX_SECTION_CHARS)
+            cut = cut if cut > MIN_SECTION_CHARS else MAX_SECTION_CHARS
+            pieces.append(block[:cut].strip())
+            block = block[cut:].strip()
+        if block:
+            pieces.append(block)
+
+    sections: List[str] = []
+    for piece in pieces:
+        if sections and len(sections[-1]) < MIN_SECTION_CHARS:
+            sections[-1] = f"{sections[-1]}\n{piece}"
+        else:
+            sections.append(piece)
+    if len(sections) > max_sections:
+        sections[max_sections - 1:] = ["\n".join(sections[max_sections - 1:])]
+    return sections
+
+
+class SemanticSearch:
+    """Local embeddings for resume/job similarity and an index of stored resumes."""
+
+    def __init__(self, embedder, quantize: bool = True, max_sections: int = 8):
+        """
+        Initialize the service.
+
+        Args:
+            embedder: Object with dim and embed(texts) returning normalized float32 rows
+            quantize: Store indexed vectors as int8
+            max_sections: Sections embedded per resume
+        """
+        self.embedder = embedder
+        self.max_sections = max_sections
+        self.index = VectorIndex(embedder.dim, quantize=quantize)
+        self._watermark: Optional[datetime] = None
+        self._refresh_lock = asyncio.Lock()
+        self._queries = 0
+        self._query_seconds = 0.0
+
+    def score(self, resume_text: str, job_description: str) -> Dict[str, Any]:
+        """
+        Score how semantically close a resume is to a job description.
+
+        The similarity is the mean of the whole-resume cosine and the best
+        section's cosine, so a resume with one strongly matching section is
+        not diluted by unrelated ones.
+
+        Args:
+            resume_text: Resume text
+            job_description: Job description text
+
+        Returns:
+            Dict with score (0-100), similarity, document and per-section similarities
+            and the embedder used
+        """
+        sections = split_sections(resume_text, self.max_sections)
+        vectors = self.embedder.embed([job_description, resume_text] + sections)
+        similarities = vectors[1:] @ vectors[0]
+        document = float(similarities[0])
+        section_scores = [float(value) for value in similarities[1:]]
+        best = max(section_scores, default=document)
+        similarity = min(max((document + best) / 2, 0.0), 1.0)
+        return {
+            "score": round(similarity * 100, 1),
+            "similarity": round(similarity, 4),
+            "document_similarity": round(document, 4),
+            "sections": [
+                {"index": index, "similarity": round(value, 4), "preview": section[:120]}
+                for index, (section, value) in enumerate(zip(sections, section_scores))
+            ],
+            "embedder": self.embedder.name,
+        }
+
+    def index_resume(self, resume_id: str, text: str, user_id: Optional[str] = None) -> int:
+        """
+        Add or replace a resume in the index.
+
+        Args:
+            resume_id: Resume id
+            text: Resume text
+            user_id: Owner, used to restrict searches
+
+        Returns:
+            int: Number of sections indexed (0 if the text is empty)
+        """
+        sections = split_sections(text or "", self.max_sections)
+        if not sections:
+            self.index.remove(resume_id)
+            return 0
+        self.index.add(resume_id, self.embedder.embed(sections), owner=user_id)
+        return len(sections)
+
+    def remove_resume(self, resume_id: str) -> bool:
+        """Remove a resume from the index; returns True if it was indexed."""
+        return self.index.remove(resume_id)
+
+    def _index_rows(self, rows: List[Any]) -> None:
+        for row in rows:
+            self.index_resume(row.id, row.content, row.user_id)
+
+    async def refresh(self, db: Session) -> int:
+        """
+        Index stored resumes created or updated since the last refresh.
+
+        Args:
+            db: Database session
+
+        Returns:
+            int: Number of resumes (re)indexed
+        """
+        async with self._refresh_lock:
+            query = db.query(Resume.id, Resume.user_id, Resume.content, Resume.updated_at)
+            if self._watermark is not None:
+                query = query.filter(Resume.updated_at >= self._watermark)
+            rows = query.order_by(Resume.updated_at).all()
+            if not rows:
+                return 0
+            await asyncio.to_thread(self._index_rows, rows)
+            self._watermark = rows[-1].updated_at or self._watermark
+            if len(rows) > 1:
+                logger.info(f"Semantic index refreshed with {len(rows)} resumes ({len(self.index)} indexed)")
+            return len(rows)
+
+    async def search(self, db: Session, query: str, user_id: Optional[str] = None, top_k: int = 10) -> List[Dict[str, Any]]:
+        """
+        Find the stored resumes most similar to a query such as a job description.
+
+        Args:
+            db: Database session
+            query: Query text
+            user_id: Only search this user's resumes
+            top_k: Number of results
+
+        Returns:
+            List of {"resume_id", "similarity"} dicts for existing resumes, best first
+        """
+        await self.refresh(db)
+        started = time.monotonic()
+        vector = (await asyncio.to_thread(self.embedder.embed, [query]))[0]
+        while True:
+            hits = self.index.search(vector, k=top_k, owner=user_id)
+            keys = [key for key, _ in hits]
+            existing = {row.id for row in db.query(Resume.id).filter(Resume.id.in_(keys))}
+            stale = [key for key in keys if key not in existing]
+            if not stale:
+                break
+            # Deleted since they were indexed; drop them so the next candidates fill their slots
+            for key in stale:
+                self.index.remove(key)
+            logger.info(f"Removed {len(stale)} deleted resumes from the semantic index")
+        self._queries += 1
+        self._query_seconds += time.monotonic() - started
+        return [{"resume_id": key, "similarity": round(score, 4)} for key, score in hits]
+
+    def stats(self) -> Dict[str, Any]:
+        """Get index size and query counters."""
+        return {
+            "embedder": self.embedder.name,
+            "dim": self.embedder.dim,
+            "quantized": self.index.quantize,
+            "resumes": len(self.index),
+            "vectors": self.index.row_count,
+            "memory_bytes": self.index.memory_bytes,
+            "queries": self._queries,
+            "avg_query_ms": round(self._query_seconds / self._queries * 1000, 2) if self._queries else None,
+        }
+
+
+def create_semantic_search_from_env() -> Optional[SemanticSearch]:
+    """Create the service from SEMANTIC_* environment variables; None without NumPy."""
+    if not NUMPY_AVAILABLE:
+        return None
+    embedder = None
+    model_path = os.getenv("SEMANTIC_MODEL_PATH")
+    if model_path:
+        try:
+            embedder = SentenceTransformerEmbedder(model_path)
+            logger.info(f"Semantic search using local model {model_path}")
+        except Exception as e:
+            logger.error(f"Could not load embedding model from {model_path}, using hashing embeddings: {str(e)}")
+    if embedder is None:
+        embedder = HashingEmbedder(dim=int(os.getenv("SEMANTIC_DIM", "1024")))
+    return SemanticSearch(
+        embedder,
+        quantize=os.getenv("SEMANTIC_INT8", "true").lower() in ("true", "1", "t"),
+        max_sections=int(os.getenv("SEMANTIC_MAX_SECTIONS", "8"))
+    )
+
+
+# Process-wide service and index, shared by all requests
+semantic_search = create_semantic_search_from_env()
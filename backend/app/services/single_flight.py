@@ -0,0 +1,101 @@
+"""
+Single-flight request coalescing.
+
+Concurrent calls with the same key share one underlying coroutine: the first
+caller starts it and later callers await the same task until it finishes. This
+keeps duplicate LLM prompts (e.g. a double-clicked "Generate" button) from each
+paying the full latency and token cost.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _Flight:
+    """An in-flight call and the number of callers waiting on it."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Task[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share a key."""
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self._counters = defaultdict(int)
+        self._coalesced_by_endpoint = defaultdict(int)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]], endpoint: str = "default") -> T:
+        """
+        Run fn, or join an identical call that is already in flight.
+
+        The shared call runs as its own task, so one caller being cancelled
+        (e.g. a client disconnect) does not cancel it for the others. It is only
+        cancelled once every caller waiting on it has gone away.
+
+        Args:
+            key: Identity of the call, e.g. a hash of the normalized request payload
+            fn: Coroutine function performing the call
+            endpoint: Name of the calling endpoint, used for counters
+
+        Returns:
+            The result of the shared call
+
+        Raises:
+            Exception: Whatever the shared call raised, re-raised in every caller
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _, k=key, f=flight: self._forget(k, f))
+            self._counters["leaders"] += 1
+        else:
+            self._counters["coalesced"] += 1
+            self._coalesced_by_endpoint[endpoint] += 1
+            logger.info(f"Coalesced duplicate in-flight Groq request (endpoint={endpoint})")
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        # Retrieve the exception so an unawaited failure is not reported as never retrieved
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get coalescing counters."""
+        leaders = self._counters["leaders"]
+        coalesced = self._counters["coalesced"]
+        total = leaders + coalesced
+        return {
+            "in_flight": len(self._flights),
+            "calls": total,
+            "upstream_calls": leaders,
+            "coalesced": coalesced,
+            "coalesced_rate": round(coalesced / total, 4) if total else 0.0,
+            "coalesced_by_endpoint": dict(self._coalesced_by_endpoint),
+        }
+
+
+# Process-wide group shared by every GroqClient instance, so duplicates are
+# coalesced even when they arrive through different service objects
+llm_single_flight = SingleFlight()
@@ -0,0 +1,172 @@
+"""
+Schema-constrained generation helpers for Groq requests.
+
+GroqClient.generate_json asks for JSON mode and appends format instructions
+derived from a pydantic model's JSON schema. The completion is then repaired
+locally rather than regenerated:
+
+1. extract_json fixes syntax (fences, trailing commas, truncation, ...).
+2. A lone wrapper object such as {"portfolio": {...}} is unwrapped.
+3. Values that fail validation are dropped so the schema's defaults apply.
+
+Only if all of that fails is the response rejected, and even then the caller
+falls back locally instead of sending the request again.
+"""
+import logging
+from typing import Any, Dict, List, Optional, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+from ..utils.json_extract import JSONExtractionError, extract_json_object
+from .token_budget import compact_json
+
+logger = logging.getLogger(__name__)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# response_format sent to Groq for JSON mode
+JSON_MODE = {"type": "json_object"}
+
+# Schema keys that cost prompt tokens without helping the model
+_SCHEMA_NOISE = {"title", "additionalProperties"}
+
+
+class StructuredOutputError(ValueError):
+    """Raised when a completion cannot be repaired into the requested schema."""
+
+
+def _strip_schema(node: Any, names: bool = False) -> Any:
+    if isinstance(node, dict):
+        if names:
+            # Keys of "properties" and "$defs" are field and model names, not schema keywords
+            return {key: _strip_schema(value) for key, value in node.items()}
+        return {
+            key: _strip_schema(value, names=key in ("properties", "$defs"))
+            for key, value in node.items() if key not in _SCHEMA_NOISE
+        }
+    if isinstance(node, list):
+        return [_strip_schema(value) for value in node]
+    return node
+
+
+def schema_instructions(schema: Type[BaseModel]) -> str:
+    """
+    Build format instructions for a pydantic schema.
+
+    Args:
+        schema: Model describing the expected JSON object
+
+    Returns:
+        str: Instructions embedding the model's minified JSON schema
+    """
+    return (
+        "Respond with a single JSON object and nothing else: no markdown, no code fences, "
+        "no comments. The object must conform to this JSON schema:\n"
+        f"{compact_json(_strip_schema(schema.model_json_schema()))}"
+    )
+
+
+def with_schema_instructions(messages: List[Dict[str, str]], schema: Type[BaseModel]) -> List[Dict[str, str]]:
+    """Return a copy of the messages with the schema instructions added to the system prompt."""
+    instructions = schema_instructions(schema)
+    messages = [dict(message) for message in messages]
+    for message in messages:
+        if message["role"] == "system":
+            message["content"] = f"{message['content']}\n\n{instructions}"
+            return messages
+    return [{"role": "system", "content": instructions}] + messages
+
+
+def _drop_invalid(data: Dict[str, Any], error: ValidationError) -> bool:
+    """Remove the values at each error location; returns False if nothing could be removed."""
+    removed = False
+    for detail in error.errors():
+        loc = detail["loc"]
+        parent: Any = data
+        for part in loc[:-1]:
+            try:
+                parent = parent[part]
+            except (KeyError, IndexError, TypeError):
+                parent = None
+                break
+        if isinstance(parent, dict) and loc and loc[-1] in parent:
+            del parent[loc[-1]]
+            removed = True
+        elif isinstance(parent, list) and loc and isinstance(loc[-1], int) and loc[-1] < len(parent):
+            parent[loc[-1]] = None
+            removed = True
+    if removed:
+        # Invalid list items were blanked above so indexes stayed stable; drop them now
+        _compact_lists(data)
+    return removed
+
+
+def _compact_lists(node: Any) -> None:
+    if isinstance(node, dict):
+        for value in node.values():
+            _compact_lists(value)
+    elif isinstance(node, list):
+        node[:] = [value for value in node if value is not None]
+        for value in node:
+            _compact_lists(value)
+
+
+def parse_structured(text: Optional[str], schema: Type[ModelT]) -> ModelT:
+    """
+    Parse a completion into a schema instance, repairing it locally where possible.
+
+    Args:
+        text: Raw completion text
+        schema: Model to validate against
+
+    Returns:
+        An instance of schema
+
+    Raises:
+        StructuredOutputError: If the text cannot be repaired into the schema
+    """
+    try:
+        data = extract_json_object(text or "")
+    except JSONExtractionError as e:
+        raise StructuredOutputError(str(e)) from e
+
+    # Models sometimes wrap the object, e.g. {"portfolio": {...}}
+    if len(data) == 1:
+        key, inner = next(iter(data.items()))
+        if key not in schema.model_fields and isinstance(inner, dict):
+            data = inner
+
+    try:
+        return schema.model_validate(data)
+    except ValidationError as e:
+        error = e
+
+    for _ in range(3):
+        if not _drop_invalid(data, error):
+            break
+        try:
+            result = schema.model_validate(data)
+            logger.info(f"Repaired {schema.__name__} output by dropping {error.error_count()} invalid value(s)")
+            return result
+        except ValidationError as e:
+            error = e
+
+    raise StructuredOutputError(f"Response does not match {schema.__name__}: {error.error_count()} validation error(s)")
+
+
+def failed_generation(exc: BaseException) -> Optional[str]:
+    """
+    Get the rejected completion from a Groq JSON mode validation error, if present.
+
+    When JSON mode output is not valid JSON Groq returns a 400 whose body
+    includes the generation under 'failed_generation'; it can usually be
+    repaired locally.
+    """
+    body = getattr(exc, "body", None)
+    if isinstance(body, dict):
+        body = body.get("error", body)
+    if isinstance(body, dict):
+        generation = body.get("failed_generation")
+        if isinstance(generation, str) and generation:
+            return generation
+    return None
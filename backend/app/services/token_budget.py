@@ -0,0 +1,255 @@
+"""
+Token budgeting for Groq prompts.
+
+Before a request is sent, the planner compacts every message (collapsing
+indentation and runs of whitespace, which triple-quoted prompt templates are
+full of) and, if the prompt is still over the budget for its task, trims the
+largest message to fit. Prompts embed their input (a resume, a job
+description) before the instructions and output format, so the message is
+cut in the middle: its start and its last KEPT_TAIL_TOKENS survive. Callers
+should still trim embedded inputs with trim_to_tokens, which keeps the cut
+inside the input. The output limit comes from the task's model route.
+
+Estimated prompt tokens are compared with the usage the API reports, so the
+estimator's accuracy and the savings are visible in /api/llm/stats.
+"""
+import os
+import re
+import json
+import logging
+from dataclasses import dataclass
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .model_router import TaskType
+from .rate_limiter import CHARS_PER_TOKEN
+
+logger = logging.getLogger(__name__)
+
+# Prompt token budget per task; the completion budget is the route's max_tokens
+DEFAULT_PROMPT_BUDGETS: Dict[TaskType, int] = {
+    TaskType.EXTRACTION: 3000,
+    TaskType.SCORING: 2500,
+    TaskType.WRITING: 6000,
+    TaskType.PORTFOLIO_ENHANCEMENT: 4000,
+}
+
+TRUNCATION_MARKER = "\n[...truncated]"
+
+# Never trim a message below this, even if the other messages alone exceed the budget
+MIN_TRIMMED_TOKENS = 256
+
+# End of a trimmed message that is always kept: the instructions and output format
+KEPT_TAIL_TOKENS = 512
+
+_INLINE_WHITESPACE = re.compile(r"[ \t\f\v]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def estimate_text_tokens(text: str) -> int:
+    """Estimate the number of tokens in a piece of text."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def compact_whitespace(text: str) -> str:
+    """
+    Remove whitespace that carries no meaning for the model.
+
+    Strips indentation and trailing spaces, collapses runs of spaces and tabs
+    and limits blank lines to one in a row.
+
+    Args:
+        text: Text to compact
+
+    Returns:
+        str: The compacted text
+    """
+    lines = (_INLINE_WHITESPACE.sub(" ", line).strip() for line in text.splitlines())
+    return _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
+
+
+def compact_json(value: Any) -> str:
+    """Serialize a value as minified JSON for embedding in a prompt."""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def trim_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Trim text to an approximate token budget, cutting at a line or word boundary.
+
+    Args:
+        text: Text to trim
+        max_tokens: Maximum number of tokens to keep
+
+    Returns:
+        str: The text, with a truncation marker appended if it was cut
+    """
+    max_chars = max(0, max_tokens * CHARS_PER_TOKEN)
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max(0, max_chars - len(TRUNCATION_MARKER))]
+    boundary = max(cut.rfind("\n"), cut.rfind(" "))
+    if boundary > len(cut) * 0.8:
+        cut = cut[:boundary]
+    return cut.rstrip() + TRUNCATION_MARKER
+
+
+def trim_middle_to_tokens(text: str, max_tokens: int, tail_tokens: int = KEPT_TAIL_TOKENS) -> str:
+    """
+    Trim text to an approximate token budget by cutting from the middle.
+
+    The end of the text (up to tail_tokens, at most half the budget) is kept
+    whole, starting at a line or word boundary; the rest of the budget goes to
+    the start of the text, trimmed as trim_to_tokens does.
+
+    Args:
+        text: Text to trim
+        max_tokens: Maximum number of tokens to keep
+        tail_tokens: Tokens to keep from the end of the text
+
+    Returns:
+        str: The text, with a truncation marker where it was cut
+    """
+    max_chars = max(0, max_tokens * CHARS_PER_TOKEN)
+    if len(text) <= max_chars:
+        return text
+    tail_chars = min(tail_tokens * CHARS_PER_TOKEN, max_chars // 2)
+    tail = text[len(text) - tail_chars:] if tail_chars else ""
+    boundary = tail.find("\n")
+    if not 0 <= boundary < len(tail) * 0.2:
+        boundary = tail.find(" ")
+    if 0 <= boundary < len(tail) * 0.2:
+        tail = tail[boundary + 1:]
+    head = trim_to_tokens(text[:len(text) - len(tail)], max_tokens - estimate_text_tokens(tail) - 1)
+    return f"{head}\n{tail}" if tail else head
+
+
+@dataclass
+class BudgetPlan:
+    """Result of fitting a request into its token budget."""
+    task: TaskType
+    original_prompt_tokens: int
+    estimated_prompt_tokens: int
+    prompt_budget: int
+    max_tokens: int
+    trimmed: bool
+
+
+class TokenBudgetPlanner:
+    """Compacts and trims prompts to per-task budgets and tracks estimate accuracy."""
+
+    def __init__(self, prompt_budgets: Optional[Dict[TaskType, int]] = None):
+        """
+        Initialize the planner.
+
+        Args:
+            prompt_budgets: Prompt token budget per task. Defaults to DEFAULT_PROMPT_BUDGETS.
+        """
+        self.prompt_budgets = dict(prompt_budgets or DEFAULT_PROMPT_BUDGETS)
+        self._counters: Dict[TaskType, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def plan(
+        self,
+        messages: List[Dict[str, str]],
+        task: TaskType,
+        max_tokens: int
+    ) -> Tuple[List[Dict[str, str]], BudgetPlan]:
+        """
+        Fit a request's messages into the prompt budget for its task.
+
+        Args:
+            messages: Chat messages with 'role' and 'content'
+            task: Task type of the request
+            max_tokens: Output token limit for the request
+
+        Returns:
+            Tuple of (compacted messages, plan describing the budget)
+        """
+        budget = self.prompt_budgets.get(task, DEFAULT_PROMPT_BUDGETS[TaskType.WRITING])
+        original = sum(estimate_text_tokens(m["content"]) for m in messages)
+        compacted = [dict(m, content=compact_whitespace(m["content"])) for m in messages]
+        sizes = [estimate_text_tokens(m["content"]) for m in compacted]
+
+        trimmed = False
+        overflow = sum(sizes) - budget
+        if overflow > 0:
+            # Inputs such as resumes live in the largest message; shrink only that one, from
+            # the middle, so the instructions after the input are kept
+            largest = max(range(len(compacted)), key=sizes.__getitem__)
+            keep = max(sizes[largest] - overflow, MIN_TRIMMED_TOKENS)
+            compacted[largest]["content"] = trim_middle_to_tokens(compacted[largest]["content"], keep)
+            sizes[largest] = estimate_text_tokens(compacted[largest]["content"])
+            trimmed = True
+            logger.info(
+                f"Trimmed {task.value} prompt from {original} to {sum(sizes)} estimated tokens "
+                f"(budget {budget})"
+            )
+
+        plan = BudgetPlan(
+            task=task,
+            original_prompt_tokens=original,
+            estimated_prompt_tokens=sum(sizes),
+            prompt_budget=budget,
+            max_tokens=max_tokens,
+            trimmed=trimmed
+        )
+        counters = self._counters[task]
+        counters["planned"] += 1
+        counters["trimmed"] += int(trimmed)
+        counters["tokens_saved"] += original - plan.estimated_prompt_tokens
+        return compacted, plan
+
+    def record(self, plan: BudgetPlan, prompt_tokens: int, completion_tokens: int) -> None:
+        """
+        Record the usage reported by the API for a planned request.
+
+        Args:
+            plan: The plan the request was sent with
+            prompt_tokens: Prompt tokens reported by the API
+            completion_tokens: Completion tokens reported by the API
+        """
+        if not prompt_tokens:
+            return
+        counters = self._counters[plan.task]
+        counters["measured"] += 1
+        counters["estimated_prompt_tokens"] += plan.estimated_prompt_tokens
+        counters["actual_prompt_tokens"] += prompt_tokens
+        counters["completion_tokens"] += completion_tokens
+        counters["max_tokens"] += plan.max_tokens
+        if completion_tokens >= plan.max_tokens:
+            counters["hit_max_tokens"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Get per-task budgets, savings and estimated versus actual token counts."""
+        result = {}
+        for task, budget in self.prompt_budgets.items():
+            counters = self._counters[task]
+            estimated = counters["estimated_prompt_tokens"]
+            actual = counters["actual_prompt_tokens"]
+            result[task.value] = {
+                "prompt_budget": budget,
+                "planned": counters["planned"],
+                "trimmed": counters["trimmed"],
+                "tokens_saved": counters["tokens_saved"],
+                "measured": counters["measured"],
+                "estimated_prompt_tokens": estimated,
+                "actual_prompt_tokens": actual,
+                "estimate_error_pct": round((estimated - actual) / actual * 100, 1) if actual else None,
+                "completion_tokens": counters["completion_tokens"],
+                "max_tokens_utilization": round(counters["completion_tokens"] / counters["max_tokens"], 3) if counters["max_tokens"] else None,
+                "hit_max_tokens": counters["hit_max_tokens"],
+            }
+        return result
+
+
+def create_planner_from_env() -> TokenBudgetPlanner:
+    """Create a TokenBudgetPlanner, applying GROQ_PROMPT_BUDGET_<TASK> overrides."""
+    budgets = {
+        task: int(os.getenv(f"GROQ_PROMPT_BUDGET_{task.value.upper()}", str(budget)))
+        for task, budget in DEFAULT_PROMPT_BUDGETS.items()
+    }
+    return TokenBudgetPlanner(budgets)
+
+
+# Process-wide planner shared by every GroqClient instance
+token_budget = create_planner_from_env()
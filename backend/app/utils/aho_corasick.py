@@ -0,0 +1,120 @@
+"""
+Aho-Corasick multi-pattern matching over token sequences.
+
+Patterns are sequences of tokens (e.g. ("google", "cloud", "platform")) and
+the automaton consumes a tokenized text once, reporting every occurrence of
+every pattern in time linear in the number of tokens plus matches, however
+many patterns there are. Working on tokens rather than characters means
+matches always fall on word boundaries.
+"""
+from collections import deque
+from typing import Dict, Generic, Iterable, Iterator, List, Sequence, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class AhoCorasick(Generic[V]):
+    """Token-level Aho-Corasick automaton mapping token patterns to values."""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Per state: (pattern length, value) for every pattern ending there
+        self._out: List[List[Tuple[int, V]]] = [[]]
+        self._patterns = 0
+        self._built = False
+
+    def __len__(self) -> int:
+        """Number of patterns added."""
+        return self._patterns
+
+    def add(self, tokens: Sequence[str], value: V) -> None:
+        """
+        Add a pattern. Must be called before build().
+
+        Args:
+            tokens: Non-empty token sequence to match
+            value: Value reported when the pattern matches
+        """
+        if self._built:
+            raise RuntimeError("Cannot add patterns after build()")
+        if not tokens:
+            raise ValueError("Pattern must contain at least one token")
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = next_state
+        self._out[state].append((len(tokens), value))
+        self._patterns += 1
+
+    def build(self) -> "AhoCorasick[V]":
+        """Compute failure links; the automaton is read-only afterwards."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                # Patterns that are suffixes of this one end here too
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+        self._built = True
+        return self
+
+    def search(self, tokens: Sequence[str]) -> Iterator[Tuple[int, int, V]]:
+        """
+        Find every pattern occurrence in a token sequence.
+
+        Args:
+            tokens: Tokenized text
+
+        Yields:
+            (start, end, value) for each occurrence, where tokens[start:end] is the match
+        """
+        if not self._built:
+            raise RuntimeError("build() must be called before search()")
+        goto, fail, out = self._goto, self._fail, self._out
+        root = goto[0]
+        state = 0
+        for index, token in enumerate(tokens):
+            if state == 0:
+                # Most tokens start nothing; stay at the root without following links
+                state = root.get(token, 0)
+            else:
+                next_state = goto[state].get(token)
+                while next_state is None and state:
+                    state = fail[state]
+                    next_state = goto[state].get(token)
+                state = next_state or 0
+            if out[state]:
+                end = index + 1
+                for length, value in out[state]:
+                    yield end - length, end, value
+
+
+def leftmost_longest(matches: Iterable[Tuple[int, int, V]]) -> List[Tuple[int, int, V]]:
+    """
+    Reduce matches to non-overlapping ones, preferring the leftmost and then the longest.
+
+    Args:
+        matches: (start, end, value) matches, e.g. from AhoCorasick.search
+
+    Returns:
+        List of (start, end, value) in text order; among identical spans the first wins
+    """
+    selected = []
+    covered = 0
+    for start, end, value in sorted(matches, key=lambda match: (match[0], match[0] - match[1])):
+        if start >= covered:
+            selected.append((start, end, value))
+            covered = end
+    return selected
@@ -2,13 +2,25 @@
 File handling utilities for PortfolioAI.
 """
 import os
+import codecs
 import tempfile
 import uuid
+import hashlib
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, BinaryIO, Union, Dict, Any
+from typing import Optional, BinaryIO, Union, Dict, Any, Iterable
 import logging
 import mimetypes
 
+import aiofiles
+
+from ..config import settings
+
+try:
+    import filetype
+except ImportError:
+    filetype = None
+
 # Try to import python-magic, fallback to mimetypes
 try:
     import magic
@@ -154,21 +166,148 @@ def is_file_supported(file_path: Union[str, Path]) -> bool:
         logger.error(f"Error checking file type: {e}")
         return False
 
-async def save_upload_file(upload_file, destination: Union[str, Path]) -> None:
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+DOCX_MIME_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+class UploadError(Exception):
+    """Raised when an uploaded file is rejected."""
+
+
+class UploadTooLargeError(UploadError):
+    """Raised when an uploaded file exceeds the size limit."""
+
+
+class UnsupportedFileTypeError(UploadError):
+    """Raised when an uploaded file's content is not of an allowed type."""
+
+
+def format_size(size: int) -> str:
+    """Format a byte count as MB, or KB below 1MB."""
+    if size >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.3g}MB"
+    return f"{size / 1024:.3g}KB"
+
+
+@dataclass
+class StagedUpload:
+    """An upload written to disk, with the hash and type computed while writing it."""
+    path: Path
+    sha256: str
+    size: int
+    content_type: str
+
+
+def sniff_content_type(head: bytes, declared: Optional[str] = None) -> str:
     """
-    Save an uploaded file to the specified destination.
+    Determine a file's MIME type from its first bytes.
+    
+    Args:
+        head: The start of the file; a few KB is enough to recognise DOCX
+        declared: MIME type sent by the client, used only where the bytes are ambiguous
+        
+    Returns:
+        str: MIME type, "text/plain" for UTF-8 text without a signature or
+        "application/octet-stream" if unknown
+    """
+    kind = filetype.guess(head) if filetype is not None and head else None
+    if kind is not None:
+        # A DOCX is a zip; its content types entry can lie past the sniffed bytes
+        if kind.mime == "application/zip" and declared == DOCX_MIME_TYPE:
+            return DOCX_MIME_TYPE
+        return kind.mime
+    if filetype is None and declared:
+        return declared
+    
+    if b"\x00" not in head:
+        try:
+            # Not final: a multi-byte character may be cut at the end of the sniffed bytes
+            codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+            return "text/plain"
+        except UnicodeDecodeError:
+            pass
+    return "application/octet-stream"
+
+
+async def stream_upload_file(
+    upload_file,
+    directory: Union[str, Path],
+    max_size: Optional[int] = None,
+    allowed_types: Optional[Iterable[str]] = None,
+    chunk_size: int = UPLOAD_CHUNK_SIZE
+) -> StagedUpload:
+    """
+    Write an uploaded file to a temporary file in directory in one pass.
+    
+    The file is hashed and its type sniffed from the first chunk while it is
+    written, and writing stops as soon as it is too large or of a type that is
+    not allowed. The caller moves the file into place (a rename within
+    directory) or deletes it.
     
     Args:
         upload_file: FastAPI UploadFile object
-        destination: Path where to save the file
+        directory: Directory for the temporary file
+        max_size: Maximum size in bytes. Defaults to settings.MAX_UPLOAD_SIZE.
+        allowed_types: Accepted MIME types, checked against the sniffed type
+        chunk_size: Bytes read and written at a time
+        
+    Returns:
+        StagedUpload: The temporary file with its SHA-256, size and sniffed type
+        
+    Raises:
+        UploadTooLargeError: If the file is larger than max_size
+        UnsupportedFileTypeError: If the sniffed type is not in allowed_types
     """
+    max_size = settings.MAX_UPLOAD_SIZE if max_size is None else max_size
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f".upload-{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    size = 0
+    content_type = None
+    
     try:
-        with open(destination, "wb") as buffer:
+        async with aiofiles.open(path, "wb") as buffer:
             while True:
-                chunk = await upload_file.read(1024 * 1024)  # 1MB chunks
+                chunk = await upload_file.read(chunk_size)
                 if not chunk:
                     break
-                buffer.write(chunk)
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadTooLargeError(f"File is larger than the {format_size(max_size)} limit")
+                if content_type is None:
+                    content_type = sniff_content_type(chunk, upload_file.content_type)
+                    if allowed_types is not None and content_type not in allowed_types:
+                        raise UnsupportedFileTypeError(f"File type {content_type} not supported")
+                digest.update(chunk)
+                await buffer.write(chunk)
+    except BaseException:
+        cleanup_file(path)
+        raise
+    
+    if content_type is None:
+        cleanup_file(path)
+        raise UnsupportedFileTypeError("The uploaded file is empty")
+    return StagedUpload(path=path, sha256=digest.hexdigest(), size=size, content_type=content_type)
+
+
+async def save_upload_file(upload_file, destination: Union[str, Path], max_size: Optional[int] = None) -> None:
+    """
+    Save an uploaded file to the specified destination.
+    
+    Args:
+        upload_file: FastAPI UploadFile object
+        destination: Path where to save the file
+        max_size: Maximum size in bytes. Defaults to settings.MAX_UPLOAD_SIZE.
+        
+    Raises:
+        UploadTooLargeError: If the file is larger than max_size
+    """
+    destination = Path(destination)
+    try:
+        staged = await stream_upload_file(upload_file, destination.parent, max_size)
+        os.replace(staged.path, destination)
     except Exception as e:
         logger.error(f"Error saving uploaded file: {e}")
         raise
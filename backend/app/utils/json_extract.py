@@ -0,0 +1,278 @@
+"""
+Tolerant JSON extraction for LLM responses.
+
+Models wrap JSON in markdown fences, surround it with prose, leave trailing
+commas or ``# comments``, put raw newlines inside strings, and get cut off
+by max_tokens halfway through an object. extract_json recovers the first JSON
+object or array from such text in a single linear pass: it copies the JSON
+while fixing those problems on the fly and, if the input ends early, closes
+any open strings and containers. It never backtracks, so the cost stays
+proportional to the response size even for large or malformed responses.
+"""
+import re
+import json
+from typing import Any, Dict, List, Optional
+
+_VALID_ESCAPES = set('"\\/bfnrtu')
+_LITERALS = ("true", "false", "null")
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?")
+_SCALAR_CHARS = set("0123456789+-.eEtrufalsn")
+# Runs that can be copied unchanged: ordinary string content, and whitespace between tokens
+_STRING_RUN = re.compile(r'[^"\\\x00-\x1f]+')
+_WHITESPACE_RUN = re.compile(r"[ \t\r\n]+")
+
+# Frame states: what the container expects next
+_KEY, _COLON, _VALUE, _COMMA = "key", "colon", "value", "comma"
+
+# How many candidate start positions to try before giving up
+MAX_CANDIDATES = 4
+
+
+class JSONExtractionError(ValueError):
+    """Raised when no JSON value can be recovered from the text."""
+
+
+def _find_start(text: str, begin: int) -> int:
+    """Position of the first '{' or '[' at or after begin, or -1."""
+    brace = text.find("{", begin)
+    bracket = text.find("[", begin)
+    if brace == -1:
+        return bracket
+    if bracket == -1:
+        return brace
+    return min(brace, bracket)
+
+
+def _complete_scalar(token: str) -> Optional[str]:
+    """Complete or validate a scalar cut off at the end of the input."""
+    if _NUMBER.fullmatch(token):
+        return token
+    for literal in _LITERALS:
+        if literal.startswith(token):
+            return literal
+    number = _NUMBER.match(token)
+    return number.group(0) if number else None
+
+
+def _repair(text: str, start: int) -> str:
+    """
+    Copy one JSON value starting at text[start], repairing it as it goes.
+
+    Returns the repaired JSON text. Stops at the end of the first complete
+    top-level value; closes whatever is still open if the input ends first.
+    """
+    out: List[str] = []
+    stack: List[List[str]] = []  # [container char, state]
+    in_string = False
+    string_is_key = False
+    scalar_start = -1
+    i = start
+    n = len(text)
+
+    def value_done() -> None:
+        if stack:
+            stack[-1][1] = _COMMA
+
+    def end_scalar() -> None:
+        nonlocal scalar_start
+        if scalar_start >= 0:
+            token = "".join(out[scalar_start:])
+            completed = _complete_scalar(token)
+            del out[scalar_start:]
+            out.append(completed if completed is not None else "null")
+            scalar_start = -1
+
+    def before_value() -> None:
+        # Missing commas between values and missing colons after keys are inserted
+        frame = stack[-1] if stack else None
+        if frame and frame[1] == _COMMA:
+            out.append(",")
+            frame[1] = _KEY if frame[0] == "{" else _VALUE
+        elif frame and frame[1] == _COLON:
+            out.append(":")
+            frame[1] = _VALUE
+
+    while i < n:
+        ch = text[i]
+
+        if in_string:
+            run = _STRING_RUN.match(text, i)
+            if run:
+                out.append(run.group(0))
+                i = run.end()
+                continue
+            if ch == "\\":
+                nxt = text[i + 1] if i + 1 < n else ""
+                if nxt in _VALID_ESCAPES and nxt:
+                    out.append(ch)
+                    out.append(nxt)
+                    i += 2
+                    continue
+                if not nxt:
+                    break
+                # Invalid escape such as \' : drop the backslash, keep the character
+                i += 1
+                continue
+            if ch == '"':
+                in_string = False
+                out.append(ch)
+                if stack:
+                    stack[-1][1] = _COLON if string_is_key else _COMMA
+                i += 1
+                if not stack:
+                    return "".join(out)
+                continue
+            if ch < " ":
+                out.append({"\n": "\\n", "\r": "\\r", "\t": "\\t"}.get(ch, f"\\u{ord(ch):04x}"))
+            else:
+                out.append(ch)
+            i += 1
+            continue
+
+        if scalar_start >= 0 and ch in _SCALAR_CHARS:
+            out.append(ch)
+            i += 1
+            continue
+        end_scalar()
+
+        if ch in " \t\r\n":
+            i = _WHITESPACE_RUN.match(text, i).end()
+            continue
+
+        if ch == '"':
+            frame = stack[-1] if stack else None
+            before_value()
+            string_is_key = bool(frame and frame[0] == "{" and frame[1] == _KEY)
+            in_string = True
+            out.append(ch)
+        elif ch in "{[":
+            before_value()
+            out.append(ch)
+            stack.append([ch, _KEY if ch == "{" else _VALUE])
+        elif ch in "}]":
+            if not stack:
+                break
+            # Drop a trailing comma, and a dangling key or colon, before closing
+            while out and out[-1] in ", \n":
+                out.pop()
+            frame = stack.pop()
+            if frame[0] == "{" and frame[1] == _COLON:
+                out.append(":null")
+            elif frame[0] == "{" and frame[1] == _VALUE and out and out[-1] == ":":
+                out.append("null")
+            out.append("}" if frame[0] == "{" else "]")
+            value_done()
+            if not stack:
+                return "".join(out)
+        elif ch == ":":
+            if stack and stack[-1][1] == _COLON:
+                out.append(ch)
+                stack[-1][1] = _VALUE
+        elif ch == ",":
+            if stack and stack[-1][1] == _COMMA:
+                out.append(ch)
+                stack[-1][1] = _KEY if stack[-1][0] == "{" else _VALUE
+        elif ch == "#" or text.startswith("//", i):
+            # Comments copied from prompt examples run to the end of the line
+            newline = text.find("\n", i)
+            i = n if newline == -1 else newline
+            continue
+        elif ch in _SCALAR_CHARS and stack and stack[-1][1] in (_COLON, _VALUE, _COMMA):
+            before_value()
+            scalar_start = len(out)
+            out.append(ch)
+            value_done()
+        # Anything else outside a string (stray prose, backticks) is dropped
+        i += 1
+
+    # Input ended before the value was complete: close everything still open
+    end_scalar()
+    if in_string:
+        out.append('"')
+        if stack:
+            stack[-1][1] = _COLON if string_is_key else _COMMA
+    while stack:
+        while out and out[-1] == ",":
+            out.pop()
+        frame = stack.pop()
+        if frame[0] == "{" and frame[1] == _COLON:
+            out.append(":null")
+        elif frame[0] == "{" and out and out[-1] == ":":
+            out.append("null")
+        out.append("}" if frame[0] == "{" else "]")
+        value_done()
+    return "".join(out)
+
+
+def extract_json(text: str) -> Any:
+    """
+    Extract the first JSON object or array from an LLM response.
+
+    Handles markdown code fences, surrounding prose, trailing commas, missing
+    commas, ``#``/``//`` comments, raw control characters and invalid escapes in
+    strings, and output truncated mid-value.
+
+    Args:
+        text: Raw completion text
+
+    Returns:
+        The parsed JSON value (dict or list)
+
+    Raises:
+        JSONExtractionError: If no JSON value can be recovered
+    """
+    if not isinstance(text, str) or not text:
+        raise JSONExtractionError("Empty response")
+
+    stripped = text.strip()
+    if stripped[:1] in "{[":
+        try:
+            return json.loads(stripped)
+        except json.JSONDecodeError:
+            pass
+
+    # Prefer content inside a code fence when there is one
+    fence = text.find("```")
+    begin = fence + 3 if fence != -1 else 0
+    start = _find_start(text, begin)
+    if start == -1 and fence != -1:
+        start = _find_start(text, 0)
+
+    last_error: Optional[Exception] = None
+    empty: Any = None
+    for _ in range(MAX_CANDIDATES):
+        if start == -1:
+            break
+        candidate = _repair(text, start)
+        try:
+            value = json.loads(candidate)
+            if value:
+                return value
+            # Braces in surrounding prose repair to {} or []; keep looking for real content
+            empty = value if empty is None else empty
+        except json.JSONDecodeError as e:
+            last_error = e
+        start = _find_start(text, start + 1)
+
+    if empty is not None:
+        return empty
+    raise JSONExtractionError(f"Could not extract JSON from response: {last_error or 'no JSON found'}")
+
+
+def extract_json_object(text: str) -> Dict[str, Any]:
+    """
+    Extract a JSON object from an LLM response.
+
+    Args:
+        text: Raw completion text
+
+    Returns:
+        Dict[str, Any]: The parsed object
+
+    Raises:
+        JSONExtractionError: If no JSON object can be recovered
+    """
+    value = extract_json(text)
+    if not isinstance(value, dict):
+        raise JSONExtractionError(f"Expected a JSON object, got {type(value).__name__}")
+    return value
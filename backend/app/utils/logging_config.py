@@ -0,0 +1,172 @@
+"""
+Non-blocking logging setup for PortfolioAI.
+
+Log records are put on an in-memory queue by a QueueHandler on the root logger
+and written to the console and a rotating file by a QueueListener thread, so
+request handlers never block on disk or terminal I/O. If the queue fills up,
+records are dropped and counted instead of stalling the caller.
+
+High-volume LLM payload logging goes through the ``PAYLOAD_LOGGER`` logger,
+which is sampled, and should only ever be given prompt digests (see
+prompt_digest) rather than full prompts.
+"""
+import os
+import sys
+import json
+import queue
+import atexit
+import random
+import hashlib
+import logging
+import logging.handlers
+from typing import Any, Dict, Optional
+
+# Logger used for sampled LLM request/response payload digests
+PAYLOAD_LOGGER = "app.llm.payload"
+
+# Attributes present on every LogRecord; anything else was passed via `extra`
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional["DroppingQueueHandler"] = None
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records when the queue is full instead of blocking or erroring."""
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]"):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class SamplingFilter(logging.Filter):
+    """Passes a random fraction of records below WARNING; warnings and errors always pass."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = max(0.0, min(1.0, rate))
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        return self.rate >= 1.0 or random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, including fields passed via `extra`."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def prompt_digest(text: Optional[str], limit: int = 200) -> str:
+    """
+    Summarize a prompt or response for logging without writing it in full.
+
+    Args:
+        text: The prompt or response text
+        limit: Maximum number of characters of the text to include
+
+    Returns:
+        str: Short hash, length and a whitespace-collapsed, truncated preview
+    """
+    if not text:
+        return "sha1=- len=0"
+    digest = hashlib.sha1(text.encode("utf-8", "replace")).hexdigest()[:12]
+    preview = " ".join(text[:limit * 2].split())[:limit]
+    suffix = "..." if len(text) > len(preview) else ""
+    return f"sha1={digest} len={len(text)} preview={preview!r}{suffix}"
+
+
+def setup_logging(
+    level: Optional[str] = None,
+    log_file: Optional[str] = None,
+    queue_size: Optional[int] = None
+) -> None:
+    """
+    Route all logging through a bounded queue and a background listener.
+
+    Replaces any handlers already installed on the root logger (e.g. by
+    module-level basicConfig calls). Safe to call more than once.
+
+    Args:
+        level: Root log level. Defaults to LOG_LEVEL or INFO.
+        log_file: Rotating log file path. Defaults to LOG_FILE or 'app.log'; empty disables it.
+        queue_size: Maximum queued records. Defaults to LOG_QUEUE_SIZE or 10000.
+    """
+    global _listener, _queue_handler
+
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    log_file = os.getenv("LOG_FILE", "app.log") if log_file is None else log_file
+    queue_size = queue_size or int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+    stop_logging()
+
+    console = logging.StreamHandler(sys.stderr)
+    console.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    handlers = [console]
+    if log_file:
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=int(os.getenv("LOG_FILE_MAX_BYTES", str(10 * 1024 * 1024))),
+            backupCount=int(os.getenv("LOG_FILE_BACKUP_COUNT", "5")),
+            encoding="utf-8"
+        )
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=queue_size)
+    _queue_handler = DroppingQueueHandler(log_queue)
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+
+    payload_logger = logging.getLogger(PAYLOAD_LOGGER)
+    for existing in list(payload_logger.filters):
+        payload_logger.removeFilter(existing)
+    payload_logger.addFilter(SamplingFilter(float(os.getenv("LLM_LOG_SAMPLE_RATE", "0.05"))))
+
+    # The Groq SDK logs full request options at DEBUG and HTTP clients log every
+    # request; keep them at INFO so prompts only reach the log as digests
+    for name in ("groq", "httpx", "httpcore", "hpack"):
+        logging.getLogger(name).setLevel(max(logging.INFO, root.level))
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the background listener, if running."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def dropped_records() -> int:
+    """Number of log records dropped because the queue was full."""
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,27 @@
+"""
+Multiprocessing context for the worker process pools.
+
+Pools are started with forkserver (spawn where unavailable) instead of fork,
+so workers do not inherit the server's threads or event loop. All pools share
+one fork server, which imports the modules registered with
+preload_in_workers when it starts; workers forked from it then start with
+those modules (and their heavy dependencies) already loaded.
+"""
+import multiprocessing
+from typing import Set
+
+_preload_modules: Set[str] = set()
+
+
+def preload_in_workers(module_name: str) -> None:
+    """Have the fork server import a module; call at import time, before any pool starts."""
+    _preload_modules.add(module_name)
+
+
+def worker_context() -> multiprocessing.context.BaseContext:
+    """Get the multiprocessing context for a worker pool."""
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    context = multiprocessing.get_context(method)
+    if method == "forkserver":
+        context.set_forkserver_preload(sorted(_preload_modules))
+    return context
@@ -0,0 +1,228 @@
+"""
+Batched ATS keyword scoring.
+
+Scores resumes against job descriptions with the same rule as
+scoring_rules.calculate_ats_score: the share of job keyword occurrences
+covered by occurrences of those keywords in the resume, capped at 100.
+
+Texts are tokenized once and every keyword occurrence is mapped to an id in
+a shared Vocabulary, giving flat NumPy arrays of (document, term) pairs.
+Scoring one job description against thousands of resumes, one resume
+against thousands of jobs, or thousands of aligned pairs is then a handful of
+array operations (bincount and boolean presence tables) rather than a Python loop per
+keyword per pair. Batches are processed in chunks of CHUNK_SIZE documents to
+bound memory.
+
+BatchScorer ranks resumes with score_keywords_against_resumes and only builds
+the matched/missing keyword details for the resumes it returns.
+"""
+import logging
+from itertools import chain, repeat
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from .scoring_rules import calculate_ats_score, calculate_keyword_match, extract_keywords, tokenize_keywords
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+    logging.warning("numpy not available, batch ATS scoring will score pairs one at a time")
+
+logger = logging.getLogger(__name__)
+
+
+class Vocabulary:
+    """Maps keywords to dense integer ids shared by all encoded documents."""
+
+    def __init__(self, terms: Iterable[str] = ()):
+        self._index: Dict[str, int] = {}
+        for term in terms:
+            self.add(term)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def add(self, term: str) -> int:
+        """Get the id of a term, assigning the next id if it is new."""
+        index = self._index.get(term)
+        if index is None:
+            index = self._index[term] = len(self._index)
+        return index
+
+    def get(self, term: str) -> Optional[int]:
+        """Get the id of a term, or None if it is not in the vocabulary."""
+        return self._index.get(term)
+
+    def ids(self, terms: Sequence[str], missing: int = -1) -> "np.ndarray":
+        """Map terms to their ids, using missing for terms not in the vocabulary."""
+        return np.fromiter(map(self._index.get, terms, repeat(missing)), dtype=np.int64, count=len(terms))
+
+
+# Documents encoded per chunk; bounds the size of the token arrays and presence tables
+CHUNK_SIZE = 1024
+
+
+class TokenBatch:
+    """
+    Keyword occurrences of a batch of documents as flat arrays.
+
+    Occurrence i is term term_ids[i] in document doc_ids[i]; term_ids is -1
+    for words not in the vocabulary. lengths holds each document's total
+    number of keywords, known or not.
+    """
+
+    def __init__(self, doc_ids: "np.ndarray", term_ids: "np.ndarray", lengths: "np.ndarray"):
+        self.doc_ids = doc_ids
+        self.term_ids = term_ids
+        self.lengths = lengths
+
+    @property
+    def n_docs(self) -> int:
+        return len(self.lengths)
+
+    @classmethod
+    def encode(cls, texts: Sequence[str], vocabulary: Vocabulary, grow: bool = True) -> "TokenBatch":
+        """
+        Tokenize a batch of texts and map every keyword to its vocabulary id.
+
+        Args:
+            texts: Documents to encode
+            vocabulary: Vocabulary assigning term ids
+            grow: Add unseen terms to the vocabulary; if False they get id -1
+
+        Returns:
+            TokenBatch: The encoded batch
+        """
+        token_lists = [tokenize_keywords(text) for text in texts]
+        lengths = np.fromiter(map(len, token_lists), dtype=np.int64, count=len(token_lists))
+        tokens = list(chain.from_iterable(token_lists))
+        if grow:
+            for term in dict.fromkeys(tokens):
+                vocabulary.add(term)
+        term_ids = vocabulary.ids(tokens)
+        doc_ids = np.repeat(np.arange(len(token_lists), dtype=np.int64), lengths)
+        return cls(doc_ids, term_ids, lengths)
+
+    def known(self) -> "TokenBatch":
+        """The same batch without occurrences of unknown words."""
+        mask = self.term_ids >= 0
+        return TokenBatch(self.doc_ids[mask], self.term_ids[mask], self.lengths)
+
+    def presence(self, width: int) -> "np.ndarray":
+        """Boolean (document, term) table marking which known terms each document uses."""
+        table = np.zeros((self.n_docs, max(width, 1)), dtype=bool)
+        known = self.known()
+        table[known.doc_ids, known.term_ids] = True
+        return table
+
+
+def _to_scores(matched: "np.ndarray", totals: "np.ndarray") -> "np.ndarray":
+    scores = np.zeros(len(totals), dtype=np.float64)
+    np.divide(matched * 100.0, totals, out=scores, where=totals > 0)
+    return np.minimum(scores, 100.0)
+
+
+def _chunks(count: int) -> Iterable[slice]:
+    for start in range(0, count, CHUNK_SIZE):
+        yield slice(start, min(start + CHUNK_SIZE, count))
+
+
+class ATSScoringEngine:
+    """Scores many resume/job description combinations in batched operations."""
+
+    def score_job_against_resumes(self, job_description: str, resumes: Sequence[str]) -> List[float]:
+        """
+        Score one job description against many resumes.
+
+        Args:
+            job_description: Job description text
+            resumes: Resume texts
+
+        Returns:
+            List[float]: ATS score for each resume, in order
+        """
+        return self.score_keywords_against_resumes(extract_keywords(job_description), resumes)
+
+    def score_keywords_against_resumes(self, job_keywords: Dict[str, int], resumes: Sequence[str]) -> List[float]:
+        """
+        Score many resumes against a job description's extracted keywords.
+
+        Args:
+            job_keywords: Keyword frequencies of the job description, from extract_keywords
+            resumes: Resume texts
+
+        Returns:
+            List[float]: ATS score for each resume, in order, as calculate_keyword_match computes it
+        """
+        if not NUMPY_AVAILABLE:
+            return [calculate_keyword_match(resume, job_keywords)[0] for resume in resumes]
+        vocabulary = Vocabulary(job_keywords)
+        totals = np.full(CHUNK_SIZE, float(sum(job_keywords.values())))
+        scores: List[float] = []
+        for chunk in _chunks(len(resumes)):
+            # Every known resume occurrence is of a job term, so each one counts
+            batch = TokenBatch.encode(resumes[chunk], vocabulary, grow=False).known()
+            matched = np.bincount(batch.doc_ids, minlength=batch.n_docs)
+            scores.extend(_to_scores(matched, totals[:batch.n_docs]).tolist())
+        return scores
+
+    def score_resume_against_jobs(self, resume_text: str, job_descriptions: Sequence[str]) -> List[float]:
+        """
+        Score one resume against many job descriptions.
+
+        Args:
+            resume_text: Resume text
+            job_descriptions: Job description texts
+
+        Returns:
+            List[float]: ATS score for each job description, in order
+        """
+        if not NUMPY_AVAILABLE:
+            return [calculate_ats_score(resume_text, job)[0] for job in job_descriptions]
+        vocabulary = Vocabulary()
+        resume = TokenBatch.encode([resume_text], vocabulary)
+        resume_counts = np.bincount(resume.term_ids, minlength=len(vocabulary)).astype(np.float64)
+        scores: List[float] = []
+        for chunk in _chunks(len(job_descriptions)):
+            # Only resume terms matter, so job words outside them are dropped
+            jobs = TokenBatch.encode(job_descriptions[chunk], vocabulary, grow=False)
+            # For each job, sum the resume's counts of the distinct terms it uses
+            doc_ids, term_ids = np.nonzero(jobs.presence(len(vocabulary)))
+            matched = np.bincount(doc_ids, weights=resume_counts[term_ids], minlength=jobs.n_docs)
+            scores.extend(_to_scores(matched, jobs.lengths).tolist())
+        return scores
+
+    def score_pairs(self, resumes: Sequence[str], job_descriptions: Sequence[str]) -> List[float]:
+        """
+        Score aligned (resume, job description) pairs.
+
+        Args:
+            resumes: Resume texts
+            job_descriptions: Job description texts, one per resume
+
+        Returns:
+            List[float]: ATS score for each pair, in order
+
+        Raises:
+            ValueError: If the sequences differ in length
+        """
+        if len(resumes) != len(job_descriptions):
+            raise ValueError("resumes and job_descriptions must have the same length")
+        if not NUMPY_AVAILABLE:
+            return [calculate_ats_score(resume, job)[0] for resume, job in zip(resumes, job_descriptions)]
+        scores: List[float] = []
+        for chunk in _chunks(len(resumes)):
+            vocabulary = Vocabulary()
+            jobs = TokenBatch.encode(job_descriptions[chunk], vocabulary)
+            batch = TokenBatch.encode(resumes[chunk], vocabulary, grow=False).known()
+            # A resume occurrence counts if its own job uses the term
+            hits = jobs.presence(len(vocabulary))[batch.doc_ids, batch.term_ids]
+            matched = np.bincount(batch.doc_ids[hits], minlength=batch.n_docs)
+            scores.extend(_to_scores(matched, jobs.lengths).tolist())
+        return scores
+
+
+# Shared engine instance
+ats_scoring_engine = ATSScoringEngine()
@@ -3,13 +3,52 @@ Scoring rules for resume optimization and ATS scoring.
 """
 from typing import Dict, List, Tuple
 import re
-from collections import defaultdict
 import logging
 
+from .text_analyzer import TextAnalyzer
+from .skill_taxonomy import skill_taxonomy
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_CONTACT_PATTERNS = [
+    re.compile(r'\b(phone|mobile|tel|email|e-mail|linkedin|github)\b', re.IGNORECASE),
+    re.compile(r'\b@\w+(\.\w+)+\.\w+\b', re.IGNORECASE),  # Email pattern
+    re.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b')  # Phone number pattern
+]
+
+_SECTION_PATTERNS = [
+    (re.compile(r'\b(experience|work\s*history|employment)\b', re.IGNORECASE), "Work Experience"),
+    (re.compile(r'\b(education|academic|degrees?)\b', re.IGNORECASE), "Education"),
+    (re.compile(r'\b(skills|technical\s*skills|programming\s*languages?)\b', re.IGNORECASE), "Skills"),
+    (re.compile(r'\b(projects|portfolio)\b', re.IGNORECASE), "Projects"),
+]
+
+_WEAK_VERBS = ['helped', 'tried', 'hoped', 'wanted', 'needed', 'worked on']
+_STRONG_VERBS = [
+    'achieved', 'managed', 'created', 'designed', 'developed', 
+    'implemented', 'improved', 'increased', 'led', 'optimized'
+]
+
+# Keyword analyzer for all ATS scoring; taxonomy skills count as terms of their own
+default_analyzer = TextAnalyzer(skill_taxonomy=skill_taxonomy)
+
+def tokenize_keywords(text: str) -> List[str]:
+    """Split text into keyword terms (see text_analyzer.TextAnalyzer).
+    
+    Words shorter than three characters and stopwords are ignored, plurals are
+    reduced to their singular and skills from the skill taxonomy (multi-word
+    names, aliases, short names like "C++") are added as extra terms.
+    
+    Args:
+        text: Input text to tokenize
+        
+    Returns:
+        List of keyword terms
+    """
+    return default_analyzer.terms(text)
+
 def extract_keywords(text: str) -> Dict[str, int]:
     """Extract keywords and their frequencies from text.
     
@@ -19,13 +58,7 @@ def extract_keywords(text: str) -> Dict[str, int]:
     Returns:
         Dictionary of keywords and their frequencies
     """
-    # Simple word frequency counter (can be enhanced with NLP techniques)
-    words = re.findall(r'\b\w+\b', text.lower())
-    word_freq = defaultdict(int)
-    for word in words:
-        if len(word) > 2:  # Ignore very short words
-            word_freq[word] += 1
-    return dict(word_freq)
+    return default_analyzer.extract_keywords(text)
 
 def calculate_ats_score(resume_text: str, job_description: str) -> Tuple[float, Dict]:
     """Calculate ATS score for a resume based on job description.
@@ -34,34 +67,41 @@ def calculate_ats_score(resume_text: str, job_description: str) -> Tuple[float,
         resume_text: Text content of the resume
         job_description: Job description text
         
+    Returns:
+        Tuple of (score, details) where details contains match information
+    """
+    return calculate_keyword_match(resume_text, extract_keywords(job_description))
+
+def calculate_keyword_match(resume_text: str, job_keywords: Dict[str, int]) -> Tuple[float, Dict]:
+    """Calculate ATS score for a resume against pre-extracted job keywords.
+    
+    Lets callers scoring many resumes against one job extract its keywords once.
+    
+    Args:
+        resume_text: Text content of the resume
+        job_keywords: Keyword frequencies of the job description, from extract_keywords
+        
     Returns:
         Tuple of (score, details) where details contains match information
     """
     try:
-        # Extract keywords from resume and job description
         resume_keywords = extract_keywords(resume_text)
-        job_keywords = extract_keywords(job_description)
         
         # Calculate match score (simple implementation)
         total_keywords = sum(job_keywords.values())
         if total_keywords == 0:
             return 0.0, {"matches": {}, "missing_keywords": [], "total_keywords": 0}
             
-        matched_keywords = {}
-        missing_keywords = []
-        
-        # Check for matches
-        for keyword, count in job_keywords.items():
-            if keyword in resume_keywords:
-                matched_keywords[keyword] = {
-                    'count': resume_keywords[keyword],
-                    'expected': count
-                }
-            else:
-                missing_keywords.append(keyword)
+        # Check for matches; job keyword order is kept for display
+        matched = job_keywords.keys() & resume_keywords.keys()
+        matched_keywords = {
+            keyword: {'count': resume_keywords[keyword], 'expected': count}
+            for keyword, count in job_keywords.items() if keyword in matched
+        }
+        missing_keywords = [keyword for keyword in job_keywords if keyword not in matched]
         
         # Calculate score (percentage of keywords matched)
-        matched_count = sum(v['count'] for v in matched_keywords.values())
+        matched_count = sum(resume_keywords[keyword] for keyword in matched)
         score = min(100.0, (matched_count / total_keywords) * 100)
         
         return score, {
@@ -87,38 +127,19 @@ def get_optimization_suggestions(resume_text: str, job_description: str) -> List
     suggestions = []
     
     # Check for missing contact information
-    contact_patterns = [
-        r'\b(phone|mobile|tel|email|e-mail|linkedin|github)\b',
-        r'\b@\w+(\.\w+)+\.\w+\b',  # Email pattern
-        r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'  # Phone number pattern
-    ]
-    
-    has_contact = any(re.search(pattern, resume_text, re.IGNORECASE) 
-                      for pattern in contact_patterns)
+    has_contact = any(pattern.search(resume_text) for pattern in _CONTACT_PATTERNS)
     if not has_contact:
         suggestions.append("Add contact information (phone, email, LinkedIn)")
     
     # Check for key sections
-    sections = [
-        (r'\b(experience|work\s*history|employment)\b', "Work Experience"),
-        (r'\b(education|academic|degrees?)\b', "Education"),
-        (r'\b(skills|technical\s*skills|programming\s*languages?)\b', "Skills"),
-        (r'\b(projects|portfolio)\b', "Projects"),
-    ]
-    
-    for pattern, section_name in sections:
-        if not re.search(pattern, resume_text, re.IGNORECASE):
+    for pattern, section_name in _SECTION_PATTERNS:
+        if not pattern.search(resume_text):
             suggestions.append(f"Consider adding a '{section_name}' section")
     
     # Check for action verbs (weak vs strong)
-    weak_verbs = ['helped', 'tried', 'hoped', 'wanted', 'needed', 'worked on']
-    strong_verbs = [
-        'achieved', 'managed', 'created', 'designed', 'developed', 
-        'implemented', 'improved', 'increased', 'led', 'optimized'
-    ]
-    
-    found_weak = any(verb in resume_text.lower() for verb in weak_verbs)
-    found_strong = any(verb in resume_text.lower() for verb in strong_verbs)
+    lowered = resume_text.lower()
+    found_weak = any(verb in lowered for verb in _WEAK_VERBS)
+    found_strong = any(verb in lowered for verb in _STRONG_VERBS)
     
     if found_weak and not found_strong:
         suggestions.append("Use more action verbs to describe your experience")
@@ -135,8 +156,20 @@ def score_resume(resume_text: str, job_description: str) -> Dict:
     Returns:
         Dictionary containing score and optimization suggestions
     """
-    score, details = calculate_ats_score(resume_text, job_description)
-    suggestions = get_optimization_suggestions(resume_text, job_description)
+    return score_resume_for_keywords(resume_text, extract_keywords(job_description))
+
+def score_resume_for_keywords(resume_text: str, job_keywords: Dict[str, int]) -> Dict:
+    """Score a resume against pre-extracted job keywords.
+    
+    Args:
+        resume_text: Text content of the resume
+        job_keywords: Keyword frequencies of the job description, from extract_keywords
+        
+    Returns:
+        Dictionary containing score and optimization suggestions, as score_resume
+    """
+    score, details = calculate_keyword_match(resume_text, job_keywords)
+    suggestions = get_optimization_suggestions(resume_text, "")
     
     return {
         'score': round(score, 1),
@@ -0,0 +1,361 @@
+"""
+Local text embeddings and a compact cosine-similarity vector index.
+
+Everything here runs on the CPU without network access:
+
+- HashingEmbedder maps text to a fixed-size vector with the hashing trick.
+  Features are the keyword terms of text_analyzer (stopwords removed, plurals
+  folded, taxonomy skills resolved to canonical names) plus character
+  trigrams of each term, so "developer" and "development" or "k8s" and
+  "Kubernetes" land close together. Terms are weighted by sublinear term
+  frequency. Each term's hashed features are computed once and kept in a
+  table, so embedding a batch is a couple of NumPy gathers and one bincount.
+- SentenceTransformerEmbedder wraps a sentence-transformers model loaded from
+  a local directory, for real semantic similarity when one is installed.
+- VectorIndex stores L2-normalized vectors as float32 or int8 (4x smaller,
+  with a per-row scale) and answers cosine top-k queries with one matrix
+  product, optionally restricted to one owner's vectors.
+"""
+import os
+import zlib
+import math
+import logging
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .text_analyzer import TextAnalyzer
+from .scoring_rules import default_analyzer
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+    logging.warning("numpy not available, semantic scoring and search are disabled")
+
+logger = logging.getLogger(__name__)
+
+# Hashed features per term: the term itself plus up to this many character trigrams
+MAX_TRIGRAMS = 12
+# Terms whose features are kept before the table is reset
+MAX_TABLE_TERMS = 100_000
+
+
+def _signed_bucket(feature: str, dim: int) -> Tuple[int, float]:
+    """Stable (bucket, sign) for a feature; crc32 is the same in every process."""
+    digest = zlib.crc32(feature.encode("utf-8"))
+    return digest % dim, (1.0 if digest >> 31 else -1.0)
+
+
+def _normalize_rows(matrix: "np.ndarray") -> "np.ndarray":
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+class HashingEmbedder:
+    """Hashing-trick embeddings of keyword terms and their character trigrams."""
+
+    name = "hashing"
+
+    def __init__(self, dim: int = 1024, analyzer: Optional[TextAnalyzer] = None):
+        """
+        Initialize the embedder.
+
+        Args:
+            dim: Vector size
+            analyzer: Keyword analyzer producing the terms. Defaults to scoring_rules' analyzer.
+        """
+        self.dim = dim
+        self.analyzer = analyzer or default_analyzer
+        self._lock = threading.Lock()
+        self._reset_table()
+
+    def _reset_table(self) -> None:
+        width = MAX_TRIGRAMS + 1
+        self._term_ids: Dict[str, int] = {}
+        self._buckets = np.zeros((1024, width), dtype=np.int32)
+        self._weights = np.zeros((1024, width), dtype=np.float32)
+
+    def _add_term(self, term: str) -> int:
+        """Hash a new term's features into the table; called with the lock held."""
+        term_id = len(self._term_ids)
+        if term_id >= len(self._buckets):
+            self._buckets = np.concatenate([self._buckets, np.zeros_like(self._buckets)])
+            self._weights = np.concatenate([self._weights, np.zeros_like(self._weights)])
+        padded = f"<{term}>"
+        trigrams = [padded[i:i + 3] for i in range(len(padded) - 2)][:MAX_TRIGRAMS]
+        # The whole term counts as much as all of its trigrams together
+        features = [(term, 1.0)] + [("#" + gram, 1.0 / len(trigrams)) for gram in trigrams]
+        for column, (feature, weight) in enumerate(features):
+            bucket, sign = _signed_bucket(feature, self.dim)
+            self._buckets[term_id, column] = bucket
+            self._weights[term_id, column] = sign * weight
+        self._term_ids[term] = term_id
+        return term_id
+
+    def embed(self, texts: Sequence[str]) -> "np.ndarray":
+        """
+        Embed texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            np.ndarray: (len(texts), dim) float32 matrix of L2-normalized rows
+        """
+        doc_ids: List[int] = []
+        terms: List[str] = []
+        tf_weights: List[float] = []
+        for doc_id, text in enumerate(texts):
+            counts = Counter(self.analyzer.terms(text))
+            doc_ids.extend([doc_id] * len(counts))
+            terms.extend(counts)
+            tf_weights.extend(1.0 + math.log(count) for count in counts.values())
+
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        if not terms:
+            return matrix
+        with self._lock:
+            if len(self._term_ids) + len(terms) > MAX_TABLE_TERMS:
+                self._reset_table()
+            term_ids = self._term_ids
+            ids = np.fromiter(
+                (term_ids[term] if term in term_ids else self._add_term(term) for term in terms),
+                dtype=np.int64,
+                count=len(terms)
+            )
+            buckets = self._buckets[ids]
+            weights = self._weights[ids]
+        # Offset each document's buckets into its own row of the flattened matrix
+        buckets = buckets + (np.array(doc_ids, dtype=np.int64) * self.dim)[:, None]
+        weights = weights * np.array(tf_weights, dtype=np.float32)[:, None]
+        matrix += np.bincount(buckets.ravel(), weights=weights.ravel(), minlength=matrix.size).reshape(matrix.shape)
+        return _normalize_rows(matrix)
+
+
+class SentenceTransformerEmbedder:
+    """Embeddings from a sentence-transformers model in a local directory."""
+
+    name = "sentence-transformers"
+
+    def __init__(self, model_path: str, batch_size: int = 32):
+        """
+        Load the model. Never downloads: the path must be a local model directory.
+
+        Args:
+            model_path: Directory containing the model
+            batch_size: Texts encoded per forward pass
+
+        Raises:
+            FileNotFoundError: If model_path is not a directory
+            ImportError: If sentence-transformers is not installed
+        """
+        if not os.path.isdir(model_path):
+            raise FileNotFoundError(f"Embedding model directory not found: {model_path}")
+        os.environ.setdefault("HF_HUB_OFFLINE", "1")
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_path, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.batch_size = batch_size
+
+    def embed(self, texts: Sequence[str]) -> "np.ndarray":
+        """
+        Embed texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            np.ndarray: (len(texts), dim) float32 matrix of L2-normalized rows
+        """
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        vectors = self.model.encode(
+            list(texts),
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True
+        )
+        return vectors.astype(np.float32, copy=False)
+
+
+# int8 rows converted to float32 per block in search; small enough for the copy to stay in cache
+SEARCH_BLOCK_ROWS = 256
+
+
+class VectorIndex:
+    """
+    In-memory cosine-similarity index over normalized vectors.
+
+    Each key (e.g. a resume id) owns one or more rows (e.g. its sections) and
+    an optional owner (e.g. a user id); a key's similarity to a query is that
+    of its best row. Rows are stored as float32, or as int8 with a float32
+    scale per row when quantize is set.
+    """
+
+    def __init__(self, dim: int, quantize: bool = False, capacity: int = 1024):
+        """
+        Initialize an empty index.
+
+        Args:
+            dim: Vector size
+            quantize: Store rows as int8 instead of float32
+            capacity: Initial number of rows allocated
+        """
+        self.dim = dim
+        self.quantize = quantize
+        self._vectors = np.zeros((capacity, dim), dtype=np.int8 if quantize else np.float32)
+        self._scales = np.ones(capacity, dtype=np.float32)
+        self._owners = np.full(capacity, -1, dtype=np.int64)
+        self._row_keys: List[str] = []
+        self._rows: Dict[str, List[int]] = {}
+        self._owner_codes: Dict[str, int] = {}
+        self._max_rows_per_key = 1
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        """Number of keys."""
+        return len(self._rows)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    @property
+    def row_count(self) -> int:
+        return len(self._row_keys)
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes used by stored rows (excluding spare capacity)."""
+        per_row = self._vectors.itemsize * self.dim + (self._scales.itemsize if self.quantize else 0)
+        return self.row_count * per_row
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self._vectors)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        self._vectors = np.concatenate([self._vectors, np.zeros((capacity - len(self._vectors), self.dim), dtype=self._vectors.dtype)])
+        self._scales = np.concatenate([self._scales, np.ones(capacity - len(self._scales), dtype=np.float32)])
+        self._owners = np.concatenate([self._owners, np.full(capacity - len(self._owners), -1, dtype=np.int64)])
+
+    def _encode(self, vectors: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+        if not self.quantize:
+            return vectors.astype(np.float32, copy=False), np.ones(len(vectors), dtype=np.float32)
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        quantized = np.rint(vectors / scales[:, None]).astype(np.int8)
+        return quantized, scales.astype(np.float32)
+
+    def add(self, key: str, vectors: "np.ndarray", owner: Optional[str] = None) -> None:
+        """
+        Add a key's vectors, replacing any it already has.
+
+        Args:
+            key: Key the rows belong to
+            vectors: (rows, dim) or (dim,) L2-normalized vectors
+            owner: Owner used to restrict searches, if any
+        """
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors of size {self.dim}, got {vectors.shape[1]}")
+        encoded, scales = self._encode(vectors)
+        with self._lock:
+            self.remove(key)
+            start = self.row_count
+            self._grow(start + len(vectors))
+            end = start + len(vectors)
+            self._vectors[start:end] = encoded
+            self._scales[start:end] = scales
+            self._owners[start:end] = -1 if owner is None else self._owner_codes.setdefault(owner, len(self._owner_codes))
+            self._row_keys.extend([key] * len(vectors))
+            self._rows[key] = list(range(start, end))
+            self._max_rows_per_key = max(self._max_rows_per_key, len(vectors))
+
+    def remove(self, key: str) -> bool:
+        """
+        Remove a key's vectors.
+
+        Args:
+            key: Key to remove
+
+        Returns:
+            bool: True if the key was present
+        """
+        with self._lock:
+            rows = self._rows.pop(key, None)
+            if rows is None:
+                return False
+            # Fill each hole with the current last row, highest holes first
+            for row in sorted(rows, reverse=True):
+                last = self.row_count - 1
+                if row != last:
+                    moved_key = self._row_keys[last]
+                    self._vectors[row] = self._vectors[last]
+                    self._scales[row] = self._scales[last]
+                    self._owners[row] = self._owners[last]
+                    self._row_keys[row] = moved_key
+                    moved_rows = self._rows[moved_key]
+                    moved_rows[moved_rows.index(last)] = row
+                self._row_keys.pop()
+            return True
+
+    def search(self, query: "np.ndarray", k: int = 10, owner: Optional[str] = None) -> List[Tuple[str, float]]:
+        """
+        Find the keys most similar to a query vector.
+
+        Args:
+            query: (dim,) L2-normalized query vector
+            k: Number of keys to return
+            owner: Only consider keys added with this owner
+
+        Returns:
+            List of (key, cosine similarity of its best row), best first
+        """
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        with self._lock:
+            count = self.row_count
+            if count == 0 or k <= 0:
+                return []
+            if owner is not None:
+                code = self._owner_codes.get(owner)
+                if code is None:
+                    return []
+                rows = np.flatnonzero(self._owners[:count] == code)
+                vectors, scales = self._vectors[rows], self._scales[rows]
+            else:
+                rows = None
+                vectors, scales = self._vectors[:count], self._scales[:count]
+            if self.quantize:
+                scores = np.empty(len(vectors), dtype=np.float32)
+                for start in range(0, len(vectors), SEARCH_BLOCK_ROWS):
+                    end = start + SEARCH_BLOCK_ROWS
+                    scores[start:end] = vectors[start:end].astype(np.float32) @ query
+                scores *= scales
+            else:
+                scores = vectors @ query
+            row_keys = self._row_keys[:count] if rows is None else [self._row_keys[row] for row in rows.tolist()]
+            max_rows = self._max_rows_per_key
+
+        count = len(scores)
+        if count == 0:
+            return []
+        # Enough best rows to cover k distinct keys even if each key contributes all of its rows
+        candidates = min(count, k * max_rows)
+        top = np.argpartition(-scores, candidates - 1)[:candidates] if candidates < count else np.arange(count)
+        top = top[np.argsort(-scores[top], kind="stable")]
+        results: List[Tuple[str, float]] = []
+        seen = set()
+        for row in top.tolist():
+            score = float(scores[row])
+            key = row_keys[row]
+            if key not in seen:
+                seen.add(key)
+                results.append((key, score))
+                if len(results) == k:
+                    break
+        return results
@@ -0,0 +1,250 @@
+"""
+Skill taxonomy and single-pass skill extraction.
+
+The taxonomy maps canonical skills ("Google Cloud Platform") to a category and
+a set of aliases ("gcp", "google cloud"). Every name and alias is tokenized and
+added to one token-level Aho-Corasick automaton, so extracting skills from a
+resume or job description is one pass over its tokens however large the
+taxonomy is, and multi-word skills match as readily as single words.
+
+Tokens keep the characters skills are written with ("c++", "c#", "node.js")
+and are lowercased and plural-folded with text_analyzer.lemmatize, so "REST
+APIs" matches "rest api". Forms listed under case_sensitive (e.g. "Go", "R",
+"Swift") only match with that exact capitalization, and entries with
+"match_name": false only match through their aliases (e.g. "Julia", which is
+also a first name).
+
+The bundled taxonomy is app/data/skill_taxonomy.json; set SKILL_TAXONOMY_PATH
+to load another file in the same format:
+
+    {"version": 1, "categories": {"<category>": [
+        {"name": "Go", "aliases": ["golang"], "case_sensitive": ["Go"]}, ...]}}
+"""
+import os
+import re
+import json
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .aho_corasick import AhoCorasick, leftmost_longest
+from .text_analyzer import MAX_CACHED_TOKENS, lemmatize
+
+logger = logging.getLogger(__name__)
+
+# Word characters plus the . + # skills are written with; trailing dots are dropped in _KeyCache
+_TOKEN = re.compile(r'[\w.+#]+')
+# Same tokens for ASCII text, where \w matches the same characters either way, but faster
+_TOKEN_ASCII = re.compile(r'[\w.+#]+', re.ASCII)
+
+DEFAULT_TAXONOMY_PATH = Path(__file__).resolve().parent.parent / "data" / "skill_taxonomy.json"
+
+
+@dataclass(frozen=True, eq=False)
+class Skill:
+    """A canonical skill; skills compare and hash by identity, one object per taxonomy entry."""
+    name: str
+    category: str
+    aliases: Tuple[str, ...] = ()
+
+    @property
+    def term(self) -> str:
+        """The skill as a lowercase keyword term."""
+        return self.name.lower()
+
+
+@dataclass(frozen=True, eq=False)
+class _Pattern:
+    skill: Skill
+    form: str
+    # Original tokens a case-sensitive form must match exactly
+    exact: Optional[Tuple[str, ...]] = None
+
+
+class _KeyCache(dict):
+    """Token -> automaton key (trailing dots dropped, lowercased, plural-folded) memo."""
+
+    def __missing__(self, token: str) -> str:
+        if len(self) >= MAX_CACHED_TOKENS:
+            self.clear()
+        key = self[token] = lemmatize(token.rstrip(".").lower())
+        return key
+
+
+def _exact_tokens(tokens: Sequence[str]) -> Tuple[str, ...]:
+    return tuple(token.rstrip(".") for token in tokens)
+
+
+class SkillTaxonomy:
+    """Canonical skills with aliases, compiled into an Aho-Corasick automaton."""
+
+    def __init__(self, categories: Mapping[str, Sequence[Mapping[str, Any]]]):
+        """
+        Build the taxonomy.
+
+        Args:
+            categories: Category name -> skill entries, each with "name" and optional
+                "aliases", "case_sensitive" (forms that must match exactly) and
+                "match_name" (False to match only the aliases)
+
+        Raises:
+            ValueError: If an entry has no name
+        """
+        self.skills: Dict[str, Skill] = {}
+        self._automaton: AhoCorasick[_Pattern] = AhoCorasick()
+        self._keys = _KeyCache()
+        self._forms: List[Tuple[Skill, str]] = []
+        seen = set()
+
+        for category, entries in categories.items():
+            for entry in entries:
+                name = (entry.get("name") or "").strip()
+                if not name:
+                    raise ValueError(f"Skill without a name in category '{category}'")
+                if name in self.skills:
+                    logger.debug(f"Duplicate skill '{name}' in category '{category}' ignored")
+                    continue
+                aliases = tuple(alias.strip() for alias in entry.get("aliases", ()) if alias.strip())
+                exact_forms = set(entry.get("case_sensitive", ()))
+                skill = self.skills[name] = Skill(name=name, category=category, aliases=aliases)
+
+                forms = (name,) + aliases if entry.get("match_name", True) else aliases
+                for form in forms:
+                    tokens = tuple(_TOKEN.findall(form))
+                    if not tokens:
+                        continue
+                    exact = _exact_tokens(tokens) if form in exact_forms else None
+                    key = tuple(map(self._keys.__getitem__, tokens))
+                    # The first skill to claim a form keeps it
+                    if (key, exact) in seen:
+                        logger.debug(f"Skill form '{form}' of '{name}' already taken, ignored")
+                        continue
+                    seen.add((key, exact))
+                    self._automaton.add(key, _Pattern(skill=skill, form=form, exact=exact))
+                    self._forms.append((skill, form))
+
+        self._automaton.build()
+        logger.info(f"Skill taxonomy loaded: {len(self.skills)} skills, {len(self._automaton)} patterns")
+
+    def __len__(self) -> int:
+        return len(self.skills)
+
+    @property
+    def pattern_count(self) -> int:
+        """Number of names and aliases in the automaton."""
+        return len(self._automaton)
+
+    def forms(self) -> List[Tuple[Skill, str]]:
+        """Every (skill, name or alias) the automaton matches, in taxonomy order."""
+        return list(self._forms)
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """
+        Split text into the tokens skills are matched on.
+
+        Args:
+            text: Input text
+
+        Returns:
+            List[str]: Runs of word characters and . + #, as written
+        """
+        return (_TOKEN_ASCII if text.isascii() else _TOKEN).findall(text)
+
+    def find_spans(self, tokens: Sequence[str]) -> List[Tuple[int, int, Skill, str]]:
+        """
+        Find skill mentions in tokenized text.
+
+        Overlapping mentions resolve to the leftmost, then longest, so
+        "Google Cloud Platform" is one mention rather than three.
+
+        Args:
+            tokens: Tokens from tokenize()
+
+        Returns:
+            List of (start, end, skill, form as written in the taxonomy) per mention,
+            in text order, where tokens[start:end] is the mention
+        """
+        matches = [
+            (start, end, pattern)
+            for start, end, pattern in self._automaton.search(list(map(self._keys.__getitem__, tokens)))
+            if pattern.exact is None or _exact_tokens(tokens[start:end]) == pattern.exact
+        ]
+        return [(start, end, pattern.skill, pattern.form) for start, end, pattern in leftmost_longest(matches)]
+
+    def find(self, text: str) -> List[Tuple[Skill, str]]:
+        """
+        Find skill mentions in text.
+
+        Args:
+            text: Resume or job description text
+
+        Returns:
+            List of (skill, form as written in the taxonomy) per mention, in text order
+        """
+        return [(skill, form) for _, _, skill, form in self.find_spans(self.tokenize(text))]
+
+    def extract(self, text: str) -> Dict[str, int]:
+        """
+        Extract canonical skills from text.
+
+        Args:
+            text: Resume or job description text
+
+        Returns:
+            Dict[str, int]: Canonical skill name -> mentions, in order of first mention
+        """
+        return dict(Counter(skill.name for skill, _ in self.find(text)))
+
+    def extract_by_category(self, text: str) -> Dict[str, List[str]]:
+        """
+        Extract canonical skills from text grouped by category.
+
+        Args:
+            text: Resume or job description text
+
+        Returns:
+            Dict[str, List[str]]: Category -> canonical skill names, in order of first mention
+        """
+        grouped: Dict[str, List[str]] = {}
+        for name in self.extract(text):
+            grouped.setdefault(self.skills[name].category, []).append(name)
+        return grouped
+
+
+def load_skill_taxonomy(path: os.PathLike) -> SkillTaxonomy:
+    """
+    Load a skill taxonomy from a JSON file.
+
+    Args:
+        path: Path to the taxonomy file
+
+    Returns:
+        SkillTaxonomy: The compiled taxonomy
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the file is not a valid taxonomy
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or not isinstance(data.get("categories"), dict):
+        raise ValueError(f"Skill taxonomy {path} has no 'categories' object")
+    return SkillTaxonomy(data["categories"])
+
+
+def create_skill_taxonomy_from_env() -> SkillTaxonomy:
+    """Load the taxonomy from SKILL_TAXONOMY_PATH, falling back to the bundled one."""
+    path = os.getenv("SKILL_TAXONOMY_PATH")
+    if path:
+        try:
+            return load_skill_taxonomy(path)
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not load skill taxonomy from {path}, using the bundled one: {str(e)}")
+    return load_skill_taxonomy(DEFAULT_TAXONOMY_PATH)
+
+
+# Process-wide taxonomy used by resume processing and ATS scoring
+skill_taxonomy = create_skill_taxonomy_from_env()
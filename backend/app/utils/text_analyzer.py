@@ -0,0 +1,218 @@
+"""
+Keyword analysis for ATS scoring.
+
+TextAnalyzer turns text into the keyword terms scoring_rules counts:
+
+- lowercase words of three or more characters (one precompiled pattern)
+- English stopwords removed, so "the", "and", "with" no longer dominate totals
+- plural nouns lemmatized to their singular ("skills" -> "skill",
+  "technologies" -> "technology"), with an exception list for words that
+  only look plural ("kubernetes", "analytics")
+- with a skill taxonomy (skill_taxonomy.SkillTaxonomy), each skill mention
+  counted as its canonical skill in place of its words: multi-word skills
+  ("machine learning" is one term, not three), aliases ("k8s" ->
+  "kubernetes") and short names ("c++", "go")
+
+Lemmas are memoized per analyzer, so after warm-up the word pass stays inside
+C-implemented builtins (findall, map, filter, Counter). With a taxonomy the
+text is split once, with the taxonomy's tokenizer, and each token's term
+(one-token skills resolved through the taxonomy's automaton) is memoized the
+same way. Multi-word skills are then matched in a trie over that term list:
+the positions where one can start are found in C, two dict lookups per term,
+so Python only runs at those positions.
+"""
+import re
+from collections import Counter
+from itertools import compress, count, repeat
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    from .skill_taxonomy import SkillTaxonomy
+
+_WORD = re.compile(r'\w{3,}')
+# \w matches the same characters in ASCII text either way, and the ASCII pattern runs faster
+_WORD_ASCII = re.compile(r'\w{3,}', re.ASCII)
+
+STOPWORDS: FrozenSet[str] = frozenset("""
+about above after again against all also among and any are aren around because been before being
+below between both but can cannot could couldn did didn does doesn doing don down during each
+either etc even ever every few for from further had hadn has hasn have haven having her here hers
+herself him himself his how however into isn its itself just least less let many may might more
+most much must mustn myself neither nor not now off once one only other ought our ours ourselves
+out over own per rather same shall shan she should shouldn since some such than that the their
+theirs them themselves then there these they this those though through thus too under until upon
+using very via was wasn well were weren what when where whether which while who whom whose why
+will with within without won would wouldn yet you your yours yourself yourselves
+""".split())
+
+# Words ending in "s" that are not plurals, or whose singular would not match in practice
+LEMMA_EXCEPTIONS: FrozenSet[str] = frozenset("""
+analytics aws business canvas class css devops diagnosis economics ethics express ios jenkins
+kubernetes linguistics logistics mathematics news pandas physics postgres process progress redis
+sales series statistics status success windows
+""".split())
+
+# Memoized lemmas are dropped when the cache grows past this many tokens
+MAX_CACHED_TOKENS = 200_000
+
+# Phrase trie node of a term that starts no multi-word skill
+_NO_PHRASES: Dict[Optional[str], Any] = {}
+
+
+def lemmatize(word: str) -> str:
+    """
+    Reduce a plural noun to its singular form with light suffix rules.
+
+    Args:
+        word: Lowercase word
+
+    Returns:
+        str: The singular form, or the word unchanged if it does not look plural
+    """
+    if len(word) <= 4 or not word.endswith("s") or word in LEMMA_EXCEPTIONS:
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("sses", "xes", "ches", "shes", "zzes")):
+        return word[:-2]
+    if word.endswith(("ss", "us", "is", "os")):
+        return word
+    return word[:-1]
+
+
+class _TermCache(dict):
+    """Token -> term memo; stopwords map to None."""
+
+    def __init__(self, stopwords: FrozenSet[str]):
+        super().__init__()
+        self.stopwords = stopwords
+
+    def __missing__(self, token: str) -> Optional[str]:
+        if len(self) >= MAX_CACHED_TOKENS:
+            self.clear()
+        term = None if token in self.stopwords else lemmatize(token)
+        self[token] = term
+        return term
+
+
+class _TokenTermCache(dict):
+    """
+    Taxonomy token -> term memo: the skill term of a one-token skill ("k8s" ->
+    "kubernetes", "C++" -> "c++"), else the token's word term. Tokens with
+    several word runs ("file.txt") are kept whole; those with none map to None.
+    """
+
+    def __init__(self, analyzer: "TextAnalyzer"):
+        super().__init__()
+        self.analyzer = analyzer
+
+    def __missing__(self, token: str) -> Optional[str]:
+        if len(self) >= MAX_CACHED_TOKENS:
+            self.clear()
+        spans = self.analyzer.skill_taxonomy.find_spans([token])
+        if spans:
+            term = spans[0][2].term
+        else:
+            words = self.analyzer._word_terms(token)
+            term = words[0] if len(words) == 1 else (token.rstrip(".").lower() if words else None)
+        self[token] = term
+        return term
+
+
+class TextAnalyzer:
+    """Tokenizer and keyword counter with stopwords, lemmatization and skill matching."""
+
+    def __init__(
+        self,
+        stopwords: Iterable[str] = STOPWORDS,
+        skill_taxonomy: Optional["SkillTaxonomy"] = None
+    ):
+        """
+        Initialize the analyzer.
+
+        Args:
+            stopwords: Words to ignore
+            skill_taxonomy: Skills to count as terms of their own, if any
+        """
+        self.stopwords = frozenset(stopwords)
+        self.skill_taxonomy = skill_taxonomy
+        self._terms = _TermCache(self.stopwords)
+        self._token_terms = _TokenTermCache(self)
+        # Multi-word skills by their terms: term -> term -> ... -> {None: skill term}
+        self._phrases: Dict[Optional[str], Any] = {}
+        if skill_taxonomy is not None:
+            self._add_phrases(skill_taxonomy)
+
+    def _add_phrases(self, skill_taxonomy: "SkillTaxonomy") -> None:
+        """Add every multi-word skill form, as the terms its words produce, to the phrase trie."""
+        for skill, form in skill_taxonomy.forms():
+            phrase = list(filter(None, map(self._token_terms.__getitem__, skill_taxonomy.tokenize(form))))
+            # One-token forms are resolved per token
+            if len(phrase) < 2:
+                continue
+            node = self._phrases
+            for term in phrase:
+                node = node.setdefault(term, {})
+            # The first skill to claim a phrase keeps it
+            node.setdefault(None, skill.term)
+
+    def _merge_phrases(self, terms: List[str]) -> List[str]:
+        """Replace each multi-word skill in a term list, leftmost then longest first, with its skill term."""
+        phrases = self._phrases
+        # Positions whose term and the next one start a phrase
+        starts = compress(count(), map(dict.get, map(phrases.get, terms, repeat(_NO_PHRASES)), terms[1:]))
+        merged: List[str] = []
+        done = 0
+        for start in starts:
+            if start < done:
+                # Inside the phrase just merged
+                continue
+            node = phrases[terms[start]]
+            end = None
+            for index in range(start + 1, len(terms)):
+                node = node.get(terms[index])
+                if node is None:
+                    break
+                if None in node:
+                    end, skill_term = index + 1, node[None]
+            if end is not None:
+                merged += terms[done:start]
+                merged.append(skill_term)
+                done = end
+        if not done:
+            return terms
+        merged += terms[done:]
+        return merged
+
+    def _word_terms(self, text: str) -> List[str]:
+        text = text.lower()
+        words = (_WORD_ASCII if text.isascii() else _WORD).findall(text)
+        return list(filter(None, map(self._terms.__getitem__, words)))
+
+    def terms(self, text: str) -> List[str]:
+        """
+        Split text into keyword terms.
+
+        Args:
+            text: Input text
+
+        Returns:
+            List[str]: Lemmatized non-stopword terms in order, each skill mention as
+            one term for its canonical skill
+        """
+        if self.skill_taxonomy is None:
+            return self._word_terms(text)
+        tokens = self.skill_taxonomy.tokenize(text)
+        return self._merge_phrases(list(filter(None, map(self._token_terms.__getitem__, tokens))))
+
+    def extract_keywords(self, text: str) -> Dict[str, int]:
+        """
+        Extract keywords and their frequencies from text.
+
+        Args:
+            text: Input text
+
+        Returns:
+            Dict[str, int]: Term frequencies, in order of first appearance
+        """
+        return dict(Counter(self.terms(text)))
@@ -0,0 +1,79 @@
+"""
+Request body size limit for file uploads.
+
+Starlette spools a multipart upload to a temporary file before the endpoint
+runs, so a per-file check in the endpoint only rejects an oversized upload
+after all of it has been received and written. This middleware rejects
+multipart requests whose Content-Length exceeds the limit before reading any
+of the body, and stops reading bodies sent without one (chunked) as soon as
+they pass it.
+"""
+import json
+import logging
+from typing import Optional
+
+from fastapi import HTTPException
+
+from ..config import settings
+from .file_utils import format_size
+
+logger = logging.getLogger(__name__)
+
+# Allowance for multipart boundaries, part headers and small form fields
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadSizeLimitMiddleware:
+    """ASGI middleware answering 413 for multipart bodies larger than the upload limit."""
+
+    def __init__(self, app, max_upload_size: Optional[int] = None):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: The ASGI application
+            max_upload_size: Maximum file size in bytes. Defaults to settings.MAX_UPLOAD_SIZE.
+        """
+        self.app = app
+        self.max_upload_size = settings.MAX_UPLOAD_SIZE if max_upload_size is None else max_upload_size
+        self.max_body_size = self.max_upload_size + MULTIPART_OVERHEAD
+
+    def _detail(self) -> str:
+        return f"File is larger than the {format_size(self.max_upload_size)} limit"
+
+    async def _reject(self, send) -> None:
+        body = json.dumps({"detail": self._detail()}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope["headers"])
+        if not headers.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            return await self.app(scope, receive, send)
+
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_body_size:
+            logger.warning(f"Rejected {scope['path']} upload of {int(content_length)} bytes before reading it")
+            return await self._reject(send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    logger.warning(f"Stopped reading {scope['path']} upload after {received} bytes")
+                    # Raised while the form is parsed, so FastAPI turns it into the response
+                    raise HTTPException(status_code=413, detail=self._detail())
+            return message
+
+        await self.app(scope, limited_receive, send)
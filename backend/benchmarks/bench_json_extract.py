@@ -0,0 +1,115 @@
+"""
+Micro-benchmark: tolerant JSON extraction versus the previous regex cascade.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_json_extract [--repeat N]
+
+For each input the script reports the median time per parse and whether the
+parser recovered the expected fields. The legacy parser below is the regex
+cascade GroqClient._parse_optimization_response used before extract_json.
+"""
+import re
+import json
+import time
+import argparse
+import statistics
+from typing import Any, Callable, Dict, List, Tuple
+
+from app.utils.json_extract import JSONExtractionError, extract_json
+
+
+def legacy_parse(response: str) -> Dict[str, Any]:
+    """The previous parse path: direct json.loads, regex extraction, then field salvage."""
+    response = ''.join(char for char in response if ord(char) >= 32 or char in '\n\r\t')
+    response = response.strip()
+    try:
+        return json.loads(response)
+    except json.JSONDecodeError:
+        pass
+
+    json_match = re.search(r'```(?:json)?\s*(\{.*\})\s*```', response, re.DOTALL)
+    if not json_match:
+        json_match = re.search(r'(\{[\s\S]*\})', response)
+    if not json_match:
+        raise ValueError("No JSON object found")
+
+    json_str = json_match.group(1).strip()
+    json_str = ''.join(char for char in json_str if ord(char) >= 32 or char in '\n\r\t')
+    json_str = json_str.replace('\n', ' ').replace('\r', ' ').replace('\t', ' ')
+    json_str = re.sub(r',\s*([}\]])', r'\1', json_str)
+    json_str = re.sub(r'([\{\[,])\s*([}\],])', r'\1""\2', json_str)
+    try:
+        return json.loads(json_str)
+    except json.JSONDecodeError:
+        result: Dict[str, Any] = {}
+        text_match = re.search(r'"optimized_text"\s*:\s*"(.*?)(?<!\\)"', json_str, re.DOTALL)
+        if text_match:
+            result['optimized_text'] = text_match.group(1).replace('\\"', '"')
+        score_match = re.search(r'"score"\s*:\s*(\d+(?:\.\d+)?)', json_str)
+        if score_match:
+            result['score'] = float(score_match.group(1))
+        suggestions_match = re.search(r'"suggestions"\s*:\s*\[(.*?)\]', json_str, re.DOTALL)
+        if suggestions_match:
+            result['suggestions'] = re.findall(r'"(.*?)(?<!\\)"', suggestions_match.group(1))
+        if not result:
+            raise ValueError("Could not extract any fields from response")
+        return result
+
+
+def _response(paragraphs: int) -> Dict[str, Any]:
+    line = "Led a team of engineers delivering a distributed data platform on AWS, cutting costs by 30%."
+    return {
+        "optimized_text": "\n".join(line for _ in range(paragraphs)),
+        "score": 82,
+        "suggestions": [f"Quantify achievement {i}" for i in range(10)],
+        "keywords_matched": ["python", "aws", "kubernetes"],
+        "missing_keywords": ["terraform"],
+    }
+
+
+def build_cases() -> List[Tuple[str, str]]:
+    """Inputs covering the shapes seen from the model, small and large."""
+    small = json.dumps(_response(5), indent=2)
+    large = json.dumps(_response(2000), indent=2)
+    raw_newlines = large.replace("\\n", "\n")
+    return [
+        ("clean small", small),
+        ("clean large", large),
+        ("fenced with prose", f"Here is the optimized resume:\n```json\n{large}\n```\nLet me know!"),
+        ("trailing commas", large.replace("\n  ]", ",\n  ]").replace("\n}", ",\n}")),
+        ("raw newlines in strings", raw_newlines),
+        ("truncated", large[: len(large) * 2 // 3]),
+        ("truncated + prose", "Sure! {" + raw_newlines[1: len(raw_newlines) // 2]),
+    ]
+
+
+def _time(parse: Callable[[str], Any], text: str, repeat: int) -> Tuple[float, str]:
+    timings = []
+    outcome = "ok"
+    for _ in range(repeat):
+        started = time.perf_counter()
+        try:
+            value = parse(text)
+            if not isinstance(value, dict) or not {"optimized_text", "score", "suggestions"} <= value.keys():
+                outcome = "partial"
+        except (ValueError, JSONExtractionError) as e:
+            outcome = f"failed ({type(e).__name__})"
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000, outcome
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'case':<26}{'size':>10}  {'legacy ms':>10} {'result':<20}{'extract ms':>11} {'result':<10}")
+    for name, text in build_cases():
+        legacy_ms, legacy_outcome = _time(legacy_parse, text, args.repeat)
+        new_ms, new_outcome = _time(extract_json, text, args.repeat)
+        print(f"{name:<26}{len(text):>10}  {legacy_ms:>10.2f} {legacy_outcome:<20}{new_ms:>11.2f} {new_outcome:<10}")
+
+
+if __name__ == "__main__":
+    main()
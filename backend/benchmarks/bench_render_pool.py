@@ -0,0 +1,82 @@
+"""
+Throughput and event-loop benchmark: CV rendering inline versus in the render pool.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_render_pool [--cvs 40] [--format pdf] [--workers 4]
+
+Renders --cvs synthetic CVs concurrently, first on the event loop (as
+CVGenerator did before the render pool) and then through RenderPool. While
+each batch runs, a ticker task sleeping 10 ms measures how late the event loop
+wakes it; the worst lateness is how long other requests would have stalled.
+"""
+import io
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+
+from app.services.render_pool import RENDERERS, RenderPool
+
+TICK = 0.01
+
+
+def _markdown(index: int) -> str:
+    role = "\n".join(
+        f"### Engineer {job}\n- Built services handling {job * 1000} requests per second\n"
+        f"Worked on python, cloud and data pipelines for team {index}.\n"
+        for job in range(8)
+    )
+    return f"# Candidate {index}\n## Summary\nExperienced engineer.\n## Experience\n{role}\n## Skills\nPython, SQL, AWS"
+
+
+async def _ticker(stop: asyncio.Event, lateness: list) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lateness.append(time.perf_counter() - started - TICK)
+
+
+async def _run(label: str, render, count: int, directory: str) -> None:
+    stop = asyncio.Event()
+    lateness = []
+    ticker = asyncio.create_task(_ticker(stop, lateness))
+    started = time.perf_counter()
+    await asyncio.gather(*[render(_markdown(i), os.path.join(directory, f"{label}_{i}")) for i in range(count)])
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker
+    print(f"  {label:6} {elapsed:6.2f}s  {count / elapsed:7.1f} CVs/s  "
+          f"max loop stall {max(lateness, default=0) * 1000:7.1f} ms")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cvs", type=int, default=40)
+    parser.add_argument("--format", choices=sorted(RENDERERS), default="pdf")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    pool = RenderPool(max_workers=args.workers)
+    started = time.perf_counter()
+    await pool.start()
+    print(f"render pool: {pool.max_workers} workers warmed up in {time.perf_counter() - started:.2f}s")
+    # The inline renderer gets the same warm caches as the workers
+    RENDERERS[args.format](_markdown(0), io.BytesIO())
+
+    async def inline(markdown: str, path: str) -> None:
+        RENDERERS[args.format](markdown, path)
+
+    async def pooled(markdown: str, path: str) -> None:
+        await pool.render(args.format, markdown, path)
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{args.cvs} {args.format} CVs:")
+        await _run("inline", inline, args.cvs, directory)
+        await _run("pool", pooled, args.cvs, directory)
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+"""
+Throughput benchmark: batched ATS scoring versus per-pair calculate_ats_score.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_scoring_engine [--sizes 1000 10000 100000] [--legacy-max 10000]
+
+Synthetic resumes (~400 words) and job descriptions (~150 words) are drawn
+from a shared word pool. For each size N the script times:
+
+- one job description against N resumes
+- one resume against N job descriptions
+- N aligned (resume, job description) pairs
+
+with ATSScoringEngine, and the per-pair loop over calculate_ats_score (the
+loop is skipped above --legacy-max, where it takes minutes). The job against
+resumes case is also timed through BatchScorer's chunk scorer, which ranks with
+the engine and builds keyword details for the top 10 only, against the
+per-resume score_resume_for_keywords loop it replaced.
+"""
+import time
+import random
+import argparse
+from typing import Callable, List
+
+from app.services.batch_scorer import ResumeInput, _score_chunk
+from app.utils.scoring_rules import calculate_ats_score, extract_keywords, score_resume_for_keywords
+from app.utils.scoring_engine import ATSScoringEngine
+
+WORD_POOL_SIZE = 5000
+# Distinct documents generated; larger batches cycle through them
+DISTINCT_DOCS = 2000
+TOP_K = 10
+
+
+def _documents(rng: random.Random, pool: List[str], count: int, length: int) -> List[str]:
+    return [" ".join(rng.choices(pool, k=length)) for _ in range(count)]
+
+
+def _rate(fn: Callable[[], object], pairs: int) -> str:
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    return f"{elapsed:8.2f}s {pairs / elapsed:>12,.0f} pairs/s"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--legacy-max", type=int, default=10000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    # Zipf-like pool: common words repeat, like real resumes and postings
+    pool = [f"term{i}" for i in range(WORD_POOL_SIZE) for _ in range(max(1, 50 // (i + 1)))]
+    resumes = _documents(rng, pool, DISTINCT_DOCS, 400)
+    jobs = _documents(rng, pool, DISTINCT_DOCS, 150)
+    engine = ATSScoringEngine()
+
+    for size in args.sizes:
+        batch_resumes = [resumes[i % DISTINCT_DOCS] for i in range(size)]
+        batch_jobs = [jobs[i % DISTINCT_DOCS] for i in range(size)]
+        print(f"\nN = {size:,}")
+        print(f"  engine  job vs resumes   {_rate(lambda: engine.score_job_against_resumes(jobs[0], batch_resumes), size)}")
+        print(f"  engine  resume vs jobs   {_rate(lambda: engine.score_resume_against_jobs(resumes[0], batch_jobs), size)}")
+        print(f"  engine  aligned pairs    {_rate(lambda: engine.score_pairs(batch_resumes, batch_jobs), size)}")
+        job_keywords = extract_keywords(jobs[0])
+        batch_inputs = [ResumeInput(id=str(i), text=text) for i, text in enumerate(batch_resumes)]
+        print(f"  batch   job vs resumes   {_rate(lambda: _score_chunk(job_keywords, batch_inputs, TOP_K), size)}")
+        if size <= args.legacy_max:
+            print(f"  legacy  job vs resumes   {_rate(lambda: [score_resume_for_keywords(r, job_keywords) for r in batch_resumes], size)}")
+            print(f"  legacy  aligned pairs    {_rate(lambda: [calculate_ats_score(r, j) for r, j in zip(batch_resumes, batch_jobs)], size)}")
+        else:
+            print("  legacy  job vs resumes   skipped (above --legacy-max)")
+            print("  legacy  aligned pairs    skipped (above --legacy-max)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Latency and memory benchmark: semantic resume index, float32 versus int8.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_semantic_index [--sizes 1000 10000] [--dim 1024] [--sections 4]
+
+Synthetic resumes (~400 words) are drawn from a shared word pool, split into
+--sections sections and embedded once with HashingEmbedder. For each size N the script indexes N resumes of
+--sections vectors each in a float32 and an int8 VectorIndex and reports
+index memory, mean top-10 query latency, and how many of the float32 top-10
+the int8 index also returns.
+"""
+import time
+import random
+import argparse
+from typing import List
+
+import numpy as np
+
+from app.utils.semantic_index import HashingEmbedder, VectorIndex
+
+WORD_POOL_SIZE = 5000
+QUERIES = 50
+
+
+def _documents(rng: random.Random, pool: List[str], count: int, length: int) -> List[str]:
+    return [" ".join(rng.choices(pool, k=length)) for _ in range(count)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--sections", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    # Zipf-like pool: common words repeat, like real resumes and postings
+    pool = [f"term{i}" for i in range(WORD_POOL_SIZE) for _ in range(max(1, 50 // (i + 1)))]
+    embedder = HashingEmbedder(dim=args.dim)
+
+    count = max(args.sizes) * args.sections
+    started = time.perf_counter()
+    sections = embedder.embed(_documents(rng, pool, count, 400 // args.sections))
+    elapsed = time.perf_counter() - started
+    print(f"embed {count:,} sections: {elapsed:.2f}s ({count / elapsed:,.0f}/s)")
+    queries = embedder.embed(_documents(rng, pool, QUERIES, 150))
+
+    for size in args.sizes:
+        print(f"\nN = {size:,} resumes, {size * args.sections:,} vectors")
+        top = {}
+        for quantize in (False, True):
+            index = VectorIndex(args.dim, quantize=quantize, capacity=size * args.sections)
+            for i in range(size):
+                index.add(str(i), sections[i * args.sections:(i + 1) * args.sections])
+            started = time.perf_counter()
+            top[quantize] = [[key for key, _ in index.search(query, k=10)] for query in queries]
+            latency = (time.perf_counter() - started) / QUERIES * 1000
+            label = "int8   " if quantize else "float32"
+            print(f"  {label} {index.memory_bytes / 2**20:8.1f} MiB {latency:8.2f} ms/query")
+        overlap = np.mean([len(set(a) & set(b)) / len(a) for a, b in zip(top[False], top[True])])
+        print(f"  int8 top-10 overlap with float32: {overlap:.0%}")
+
+
+if __name__ == "__main__":
+    main()
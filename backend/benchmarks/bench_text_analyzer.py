@@ -0,0 +1,109 @@
+"""
+Benchmark: keyword extraction with TextAnalyzer versus earlier extract_keywords versions.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_text_analyzer [--docs 2000] [--repeat 3]
+
+Generates resume-like prose and reports, for each extractor, the time per
+document (also as a fraction of the original extractor's) and the average size of the keyword map (distinct keys and total
+counted occurrences, i.e. ATS total_keywords). "default_analyzer" is
+scoring_rules.default_analyzer, the TextAnalyzer with the skill taxonomy that
+ATS scoring uses; the "TextAnalyzer" row has no taxonomy.
+"""
+import re
+import time
+import random
+import argparse
+import statistics
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List
+
+from app.utils.text_analyzer import TextAnalyzer
+from app.utils.scoring_rules import default_analyzer
+
+_WORD = re.compile(r'\w{3,}')
+
+SENTENCES = [
+    "Led a team of {n} engineers to design and build the {thing} for the {area} platform.",
+    "Developed {skill} services with {skill} and {skill}, improving the throughput of the {thing} by {n}%.",
+    "Worked with the product and design teams on the roadmap for {area} and the migration to {skill}.",
+    "Responsible for the machine learning pipelines and the data analysis of {area} metrics.",
+    "Implemented unit testing and continuous integration for all of the {thing} repositories.",
+    "Managed stakeholders across {n} countries and mentored junior developers in {skill}.",
+    "Improved the reliability of the distributed systems that serve {n} million users.",
+    "Experience with {skill}, {skill}, {skill} and cloud computing on AWS and Google Cloud.",
+]
+FILL = {
+    "skill": ["Python", "Java", "Go", "Kubernetes", "Docker", "React", "PostgreSQL", "Kafka", "Terraform", "Spark"],
+    "thing": ["payments API", "search service", "analytics dashboards", "billing systems", "data warehouse"],
+    "area": ["fintech", "e-commerce", "healthcare", "logistics", "advertising"],
+}
+
+
+def legacy_extract_keywords(text: str) -> Dict[str, int]:
+    """extract_keywords as originally written in scoring_rules."""
+    words = re.findall(r'\b\w+\b', text.lower())
+    word_freq = defaultdict(int)
+    for word in words:
+        if len(word) > 2:
+            word_freq[word] += 1
+    return dict(word_freq)
+
+
+def counter_extract_keywords(text: str) -> Dict[str, int]:
+    """The interim version: one precompiled pattern and Counter, no stopwords or lemmas."""
+    return dict(Counter(_WORD.findall(text.lower())))
+
+
+def make_documents(count: int, sentences: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+
+    def fill(template: str) -> str:
+        return re.sub(r"\{(\w+)\}", lambda m: str(rng.randint(2, 40)) if m.group(1) == "n" else rng.choice(FILL[m.group(1)]), template)
+
+    return [" ".join(fill(rng.choice(SENTENCES)) for _ in range(sentences)) for _ in range(count)]
+
+
+def measure(extract: Callable[[str], Dict[str, int]], docs: List[str], repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        maps = [extract(doc) for doc in docs]
+        timings.append(time.perf_counter() - started)
+    return {
+        "us_per_doc": statistics.median(timings) / len(docs) * 1e6,
+        "keys": statistics.mean(len(m) for m in maps),
+        "total_keywords": statistics.mean(sum(m.values()) for m in maps),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--sentences", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    docs = make_documents(args.docs, args.sentences)
+    analyzer = TextAnalyzer()
+    print(f"{args.docs} documents, {statistics.mean(len(d) for d in docs):.0f} characters each\n")
+    print(f"{'extractor':<22}{'us/doc':>10}{'vs original':>13}{'keys':>10}{'total_keywords':>16}")
+    extractors = (
+        ("original", legacy_extract_keywords),
+        ("regex + Counter", counter_extract_keywords),
+        ("TextAnalyzer", analyzer.extract_keywords),
+        ("default_analyzer", default_analyzer.extract_keywords),
+    )
+    baseline = None
+    for name, extract in extractors:
+        result = measure(extract, docs, args.repeat)
+        baseline = baseline or result["us_per_doc"]
+        print(
+            f"{name:<22}{result['us_per_doc']:>10.1f}{result['us_per_doc'] / baseline:>12.2f}x"
+            f"{result['keys']:>10.1f}{result['total_keywords']:>16.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()